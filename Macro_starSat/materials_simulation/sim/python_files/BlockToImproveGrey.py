@@ -1,4 +1,11 @@
 import FreeCAD as App, FreeCADGui as Gui, Part, math
+import os, sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
+from starsat.fillets import fillet_edges, fillet_fuse
 
 DOC_NAME = "ExtremeShield_Probe_Printable"
 if App.ActiveDocument is None or App.ActiveDocument.Label != DOC_NAME:
@@ -51,10 +58,8 @@ def add_obj(shape, label, color=(0.70,0.70,0.72)):
     return o
 
 def safe_fillet(shape, r):
-    try:
-        return shape.makeFillet(r, shape.Edges)
-    except:
-        return shape
+    # Redondeo por lotes (starsat.fillets): omite costuras y aristas que ya fallaron
+    return fillet_edges(shape, r)
 
 def make_cyl_x(d, L, cx=0, cy=0, cz=0):
     c = Part.makeCylinder(d/2.0, L)
@@ -78,24 +83,23 @@ def make_nose_loft():
 nose = make_nose_loft()
 mid  = make_cyl_x(P["mid_d"], P["mid_len"], cx=P["nose_len"])
 rear = make_cyl_x(P["rear_d"], P["rear_len"], cx=P["nose_len"] + P["mid_len"])
-fuselage = safe_fillet(nose.fuse(mid).fuse(rear), P["hull_fillet_r"])
+# Sólo las aristas de unión nariz/tramo medio/popa
+fuselage = fillet_fuse([nose, mid, rear], P["hull_fillet_r"])
 hull_obj = add_obj(fuselage, "Hull_Solid")
 
 # Blindaje frontal masivo (disco + bisel)
 front_disc  = Part.makeCylinder(P["front_tps_r"], P["front_tps_t"])
 front_bevel = Part.makeCone(P["front_tps_r"], P["front_tps_r"] - P["front_tps_bevel"], P["front_tps_bevel"])
-front_tps   = front_disc.fuse(front_bevel)
+front_tps   = fillet_fuse([front_disc, front_bevel], 4.0)
 front_tps.Placement = App.Placement(App.Vector(-P["front_tps_t"] - P["front_tps_gap"], 0, 0), rot_to_x())
-front_tps = safe_fillet(front_tps, 4.0)
 front_tps_obj = add_obj(front_tps, "Front_TPS", color=(0.50,0.52,0.54))
 
 # Blindaje trasero (disco + bisel) alrededor de la tobera
 rear_disc  = Part.makeCylinder(P["rear_tps_r"], P["rear_tps_t"])
 rear_bevel = Part.makeCone(P["rear_tps_r"], P["rear_tps_r"] - P["rear_tps_bevel"], P["rear_tps_bevel"])
-rear_tps   = rear_disc.fuse(rear_bevel)
+rear_tps   = fillet_fuse([rear_disc, rear_bevel], 4.0)
 rear_x = P["nose_len"] + P["mid_len"] + P["rear_len"] + P["rear_tps_gap"]
 rear_tps.Placement = App.Placement(App.Vector(rear_x, 0, 0), rot_to_x())
-rear_tps = safe_fillet(rear_tps, 4.0)
 rear_tps_obj = add_obj(rear_tps, "Rear_TPS", color=(0.50,0.52,0.54))
 
 # Anillo protector alrededor del rear
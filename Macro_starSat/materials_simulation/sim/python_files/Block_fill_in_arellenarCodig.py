@@ -1,5 +1,12 @@
 # -*- coding:utf-8 -*-
 import FreeCAD as App, FreeCADGui as Gui, Part, math
+import os, sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
+from starsat.cache import cached_builder
 
 doc_name="CassiniUltra_HeavySatellite_RadiationShield_MULTILAYER"
 doc=App.ActiveDocument if App.ActiveDocument and App.ActiveDocument.Label==doc_name else App.newDocument(doc_name)
@@ -60,6 +67,7 @@ def cone_x(d1,d2,L,cx=0,cy=0,cz=0): s=Part.makeCone(max(d1/2.0,1.0),max(d2/2.0,1
 def box_x(l,w,h,cx=0,cy=0,cz=0): b=Part.makeBox(l,w,h); b.Placement=App.Placement(App.Vector(cx-l/2.0,cy-w/2.0,cz-h/2.0),App.Rotation()); return b
 
 # === Escudo Parker multilayer ===
+@cached_builder
 def parker_shield_cyl(cx, diam, face_th=10.0, foam_th=120.0, coat_th=2.0, uhtc_t=10.0,
                       sup_L=280.0, sup_d1=900.0, sup_d2=600.0):
     R=diam/2.0
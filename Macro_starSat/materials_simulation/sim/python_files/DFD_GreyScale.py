@@ -3,6 +3,12 @@
 # Unidades: mm, eje longitudinal = X
 
 import FreeCAD as App, FreeCADGui as Gui, Part, math
+import os, sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
 
 doc_name="Direct_Fusion_Drive"
 if App.ActiveDocument is None or App.ActiveDocument.Label!=doc_name:
@@ -33,7 +39,9 @@ P={
     "leg_front_x":400.0,"leg_front_y":0.0,"leg_front_z":-(900.0/2.0)+50.0,
     "wing_root_w":600.0,"wing_tip_w":150.0,"wing_chord":450.0,
     "fin_h":400.0,"fin_base":200.0,
-    "rad_panel_w":800.0,"rad_panel_h":600.0,"rad_panel_n":5
+    "rad_panel_w":800.0,"rad_panel_h":600.0,"rad_panel_n":5,
+    # Creación masiva: recompute congelado, sin deshacer, vista aplicada al final
+    "bulk_session":True
 }
 
 # ========================
@@ -86,38 +94,23 @@ STRUCTURE={
 }
 
 # ========================
-# Materiales
+# Materiales: claves de starsat.materials (AL, STEEL, COPPER, CFRP, CC, KEVLAR),
+# asignadas todas juntas al final del ensamblado
 # ========================
-MAT={
-    'AL':{'name':'AA-2xxx','rho':2700.0,'E':72e9,'nu':0.33,'type':'isotropic'},
-    'STEEL':{'name':'SS-304','rho':8000.0,'E':200e9,'nu':0.30,'type':'isotropic'},
-    'COPPER':{'name':'Copper','rho':8960.0,'E':110e9,'nu':0.34,'type':'isotropic'},
-    'CFRP':{'name':'CFRP','rho':1550.0,'Ex':130e9,'Ey':10e9,'Ez':10e9,'nu_xy':0.25,'type':'orthotropic'},
-    'CC':{'name':'C/C TPS','rho':1600.0,'Ex':70e9,'Ey':70e9,'Ez':10e9,'nu_xy':0.2,'type':'orthotropic'},
-    'KEVLAR':{'name':'Kevlar','rho':1440.0,'Ex':70e9,'Ey':5e9,'Ez':5e9,'nu_xy':0.27,'type':'orthotropic'}
-}
+MAT_PAIRS=[]
 
 # ========================
 # Utilidades
 # ========================
-X_AXIS=App.Vector(1,0,0);Y_AXIS=App.Vector(0,1,0);Z_AXIS=App.Vector(0,0,1)
-def rot_to_x():return App.Rotation(Y_AXIS,90)
-def add_obj(shape,label):obj=doc.addObject("Part::Feature",label);obj.Shape=shape;return obj
+from starsat import primitives as prim
+from starsat.primitives import X_AXIS,Y_AXIS,Z_AXIS,rot_to_x,add_obj,make_cyl_x,make_cone_x,make_torus_x,make_box
+from starsat.cache import cached_builder
+from starsat.fillets import fillet_fuse
+from starsat import session
+from starsat import materials
+_bulk=session.begin(doc) if P["bulk_session"] else None
 def set_mat(obj,mat): 
-    if not obj:return
-    m=MAT.get(mat,None)if isinstance(mat,str)else mat
-    if not m:return
-    obj.addProperty("App::PropertyString","Material","Meta","").Material=m.get('name','')
-    obj.addProperty("App::PropertyMap","MaterialData","Meta","").MaterialData={k:str(v)for k,v in m.items()}
-    obj.addProperty("App::PropertyFloat","Density","Meta","").Density=m.get('rho',0.0)
-def make_cyl_x(d,L,cx=0.0,cy=0.0,cz=0.0,label="CylX"):
-    r=d/2.0;cyl=Part.makeCylinder(r,L);cyl.Placement=App.Placement(App.Vector(cx-L/2.0,cy,cz),rot_to_x());return add_obj(cyl,label)
-def make_cone_x(d1,d2,L,cx=0.0,cy=0.0,cz=0.0,label="ConeX"):
-    r1=d1/2.0;r2=d2/2.0;cone=Part.makeCone(r1,r2,L);cone.Placement=App.Placement(App.Vector(cx-L/2.0,cy,cz),rot_to_x());return add_obj(cone,label)
-def make_torus_x(R,r,cx=0.0,cy=0.0,cz=0.0,label="TorusX"):
-    tor=Part.makeTorus(R,r);tor.Placement=App.Placement(App.Vector(cx,cy,cz),rot_to_x());return add_obj(tor,label)
-def make_box(w,d,h,cx=0.0,cy=0.0,cz=0.0,label="Box"):
-    b=Part.makeBox(w,d,h);b.Placement=App.Placement(App.Vector(cx-w/2.0,cy-d/2.0,cz-h/2.0),App.Rotation());return add_obj(b,label)
+    if obj and mat: MAT_PAIRS.append((obj,mat))
 def make_hollow_from_offset(outer_shape,t,label="Shell"): 
     try:
         inner=outer_shape.makeOffsetShape(-t,0.01,join=2,fill=True)
@@ -126,12 +119,8 @@ def make_hollow_from_offset(outer_shape,t,label="Shell"):
     except Exception:
         return add_obj(outer_shape,label+"_fallback")
 def fillet_between(shpA,shpB,r):
-    fused=shpA.fuse(shpB)
-    try:
-        edges=[e for e in fused.Edges if e.Length>30 and e.Length<10000]
-        new=fused.makeFillet(r,edges);return new
-    except Exception:
-        return fused
+    # Sólo las aristas de la unión A/B, por lotes (starsat.fillets)
+    return fillet_fuse([shpA,shpB],r)
 def sweep_rect_around_X(R,rw,rh,cx,cy,cz,ax0,ax1,label="CoilSweep"):
     circ=Part.makeCircle(R,App.Vector(cx,cy,cz),X_AXIS);path=Part.Wire([circ])
     p0=App.Vector(0,-rw/2.0,-rh/2.0);p1=App.Vector(0,rw/2.0,-rh/2.0)
@@ -213,6 +202,7 @@ def create_instrument_wispr():
 # ========================
 # TPS avanzado con aislamiento multicapa
 # ========================
+@cached_builder(pending=MAT_PAIRS)
 def create_advanced_tps():
     tps_base = TPS_fused.Shape
     insul_layers = []
@@ -243,6 +233,7 @@ def create_advanced_tps():
 # ========================
 # Sistema de energía: Paneles solares retráctiles con refrigeración
 # ========================
+@cached_builder(pending=MAT_PAIRS)
 def create_energy_system():
     panels = []
     cooling_tubes = []
@@ -267,6 +258,7 @@ def create_energy_system():
 # ========================
 # Comunicación y navegación
 # ========================
+@cached_builder(pending=MAT_PAIRS)
 def create_comm_nav():
     # Antena HGA
     hga_arm = make_cyl_x(COMM_NAV["hga_arm_r"]*2, COMM_NAV["hga_arm_l"], cx=COMM_NAV["hga_cx"] - COMM_NAV["hga_arm_l"]/2, cy=COMM_NAV["hga_cy"], cz=COMM_NAV["hga_cz"], label="HGA_Arm")
@@ -370,7 +362,7 @@ rings=[]
 x0=P["reactor_cx"]-P["reactor_l"]/2.0+P["ring_h"]/2.0
 for i in range(P["ring_n"]):
     x=x0+i*P["ring_pitch"]
-    ring=Part.makeTorus((P["ring_ro"]+P["ring_ri"])/2.0,(P["ring_ro"]-P["ring_ri"])/2.0)
+    ring=prim.makeTorus((P["ring_ro"]+P["ring_ri"])/2.0,(P["ring_ro"]-P["ring_ri"])/2.0)
     ring.Placement=App.Placement(App.Vector(x,0,0),rot_to_x())
     rings.append(ring)
 rings_shape=rings[0]
@@ -412,7 +404,7 @@ for k in range(P["truss_n"]):
     y=P["truss_R_attach"]*math.cos(math.radians(ang))
     z=P["truss_R_attach"]*math.sin(math.radians(ang))
     L=300.0
-    beam=Part.makeBox(L,P["truss_tube_w"],P["truss_tube_w"])
+    beam=prim.makeBox(L,P["truss_tube_w"],P["truss_tube_w"])
     beam.Placement=App.Placement(App.Vector(x_attach-L/2.0,y-P["truss_tube_w"]/2.0,z-P["truss_tube_w"]/2.0),App.Rotation())
     truss_list.append(beam)
 truss_shape=truss_list[0]
@@ -442,8 +434,8 @@ tank2=make_cyl_x(P["tank_d"],P["tank_l"],cx=P["tank_cx"],cy=-P["tank_cy"],cz=P["
 # Tren de aterrizaje (sólidos)
 # ========================
 def make_leg(x,y,z,L,d,label):
-    shaft=Part.makeCylinder(d/4.0,L)
-    foot=Part.makeCylinder(d/2.0,20.0)
+    shaft=prim.makeCylinder(d/4.0,L)
+    foot=prim.makeCylinder(d/2.0,20.0)
     shaft.Placement=App.Placement(App.Vector(x-L/2.0,y,z),rot_to_x())
     foot.Placement=App.Placement(App.Vector(x+L/2.0-10.0,y,z-d/4.0),App.Rotation())
     return add_obj(shaft.fuse(foot),label)
@@ -489,13 +481,13 @@ if RAD["gap_x"] is None:   RAD["gap_x"]=max(220.0, P["rad_panel_w"]*0.25)
 for i in range(RAD["count_pairs"]):
     x = RAD["x_start"] + i*RAD["gap_x"]
     # +Y
-    arm_r = Part.makeCylinder(RAD["arm_r"], RAD["arm_len"]); arm_r.Placement = App.Placement(App.Vector(x, P["mid_d"]/2.0, 0), rot_to_x())
-    plate_r = Part.makeBox(RAD["th"], P["rad_panel_w"], P["rad_panel_h"])
+    arm_r = prim.makeCylinder(RAD["arm_r"], RAD["arm_len"]); arm_r.Placement = App.Placement(App.Vector(x, P["mid_d"]/2.0, 0), rot_to_x())
+    plate_r = prim.makeBox(RAD["th"], P["rad_panel_w"], P["rad_panel_h"])
     plate_r.Placement = App.Placement(App.Vector(x+RAD["arm_len"], P["mid_d"]/2.0+RAD["mount_gap_y"], -P["rad_panel_h"]/2.0), App.Rotation())
     rR = add_obj(arm_r.fuse(plate_r), f"Radiator_R_{i+1}"); set_mat(rR,'AL'); rads.append(rR)
     # -Y
-    arm_l = Part.makeCylinder(RAD["arm_r"], RAD["arm_len"]); arm_l.Placement = App.Placement(App.Vector(x, -P["mid_d"]/2.0, 0), rot_to_x())
-    plate_l = Part.makeBox(RAD["th"], P["rad_panel_w"], P["rad_panel_h"])
+    arm_l = prim.makeCylinder(RAD["arm_r"], RAD["arm_len"]); arm_l.Placement = App.Placement(App.Vector(x, -P["mid_d"]/2.0, 0), rot_to_x())
+    plate_l = prim.makeBox(RAD["th"], P["rad_panel_w"], P["rad_panel_h"])
     plate_l.Placement = App.Placement(App.Vector(x+RAD["arm_len"], -(P["mid_d"]/2.0+RAD["mount_gap_y"]+P["rad_panel_w"]), -P["rad_panel_h"]/2.0), App.Rotation())
     rL = add_obj(arm_l.fuse(plate_l), f"Radiator_L_{i+1}"); set_mat(rL,'AL'); rads.append(rL)
 
@@ -582,7 +574,9 @@ set_mat(Assembly_Fused, 'AL')  # material global visual (las subpropiedades ya e
 compound = Part.Compound([o.Shape for o in to_fuse])
 add_obj(compound, "Assembly_Compound")
 
-doc.recompute()
+materials.attach(MAT_PAIRS)
+if _bulk: session.end(_bulk)
+else: doc.recompute()
 print("Ensamblado mejorado completado con instrumentos científicos, TPS avanzado, sistema de energía, comunicación/navegación y estructura mejorada. Assembly_Fused (única pieza) y Assembly_Compound (visual). Listo para exportar STL/STEP.")
 
 DFD_GRIS_mejora.py
@@ -671,12 +665,8 @@ def make_hollow_from_offset(outer_shape,t,label="Shell"):
     except Exception:
         return add_obj(outer_shape,label+"_fallback")
 def fillet_between(shpA,shpB,r):
-    fused=shpA.fuse(shpB)
-    try:
-        edges=[e for e in fused.Edges if e.Length>30 and e.Length<10000]
-        new=fused.makeFillet(r,edges);return new
-    except Exception:
-        return fused
+    # Sólo las aristas de la unión A/B, por lotes (starsat.fillets)
+    return fillet_fuse([shpA,shpB],r)
 def sweep_rect_around_X(R,rw,rh,cx,cy,cz,ax0,ax1,label="CoilSweep"):
     circ=Part.makeCircle(R,App.Vector(cx,cy,cz),X_AXIS);path=Part.Wire([circ])
     p0=App.Vector(0,-rw/2.0,-rh/2.0);p1=App.Vector(0,rw/2.0,-rh/2.0)
@@ -454,13 +454,9 @@ base_obj = add_obj(base_cut, "Mounting_Base")
 doc.recompute()
 
 # Opcional: Ensamblaje fusionado para visualización (comentar para CNC puro)
-# nave = hull
-# for part in [shield, hull_shield, reactor_shield, cockpit_cut, reactor_full, hab, tanks,
-#              wings, collar, deflectores, docking, sensors, beams, antenna, landing_full,
-#              solar_panels, instruments, hg_antenna, nav_full, truss, base_cut]:
-#     try:
-#         nave = nave.fuse(part)
-#     except Exception:
-#         part.translate(App.Vector(0,0,0.2))
-#         nave = nave.fuse(part)
+# (requiere el directorio raíz del repositorio en sys.path)
+# from starsat.booleans import fuse_all
+# nave = fuse_all([hull, shield, hull_shield, reactor_shield, cockpit_cut, reactor_full, hab, tanks,
+#                  wings, collar, deflectores, docking, sensors, beams, antenna, landing_full,
+#                  solar_panels, instruments, hg_antenna, nav_full, truss, base_cut], mode="fuzzy")
 # nave_obj = add_obj(nave, "Nave_DFD_XL_Solar_Fused")
@@ -2,6 +2,13 @@
 # Unidades: mm
 
 import FreeCAD as App, Part, math
+import os, sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
+from starsat.booleans import fuse_all
 
 doc = App.newDocument("Nave_DFD_XL_Solar")
 
@@ -65,7 +72,11 @@ P = {
     'beam_r': 50.0, 'beam_l': 3000.0,
 
     # Tolerancias de solape para fusión robusta
-    'overlap': 2.0
+    'overlap': 2.0,
+
+    # Ensamblaje final: fusión n-aria con tolerancia difusa de OCC [mm]
+    # (sustituye al reintento desplazando la pieza 0.2 mm)
+    'fuse_mode': 'fuzzy', 'fuzzy_tol': 1e-3
 }
 
 # ========================
@@ -250,15 +261,9 @@ landing_full = legs[0].fuse(legs[1]).fuse(legs[2]).fuse(legs[3])
 # ========================
 # Ensamblaje final con fusión robusta
 # ========================
-nave = hull
-for part in [shield, hull_shield, reactor_shield, cockpit_cut, reactor_full, hab, tanks,
-             wings, collar, deflectores, docking, sensors, beams, antenna, landing_full]:
-    try:
-        nave = nave.fuse(part)
-    except Exception:
-        # micro-solape para evitar coplanaridades estrictas
-        part.translate(App.Vector(0,0,0.2))
-        nave = nave.fuse(part)
+nave = fuse_all([hull, shield, hull_shield, reactor_shield, cockpit_cut, reactor_full, hab, tanks,
+                 wings, collar, deflectores, docking, sensors, beams, antenna, landing_full],
+                mode=P['fuse_mode'], fuzzy=P['fuzzy_tol'])
 
 nave_obj = add_obj(nave, "Nave_DFD_XL_Solar")
 doc.recompute()
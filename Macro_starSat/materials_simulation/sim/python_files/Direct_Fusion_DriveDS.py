@@ -1,5 +1,11 @@
 #Direct_Fusion_DriveDS.py
 import FreeCAD as App, FreeCADGui as Gui, Part, math
+import os, sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
 
 doc_name="Direct_Fusion_Drive"
 if App.ActiveDocument is None or App.ActiveDocument.Label!=doc_name:
@@ -11,7 +17,8 @@ P={"nose_len":800.0,"nose_base_d":600.0,"mid_len":1400.0,"mid_d":900.0,
    "rear_len":800.0,"rear_d":1200.0,"hull_t":10.0,
    "reactor_d":800.0,"reactor_l":900.0,"reactor_cx":2600.0,
    "nozzle_throat_d":300.0,"nozzle_exit_d":900.0,"nozzle_l":700.0,"nozzle_cx":2850.0,
-   "rad_panel_w":800.0,"rad_panel_h":600.0,"rad_panel_n":5}
+   "rad_panel_w":800.0,"rad_panel_h":600.0,"rad_panel_n":5,
+   "vf_rays":0}  # vf_rays > 0: factores de forma radiadores/casco/espacio
 
 TPS={"tps_d":2400.0,"tps_t":100.0,"tps_gap":120.0,"sup_L":280.0,"sup_d_base":900.0,"sup_d_tip":600.0,
      "cer_t":5.0,"cc_shield_t":20.0}
@@ -29,62 +36,34 @@ TK={
 }
 
 # ------------------ Materiales ------------------
-MAT={'AL':('AA-2xxx',2700.0,0.3),'316L':('SS-316L',7980.0,0.8),'718':('Inconel-718',8190.0,0.9),
-     'CFRP':('CFRP',1550.0,0.5),'6061':('AA-6061-T6',2710.0,0.4),'Cu':('Copper',8960.0,0.2),
-     'CC':('C/C TPS',1600.0,0.95),'CER':('SiC Liner',3200.0,0.98),'CC_Noz':('C/C Nozzle',1600.0,0.95),
-     'CER_Coat':('SiC Coating',3200.0,0.98),'CC_Shield':('C/C Shield',1600.0,0.95)}
+# Claves de starsat.materials (AL, 316L, 718, CFRP, 6061, Cu, CC, CER, CC_Noz,
+# CER_Coat, CC_Shield); se asignan todas juntas al final
+MAT_PAIRS=[]
 
 X=App.Vector(1,0,0); Y=App.Vector(0,1,0); Z=App.Vector(0,0,1)
-def rot_to_x(): return App.Rotation(Y,90)
+from starsat import primitives as prim
+from starsat.primitives import rot_to_x
+from starsat import patterns
+from starsat import materials
+from starsat import massprops
 
 def add_obj(shape,label,color=(0.2,0.4,0.8)):
-    o=doc.addObject("Part::Feature",label); o.Shape=shape
-    try: o.ViewObject.ShapeColor=color
-    except: pass
-    return o
+    return prim.add_obj(shape,label,color,doc=doc)
 
 def set_mat(o,key):
-    name,rho,corr_res = MAT[key]
-    o.addProperty("App::PropertyString","Material","Meta","").Material=name
-    o.addProperty("App::PropertyFloat","Density","Meta","").Density=rho
-    o.addProperty("App::PropertyFloat","Corrosion_Resistance","Meta","").Corrosion_Resistance=corr_res
-    vol = o.Shape.Volume/1e9
-    o.addProperty("App::PropertyFloat","Mass","Meta","").Mass = vol*rho
-
-def calculate_totals(objects):
-    total_mass = 0.0
-    total_corr_res = 0.0
-    total_vol = 0.0
-    for o in objects:
-        if hasattr(o, 'Mass') and hasattr(o, 'Corrosion_Resistance'):
-            mass = o.Mass
-            corr = o.Corrosion_Resistance
-            vol = o.Shape.Volume / 1e9
-            total_mass += mass
-            total_corr_res += corr * vol
-            total_vol += vol
-    avg_corr_res = total_corr_res / total_vol if total_vol > 0 else 0
-    return total_mass, avg_corr_res
+    MAT_PAIRS.append((o,key))
 
 def cylX(d,L,c=(0,0,0),label="CylX"):
-    s=Part.makeCylinder(d/2.0, L)
-    s.Placement = App.Placement(App.Vector(c[0]-L/2.0,c[1],c[2]), rot_to_x())
-    return add_obj(s,label)
+    return add_obj(prim.cyl_x(d,L,*c),label)
 
 def coneX(d1,d2,L,c=(0,0,0),label="ConeX"):
-    s=Part.makeCone(d1/2.0, d2/2.0, L)
-    s.Placement = App.Placement(App.Vector(c[0]-L/2.0,c[1],c[2]), rot_to_x())
-    return add_obj(s,label)
+    return add_obj(prim.cone_x(d1,d2,L,*c),label)
 
 def torusX(R,r,c=(0,0,0),label="TorusX"):
-    s=Part.makeTorus(R,r)
-    s.Placement = App.Placement(App.Vector(c[0],c[1],c[2]), rot_to_x())
-    return add_obj(s,label)
+    return add_obj(prim.torus_x(R,r,*c),label)
 
 def box(w,d,h,c=(0,0,0),label="Box"):
-    s=Part.makeBox(w,d,h)
-    s.Placement = App.Placement(App.Vector(c[0]-w/2.0,c[1]-d/2.0,c[2]-h/2.0), App.Rotation())
-    return add_obj(s,label)
+    return add_obj(prim.box_c(w,d,h,*c),label)
 
 def shell_from_solid(solid,t,label):
     try:
@@ -142,19 +121,18 @@ cry   = add_obj(cry_o.Shape.cut(cry_i.Shape), "Cryostat"); set_mat(cry,'AL')
 cry_shield = torusX(TK["Rm"]+TK["cry_gap"]+TK["cry_t"]+20.0, 15.0, (cx,0,0), "Cryostat_CC_Shield"); set_mat(cry_shield,'CC_Shield')
 
 # TF tipo D densas
+# Bobina semilla (una sola booleana) y copias giradas alrededor de X
+tf_seed = prim.torus_x(TK["Rm"], TK["TF_flat"]/2.0, cx,0,0).cut(prim.torus_x(TK["Rm"], TK["TF_flat"]/2.0 - TK["TF_th"], cx,0,0))
 TF=[]
-for k in range(TK["N_TF"]):
-    a = 360.0/TK["N_TF"]*k
-    frame_o = torusX(TK["Rm"], TK["TF_flat"]/2.0, (cx,0,0), f"TFo_{k:02d}")
-    frame_i = torusX(TK["Rm"], TK["TF_flat"]/2.0 - TK["TF_th"], (cx,0,0), f"TFi_{k:02d}")
-    tf = add_obj(frame_o.Shape.cut(frame_i.Shape), f"TF_{k:02d}", (0.85,0.5,0.2)); set_mat(tf,'Cu')
-    tf.Placement = App.Placement(tf.Placement.Base, App.Rotation(X, a)); TF.append(tf)
+for k,shp in enumerate(patterns.polar(tf_seed, TK["N_TF"], axis=X, result="list")):
+    tf = add_obj(shp, f"TF_{k:02d}", (0.85,0.5,0.2)); set_mat(tf,'Cu'); TF.append(tf)
 
 # PF en ±Z y solenoide axial
 PF=[]
-for k in range(TK["N_PF"]):
-    z = (-TK["N_PF"]/2 + 0.5 + k) * (TK["PF_span"]/TK["N_PF"])
-    pf = torusX(TK["PF_R"], TK["PF_r"], (cx,0,z), f"PF_{k:02d}")
+pf_dz = TK["PF_span"]/TK["N_PF"]
+pf_seed = prim.torus_x(TK["PF_R"], TK["PF_r"], cx,0,(-TK["N_PF"]/2 + 0.5)*pf_dz)
+for k,shp in enumerate(patterns.linear(pf_seed, TK["N_PF"], (0,0,pf_dz), result="list")):
+    pf = add_obj(shp, f"PF_{k:02d}")
     set_mat(pf,'Cu'); PF.append(pf)
 
 sol_o = cylX(2*TK["sol_R"], TK["sol_L"], (cx,0,-TK["sol_L"]/2.0), "Solenoid_O")
@@ -169,14 +147,13 @@ for i in range(TK["N_ports"]):
     y   = (TK["Rm"]+TK["r_sec"]+50.0)*math.cos(ang)
     z   = (TK["Rm"]+TK["r_sec"]+50.0)*math.sin(ang)
     axis= App.Vector(math.cos(ang), math.sin(ang), 0)
-    p   = Part.makeCylinder(TK["D_port"]/2.0, TK["L_port"], App.Vector(x,y,z), axis)
+    p   = prim.makeCylinder(TK["D_port"]/2.0, TK["L_port"], App.Vector(x,y,z), axis)
     po  = add_obj(p, f"Port_{i:02d}", (0.5,0.6,0.7)); set_mat(po,'316L'); ports.append(po)
 
 loops=[]
-for i in range(TK["N_RF"]):
-    ang = 360.0/TK["N_RF"]*i + TK["RF_phase_deg"]
-    rf  = torusX(TK["RF_R"], TK["RF_r"], (cx,0,0), f"RF_{i:02d}")
-    rf.Placement = App.Placement(rf.Placement.Base, App.Rotation(X, ang))
+rf_seed = prim.makeTorus(TK["RF_R"], TK["RF_r"], App.Vector(cx,0,0))  # lazo en su plano original, girado luego alrededor de X
+for i,shp in enumerate(patterns.polar(rf_seed, TK["N_RF"], axis=X, start=TK["RF_phase_deg"], result="list")):
+    rf  = add_obj(shp, f"RF_{i:02d}")
     set_mat(rf,'Cu'); loops.append(rf)
 
 # Manifold y líneas H2 (sombra TPS)
@@ -218,7 +195,13 @@ doc.recompute()
 all_objects = [nose, mid, rear, hull, hull_cer, tps_sup, tps_cer, tps_core, tps_shield, tps_ring,
                toro, liner, jacket, cry, cry_shield] + TF + PF + [sol] + ports + loops + [manif, line_L, line_R, noz_cone, noz_ann] + rads
 
-total_mass, avg_corr_res = calculate_totals(all_objects)
+MAT_TABLE = materials.attach(MAT_PAIRS)
+total_mass, avg_corr_res = materials.totals(MAT_TABLE, all_objects, "corrosion")
+massprops.write(massprops.report(doc), "Direct_Fusion_DriveDS")
+if P["vf_rays"]:
+    from starsat import viewfactor
+    vf_surf = [hull_cer] + rads
+    viewfactor.report(viewfactor.compute(vf_surf, rays=P["vf_rays"], jobs=0), viewfactor.emissivities(vf_surf))
 print(f"Total Mass: {total_mass:.2f} kg")
 print(f"Average Corrosion Resistance: {avg_corr_res:.3f}")
 print("Tokamak H2 blindado con carbono-carbono y ceramicas para resistencia a corrosion y calor extremo: listo.")
@@ -1,4 +1,10 @@
 import FreeCAD as App,FreeCADGui as Gui,Part,math
+import os, sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
 
 doc_name="CassiniUltra_HeavySatellite_RadiationShield_SOLID_INTEGRATED_ELEC_EXTENDED"
 doc = App.ActiveDocument if App.ActiveDocument and App.ActiveDocument.Label==doc_name else App.newDocument(doc_name)
@@ -48,25 +54,13 @@ A={
 }
 
 # ---------------- UTILIDADES ----------------
-X_AXIS=App.Vector(1,0,0);Y_AXIS=App.Vector(0,1,0);Z_AXIS=App.Vector(0,0,1)
-rot_to_x=lambda:App.Rotation(Y_AXIS,90)
-
-def add_obj(s,n):
-    o=doc.addObject("Part::Feature",n); o.Shape=s; return o
+from starsat import primitives as prim
+from starsat.primitives import X_AXIS, Y_AXIS, Z_AXIS, rot_to_x, add_obj, cyl_x, cone_x
+from starsat.profiling import note_failure
 
 def color(o,rgb):
     if hasattr(o,"ViewObject"): o.ViewObject.ShapeColor=rgb
 
-def cyl_x(d,L,cx=0,cy=0,cz=0):
-    s=Part.makeCylinder(d/2.0,L)
-    s.Placement=App.Placement(App.Vector(cx-L/2.0,cy,cz),rot_to_x())
-    return s
-
-def cone_x(d1,d2,L,cx=0,cy=0,cz=0):
-    s=Part.makeCone(d1/2.0,d2/2.0,L)
-    s.Placement=App.Placement(App.Vector(cx-L/2.0,cy,cz),rot_to_x())
-    return s
-
 def sphere_section(R,t,cx):
     so,si=Part.makeSphere(R),Part.makeSphere(R-t)
     so.Placement=si.Placement=App.Placement(App.Vector(cx,0,0),App.Rotation())
@@ -74,23 +68,24 @@ def sphere_section(R,t,cx):
     return so.common(box).cut(si.common(box))
 
 def sphere_at(R,cx=0,cy=0,cz=0):
-    s=Part.makeSphere(R)
+    s=prim.makeSphere(R)
     s.Placement=App.Placement(App.Vector(cx,cy,cz),App.Rotation())
     return s
 
 def box_at(l,w,t,x,y,z):
-    b=Part.makeBox(l,w,t); b.translate(App.Vector(x,y,z)); return b
+    b=prim.makeBox(l,w,t); b.translate(App.Vector(x,y,z)); return b
 
 def refine_shape(shp):
     try: return shp.removeSplitter()
-    except Exception: return shp
+    except Exception as ex:
+        note_failure("refine_shape",ex); return shp
 
 def fuse_many(lst):
     if not lst: return None
     s=lst[0]
     for e in lst[1:]:
         try: s=s.fuse(e)
-        except: pass
+        except Exception as ex: note_failure("fuse_many",ex)
     return refine_shape(s)
 
 # ---------------- BASE ORIGINAL ----------------
@@ -140,7 +135,7 @@ for sgn in(+1,-1):
 frame_rings=[]; frame_count=int(P["bus_len"]//P["frame_step"])
 for i in range(frame_count+1):
     x=tank_cx-P["bus_len"]/2.0+i*P["frame_step"]
-    ring=Part.makeTorus(P["frame_ring_d"]/2.0,P["frame_ring_t"]/2.0)
+    ring=prim.makeTorus(P["frame_ring_d"]/2.0,P["frame_ring_t"]/2.0)
     ring.Placement=App.Placement(App.Vector(x,0,0),App.Rotation(X_AXIS,90))
     frame_rings.append(ring)
 
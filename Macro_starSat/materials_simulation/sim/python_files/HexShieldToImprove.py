@@ -1,6 +1,14 @@
 import FreeCAD as App
 import FreeCADGui as Gui
 import Part, math, os
+import sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
+from starsat.booleans import cut_all
+from starsat import primitives as prim
 
 # ---------------------------------
 # Documento y configuración
@@ -154,9 +162,7 @@ def mk_box(w,d,h, x=0, y=0, z=0, center=True):
     return b
 
 def mk_ring(Ro, Ri, L, x0=0, y=0, z=0):
-    out = Part.makeCylinder(mm(Ro), mm(L))
-    inn = Part.makeCylinder(mm(Ri), mm(L + 0.0002))  # un pelo más largo para robustez
-    ring = out.cut(inn)
+    ring = prim.tube(mm(Ro), mm(Ri), mm(L))
     ring.Placement = App.Placement(App.Vector(mm(x0), mm(y), mm(z)), rot_to_x())
     return ring
 
@@ -228,13 +234,10 @@ def make_panel_with_frame(L, W, T, rows, cols, frame):
     cell_w = L / cols
     cell_h = W / rows
     groove = max(0.0015, T * 0.25)
-    for i in range(1, cols):
-        cut = mk_box(0.004, groove, W, x=i*cell_w, y=(T-groove)/2.0, z=0, center=False)
-        panel = panel.cut(cut)
-    for j in range(1, rows):
-        cut = mk_box(L, groove, 0.004, x=0, y=(T-groove)/2.0, z=j*cell_h, center=False)
-        panel = panel.cut(cut)
-    return panel
+    cuts = [mk_box(0.004, groove, W, x=i*cell_w, y=(T-groove)/2.0, z=0, center=False) for i in range(1, cols)]
+    cuts += [mk_box(L, groove, 0.004, x=0, y=(T-groove)/2.0, z=j*cell_h, center=False) for j in range(1, rows)]
+    # Todas las ranuras en una sola booleana
+    return cut_all(panel, cuts)
 
 panel_base = make_panel_with_frame(P["panel_L"], P["panel_W"], P["panel_T"], P["panel_rows"], P["panel_cols"], P["panel_frame"])
 
@@ -372,10 +375,11 @@ wrap_inner = mk_cyl_x(max(0.01, P["body_R"] - P["insul_th"]), ins_w + 0.0002, x0
 wrap_band = wrap_outer.cut(wrap_inner)
 
 # Ondulación por sustracción y costuras longitudinales (pequeños "cordones")
+wave_cuts = []
 for i in range(P["insul_wave_freq"]):
     z = math.sin(i * math.pi / P["insul_wave_freq"]) * P["insul_wave_amp"]
-    cut = mk_box(ins_w, 0.10, 0.004, x=P["insul_from"] + ins_w/2.0, y=0, z=z, center=True)
-    wrap_band = wrap_band.cut(cut)
+    wave_cuts.append(mk_box(ins_w, 0.10, 0.004, x=P["insul_from"] + ins_w/2.0, y=0, z=z, center=True))
+wrap_band = cut_all(wrap_band, wave_cuts)
 
 # Costuras: dos líneas elevadas en Y
 seam_y = P["body_R"] * 0.92
@@ -1,6 +1,14 @@
 import FreeCAD as App
 import FreeCADGui as Gui
 import Part, math, random
+import os, sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
+from starsat import greebles
+from starsat.dish import parabola_dish as exact_dish, parabola_dish_polygon
 
 doc = App.newDocument("StarSat")
 
@@ -16,6 +24,7 @@ P = dict(
     panel_segments=3, panel_deploy_deg=35.0,
     # HGA
     dish_diameter=60.0, dish_depth=12.0, dish_thickness=1.2, boom_len=45.0,
+    dish_exact=True,  # plato con curva exacta (False: perfil poligonal)
     # Propulsores RCS
     thruster_h=12.0, thruster_r1=4.0, thruster_r2=1.6,
     # Parker-like
@@ -28,6 +37,7 @@ P = dict(
     hyper_ring_Do=140.0, hyper_ring_Di=100.0, hyper_ring_t=6.0, hyper_n=12, hyper_pcd=120.0,
     turret_r=8.0, turret_h=10.0, cannon_len=24.0, cannon_r=2.2,
     greeble_density=0.45,  # 0..1
+    greeble_mode="compound",  # "compound" (un objeto), "link" (App::Link de prototipos) u "objects" (uno por greeble)
     # Colores aproximados
     col_hull=(0.75,0.76,0.78),
     col_panel=(0.06,0.08,0.20),
@@ -91,15 +101,10 @@ def poly_prism(points, h):  # extrude along Z thickness h (centered)
     return T(solid, (0,0,-h/2.0))
 
 def parabola_dish(d, depth, t, steps=48):
-    rmax = d/2.0
-    a = depth/(rmax*rmax)
-    curve_in = [(r, a*r*r) for r in [rmax*i/steps for i in range(0, steps+1)]]
-    curve_out = [(r, a*r*r + t) for r in [rmax*i/steps for i in range(steps, -1, -1)]]
-    profile = [(0,0)] + curve_in + curve_out + [(0,t)]
-    pts = [App.Vector(x,0,z) for (x,z) in profile]
-    wire = Part.makePolygon(pts+[pts[0]])
-    face = Part.Face(wire)
-    return face.revolve(App.Vector(0,0,0), App.Vector(0,0,1), 360)
+    # Plato exacto (starsat.dish); steps sólo afecta al perfil poligonal
+    if P['dish_exact']:
+        return exact_dish(d, depth, t)
+    return parabola_dish_polygon(d, depth, t, steps)
 
 def polar(n, radius, start=0.0):
     for i in range(n):
@@ -257,21 +262,21 @@ make_turret("Turret_Bot", P['turret_r'], P['turret_h'], P['cannon_len'], P['cann
 # 5) GREEBLES (detallitos)
 # ---------------------------
 def rand(a,b): return a + (b-a)*random.random()
-def add_greeble_box(area_w, area_d, area_h, count, origin):
+def add_greeble_box(area_w, area_d, area_h, count, origin, specs):
     for i in range(count):
         w = rand(2.0, area_w*0.18); d = rand(2.0, area_d*0.18); h = rand(1.0, area_h*0.6)
         x = rand(-area_w/2.0, area_w/2.0 - w)
         y = rand(-area_d/2.0, area_d/2.0 - d)
         z = rand(-area_h/2.0, area_h/2.0)
-        b = centered_box(w,d,h)
-        b = T(b, (x+w/2.0, y+d/2.0, area_h/2.0 + h/2.0))
-        b = T(b, origin)
-        add_obj(b, f"Greeble_{random.randint(0,99999)}", P['col_greeble'], g_gree)
+        base = (x + origin[0], y + origin[1], area_h/2.0 + origin[2])
+        specs.append((f"Greeble_{random.randint(0,99999)}", [("box", base, (w, d, h))]))
 
 # densidad en caras superior/trasera del bus
 dens = P['greeble_density']
-add_greeble_box(P['bus_w'], P['bus_d'], 2.0, int(20*dens), (0,0,P['bus_h']/2.0))
-add_greeble_box(P['bus_w'], P['bus_d'], 2.0, int(14*dens), (0,0,-P['bus_h']/2.0))
+greeble_specs = []
+add_greeble_box(P['bus_w'], P['bus_d'], 2.0, int(20*dens), (0,0,P['bus_h']/2.0), greeble_specs)
+add_greeble_box(P['bus_w'], P['bus_d'], 2.0, int(14*dens), (0,0,-P['bus_h']/2.0), greeble_specs)
+greebles.emit(doc, greeble_specs, P['greeble_mode'], "Greebles_Bus", P['col_greeble'], g_gree)
 
 # ---------------------------
 # 6) ACOPLAMIENTOS ADICIONALES
@@ -1,13 +1,27 @@
-RadiationBlackCapsuleShield.py
+# RadiationBlackCapsuleShield.py
 # High-T Capsule Collector – FreeCAD Macro
 # Cápsula multilámina con TPS estilo Parker: C/C hot-face + aislamiento + casco estructural,
 # admisión estrecha-profunda, filtro de plasma, thruster iónico principal, radiadores curvos,
 # manifolds y piping. Incluye metadatos de materiales y Tmax. Exporta STEP AP214.
 
 import math
+import os, sys
 import FreeCAD as App
 import Part
 
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
+from starsat.cache import cached_builder
+from starsat import patterns
+from starsat.dish import paraboloid_solid, paraboloid_polygon
+from starsat import materials
+from starsat import viewfactor
+from starsat import thermal
+from starsat import primitives as prim
+
 # ===================== Parámetros (mm) y diseño térmico =====================
 # Geometría base (alargada)
 caps_rad      = 105.0      # radio externo
@@ -25,6 +39,7 @@ intake_d         = 120.0
 intake_depth     = 130.0
 intake_wall_hot  = 3.0     # hot-face cúpula
 intake_wall_ins  = 10.0    # aislamiento cúpula
+dish_exact       = True    # paraboloides con curva exacta (False: perfil poligonal de 'steps' puntos)
 intake_lip_r     = 2.2     # toro de labio (C/C)
 cond_disc_t      = 2.2
 cond_disc_pitch  = 18.0
@@ -52,6 +67,8 @@ rad_gap_from_hull = 10.0
 rad_radial_t    = 6.0
 rad_len_x       = 280.0
 rad_n_panels    = 2   # 1=±Y, 2=±Y y ±Z
+viewfactor_rays = 0   # >0: factores de forma radiadores/casco/espacio (rayos por superficie)
+thermal_loads   = None  # {pieza: W}, p.ej. {"Shell_HotFace": 3000.0}: red térmica nodal y piezas sobre TmaxC
 
 # Manifolds y tubería
 manifold_r_tube  = 6.0
@@ -81,6 +98,9 @@ def place_shape(shape, pos=App.Vector(0,0,0), rot_axis=App.Vector(0,1,0), rot_de
     sh.Placement = pl
     return sh
 
+# (objeto, material) pendientes; main() los asigna de una vez con starsat.materials
+MAT_PAIRS = []
+
 def add_part(doc, shape, name, color=(0.8,0.8,0.8), transparency=0, mat=None):
     if shape is None: return None
     obj = doc.addObject("Part::Feature", name)
@@ -90,38 +110,16 @@ def add_part(doc, shape, name, color=(0.8,0.8,0.8), transparency=0, mat=None):
         obj.ViewObject.Transparency = int(max(0, min(100, round(transparency*100))))
     except Exception:
         pass
-    # Metadatos de material
+    # Metadatos de material (name, TmaxC, notes)
     if mat:
-        try:
-            obj.addProperty("App::PropertyString","Material").Material = mat.get("name","")
-            obj.addProperty("App::PropertyString","MaterialNotes").MaterialNotes = mat.get("notes","")
-            obj.addProperty("App::PropertyInteger","TmaxC").TmaxC = int(mat.get("TmaxC",0))
-        except Exception:
-            pass
+        MAT_PAIRS.append((obj, mat))
     return obj
 
 def make_revolved_solid_from_diameter(d, depth, steps=128, z0_eps_factor=1.0):
-    if d <= 0 or depth <= 0:
-        return None
-    f = (d*d) / (16.0*depth)
-    def r(z): return math.sqrt(max(0.0, 4.0*f*z))
-    steps = max(48, int(steps))
-    z0 = depth / (steps * z0_eps_factor)
-    p_axis_bot = App.Vector(0, 0, z0)
-    p_axis_top = App.Vector(0, 0, depth)
-    e_axis = Part.makeLine(p_axis_bot, p_axis_top)
-    p_top_out = App.Vector(r(depth), 0, depth)
-    e_top = Part.makeLine(p_axis_top, p_top_out)
-    outer_pts = []
-    for i in range(steps+1):
-        z = depth - (depth - z0) * (i/steps)
-        outer_pts.append(App.Vector(r(z), 0, z))
-    e_curve = Part.makePolygon(outer_pts)
-    p_bot_out = outer_pts[-1]
-    e_bot = Part.makeLine(p_bot_out, p_axis_bot)
-    wire = Part.Wire([e_axis, e_top, e_curve, e_bot])
-    face = Part.Face(wire)
-    return face.revolve(App.Vector(0,0,0), App.Vector(0,0,1), 360)
+    # Paraboloide exacto (starsat.dish); steps sólo afecta al perfil poligonal
+    if dish_exact:
+        return paraboloid_solid(d, depth)
+    return paraboloid_polygon(d, depth, steps, 48, z0_eps_factor)
 
 def make_shell_from_revolve(d, depth, t, steps=128):
     outer = make_revolved_solid_from_diameter(d, depth, steps)
@@ -130,9 +128,7 @@ def make_shell_from_revolve(d, depth, t, steps=128):
     return outer.cut(inner)
 
 def make_ring(r_outer, r_inner, h):
-    outer = Part.makeCylinder(r_outer, h)
-    inner = Part.makeCylinder(r_inner, h)
-    return outer.cut(inner)
+    return prim.tube(r_outer, r_inner, h)
 
 def make_capsule_body(R):
     # Cuerpo cilíndrico + hemisferios
@@ -156,22 +152,20 @@ def make_capsule_layer(R_outer, thickness):
 def add_standoffs_ring(doc, x_pos, R_from, R_to, n=8, r=2.4, color=(0.75,0.75,0.78), mat=None):
     objs=[]
     L = abs(R_to - R_from)
-    for a in range(n):
-        ang = a*(360.0/n)
-        y = R_from*math.cos(math.radians(ang))
-        z = R_from*math.sin(math.radians(ang))
-        axis = App.Vector(0, math.cos(math.radians(ang)), math.sin(math.radians(ang)))
-        st = Part.makeCylinder(r, L, App.Vector(x_pos, y, z), axis)
+    # Separador semilla a 0° (radial en +Y), copiado alrededor del eje X
+    seed = Part.makeCylinder(r, L, App.Vector(x_pos, R_from, 0), App.Vector(0,1,0))
+    for a, st in enumerate(patterns.polar(seed, n, axis=(1,0,0), result="list")):
         objs.append(add_part(doc, st, f"Standoff_{int(x_pos)}_{a}", color=color, transparency=0, mat=mat))
     return objs
 
 # ===================== Subconjuntos (con materiales) =====================
+@cached_builder(pending=MAT_PAIRS)
 def build_capsule_multilayer(doc):
     objs = []
     # Capa 1: Hot-face (C/C)
     hot = make_capsule_layer(caps_rad, t_hotface)
     o1 = add_part(doc, hot, "Shell_HotFace", color=(0.15,0.15,0.16), transparency=0,
-                  mat={"name":"Carbon-Carbon (C/C)", "TmaxC":Tmax_hotface, "notes":"Hot-face TPS; ablativo/RCG opcional"})
+                  mat={"name":"Carbon-Carbon (C/C)", "emissivity":0.8, "TmaxC":Tmax_hotface, "notes":"Hot-face TPS; ablativo/RCG opcional"})
     objs.append(o1)
     # Capa 2: Aislamiento (Aerogel / Carbon foam)
     ins = make_capsule_layer(caps_rad - t_hotface, t_insul)
@@ -194,6 +188,7 @@ def build_capsule_multilayer(doc):
                              mat={"name":"Ti-6Al-4V", "TmaxC":450, "notes":"Anillo de rigidez"}))
     return objs
 
+@cached_builder(pending=MAT_PAIRS)
 def build_intake_TPS(doc):
     objs=[]
     nose_x = +caps_cyl_len/2.0
@@ -283,7 +278,7 @@ def build_curved_radiators(doc):
     R_in  = R_out - rad_radial_t
     sector_face = make_annular_sector_face(R_out, R_in, rad_angle_deg, nseg=72)
     panel = sector_face.extrude(App.Vector(rad_len_x, 0, 0)); panel.translate(App.Vector(-rad_len_x/2.0, 0, 0))
-    matRad = {"name":"C/C aletas + heatpipes Mo/Re", "TmaxC":900, "notes":"Radiador curvo alta T"}
+    matRad = {"name":"C/C aletas + heatpipes Mo/Re", "emissivity":0.85, "TmaxC":900, "notes":"Radiador curvo alta T"}
 
     pY = add_part(doc, panel, "Radiator_PosY", color=(0.78,0.80,0.84), transparency=0, mat=matRad)
     nY = add_part(doc, place_shape(panel, rot_axis=App.Vector(1,0,0), rot_deg=180), "Radiator_NegY", color=(0.78,0.80,0.84), transparency=0, mat=matRad)
@@ -349,7 +344,17 @@ def main():
     objs += build_manifolds_and_pipes(doc)
     objs += build_tanks_and_pumps(doc)
 
+    materials.attach(MAT_PAIRS)
+    del MAT_PAIRS[:]
     doc.recompute()
+    if viewfactor_rays or thermal_loads:
+        # Radiadores frente al casco caliente y al espacio
+        surf = [o for o in objs if o is not None and (o.Name.startswith("Radiator_") or o.Name == "Shell_HotFace")]
+        vf = viewfactor.compute(surf, rays=viewfactor_rays or 20000, jobs=0)
+        viewfactor.report(vf, viewfactor.emissivities(surf))
+        if thermal_loads:
+            net = thermal.network([o for o in objs if o is not None], vf=vf)
+            thermal.report(thermal.steady(net, loads=thermal_loads))
     try:
         Part.export([o for o in objs if o is not None], export_path)
         App.Console.PrintMessage("STEP exportado a: %s\n" % export_path)
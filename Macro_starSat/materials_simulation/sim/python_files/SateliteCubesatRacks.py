@@ -1,8 +1,20 @@
 
 import math
+import os, sys
 import FreeCAD as App
 import Part
 
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
+from starsat import patterns
+from starsat.booleans import cut_all
+from starsat.profiling import note_failure
+from starsat.dish import paraboloid_solid, paraboloid_polygon
+from starsat import primitives as prim
+
 # ===================== Parámetros (mm) =====================
 # Bus principal
 p_bus_w = 160.0
@@ -52,6 +64,7 @@ whip_r   = 0.9
 back_dish_d      = 130.0
 back_dish_depth  = 28.0
 steps_profile    = 84
+dish_exact       = True   # plato con curva exacta (False: perfil poligonal de steps_profile puntos)
 t_bumper_ring    = 1.4
 boom_len_back = 95.0
 boom_r        = 1.8
@@ -83,33 +96,11 @@ export_path = App.getUserAppDataDir() + "Satellite_Complex.step"
 export_as_single_compound = False
 
 # ===================== Funciones utilitarias =====================
-def parabola_r(z, d, depth):
-    if depth <= 0: return 0.0
-    f = (d*d) / (16.0*depth)
-    val = 4.0*f*z
-    return math.sqrt(val) if val > 0 else 0.0
-
 def make_revolved_solid_from_diameter(d, depth, steps=72, z0_eps_factor=1.0):
-    if d <= 0 or depth <= 0: return None
-    steps = max(24, int(steps))
-    z0 = depth / (steps * z0_eps_factor)
-    p_axis_bot = App.Vector(0,0,z0)
-    p_axis_top = App.Vector(0,0,depth)
-    e_axis = Part.makeLine(p_axis_bot, p_axis_top)
-    r_max = parabola_r(depth, d, depth)
-    p_top_out = App.Vector(r_max, 0, depth)
-    e_top = Part.makeLine(p_axis_top, p_top_out)
-    outer_pts = []
-    for i in range(steps+1):
-        z = depth - (depth - z0) * (i/steps)
-        r = parabola_r(z, d, depth)
-        outer_pts.append(App.Vector(r,0,z))
-    e_curve = Part.makePolygon(outer_pts)
-    p_bot_out = outer_pts[-1]
-    e_bot = Part.makeLine(p_bot_out, p_axis_bot)
-    wire = Part.Wire([e_axis, e_top, e_curve, e_bot])
-    face = Part.Face(wire)
-    return face.revolve(App.Vector(0,0,0), App.Vector(0,0,1), 360)
+    # Paraboloide exacto (starsat.dish); steps sólo afecta al perfil poligonal
+    if dish_exact:
+        return paraboloid_solid(d, depth)
+    return paraboloid_polygon(d, depth, steps, 24, z0_eps_factor)
 
 def make_dish_layer_solid(d, depth, t, steps=72):
     outer = make_revolved_solid_from_diameter(d, depth, steps)
@@ -119,7 +110,7 @@ def make_dish_layer_solid(d, depth, t, steps=72):
     return outer.cut(inner)
 
 def make_ring(r_outer, r_inner, h, base=App.Vector(0,0,0), axis=App.Vector(1,0,0)):
-    return Part.makeCylinder(r_outer, h, base, axis).cut(Part.makeCylinder(r_inner, h, base, axis))
+    return prim.tube(r_outer, r_inner, h, base, axis)
 
 def place_shape(shape, pos=App.Vector(0,0,0), rot_axis=App.Vector(0,1,0), rot_deg=0):
     sh = shape.copy()
@@ -158,12 +149,14 @@ def fuse_safely(shapes):
     acc = shapes[0]
     for s in shapes[1:]:
         try: acc = acc.fuse(s)
-        except Exception: pass
+        except Exception as e: note_failure("fuse_safely", e)
     return acc
 
 def cut_safely(a, b):
     try: return a.cut(b)
-    except Exception: return a
+    except Exception as e:
+        note_failure("cut_safely", e)
+        return a
 
 # ===================== Bus estructural =====================
 def build_bus(doc):
@@ -257,12 +250,10 @@ def build_side_curtain(doc):
     # Segmentación: ranuras tangenciales
     slit_len = shield_rad_len + 2.0
     slab_h = 2.2 * r_outer
-    for i in range(shield_seg_count):
-        ang = 360.0 * i / shield_seg_count
-        slot = Part.makeBox(slit_len, shield_slot_w, slab_h,
-                            App.Vector(x_base - shield_rad_len, -shield_slot_w/2.0, -slab_h/2.0))
-        slot = place_shape(slot, rot_axis=App.Vector(1,0,0), rot_deg=ang)
-        ring = cut_safely(ring, slot)
+    slot = Part.makeBox(slit_len, shield_slot_w, slab_h,
+                        App.Vector(x_base - shield_rad_len, -shield_slot_w/2.0, -slab_h/2.0))
+    # Las shield_seg_count ranuras en una sola booleana
+    ring = cut_all(ring, patterns.polar(slot, shield_seg_count, axis=(1,0,0), result="list"))
     objs.append(add_part(doc, ring, "SideCurtain", color=(0.55,0.58,0.62), transparency=0.25))
     # Puntales de soporte desde caras ±Y de bus a la cortina
     for j in range(shield_support_rods):
@@ -386,19 +377,18 @@ def build_ion_ring(doc):
     # Aro soporte
     ring = make_ring(ion_ring_R+6.0, ion_ring_R-6.0, 3.0, base=App.Vector(x0-3.0, 0, 0), axis=App.Vector(1,0,0))
     objs.append(add_part(doc, ring, "IonSupportRing", color=(0.55,0.6,0.65)))
-    for i in range(ion_count):
-        ang = 2*math.pi*i/ion_count
-        y = ion_ring_R*math.cos(ang)
-        z = ion_ring_R*math.sin(ang)
-        body = Part.makeCylinder(ion_body_r, ion_body_L, App.Vector(x0-ion_body_L, y, z), App.Vector(1,0,0))
-        grid_o = Part.makeCylinder(ion_grid_r_o, ion_grid_t, App.Vector(x0, y, z), App.Vector(1,0,0))
-        grid_i = Part.makeCylinder(ion_grid_r_i, ion_grid_t, App.Vector(x0, y, z), App.Vector(1,0,0))
-        grid = cut_safely(grid_o, grid_i)
-        noz  = Part.makeCone(ion_nozzle_r1, ion_nozzle_r2, ion_nozzle_L, App.Vector(x0-ion_body_L-ion_nozzle_L, y, z), App.Vector(1,0,0))
+    # Propulsor semilla en ang=0 (y=R, z=0): una sola booleana de rejilla para todo el anillo
+    body = Part.makeCylinder(ion_body_r, ion_body_L, App.Vector(x0-ion_body_L, ion_ring_R, 0), App.Vector(1,0,0))
+    grid_o = Part.makeCylinder(ion_grid_r_o, ion_grid_t, App.Vector(x0, ion_ring_R, 0), App.Vector(1,0,0))
+    grid_i = Part.makeCylinder(ion_grid_r_i, ion_grid_t, App.Vector(x0, ion_ring_R, 0), App.Vector(1,0,0))
+    grid = cut_safely(grid_o, grid_i)
+    noz  = Part.makeCone(ion_nozzle_r1, ion_nozzle_r2, ion_nozzle_L, App.Vector(x0-ion_body_L-ion_nozzle_L, ion_ring_R, 0), App.Vector(1,0,0))
+    ring_pl = patterns.polar_placements(ion_count, axis=(1,0,0))
+    for i, (b_i, g_i, n_i) in enumerate(zip(*[patterns.instances(s, ring_pl) for s in (body, grid, noz)])):
         objs += [
-            add_part(doc, body, f"IonBody_{i}", color=(0.52,0.55,0.6)),
-            add_part(doc, grid, f"IonGrid_{i}", color=(0.62,0.65,0.7)),
-            add_part(doc, noz,  f"IonNoz_{i}",  color=(0.45,0.48,0.52)),
+            add_part(doc, b_i, f"IonBody_{i}", color=(0.52,0.55,0.6)),
+            add_part(doc, g_i, f"IonGrid_{i}", color=(0.62,0.65,0.7)),
+            add_part(doc, n_i,  f"IonNoz_{i}",  color=(0.45,0.48,0.52)),
         ]
     return objs
 
@@ -1,4 +1,11 @@
 import FreeCAD as App, FreeCADGui as Gui, Part, math
+import os, sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
+from starsat.profiling import note_failure
 
 DOC_NAME = "ParkerProbe_Printable"
 if App.ActiveDocument is None or App.ActiveDocument.Label != DOC_NAME:
@@ -49,7 +56,8 @@ def add_obj(shape,label,color=(0.70,0.70,0.72)):
     except:pass;return o
 def safe_fillet(shape,r):
     try:return shape.makeFillet(r,shape.Edges)
-    except:return shape
+    except Exception as e:
+        note_failure("safe_fillet",e);return shape
 def make_cyl_x(d,L,cx=0,cy=0,cz=0):
     c=Part.makeCylinder(d/2.0,L)
     c.Placement=App.Placement(App.Vector(cx-L/2.0,cy,cz),rot_to_x());return c
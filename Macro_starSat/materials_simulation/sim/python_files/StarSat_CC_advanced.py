@@ -1,6 +1,12 @@
 # StarSat_CC_Advanced — Satélite / nave modular con capas Carbon‑Carbon, ablativos y protección radiológica con blindaje fuerte
 
 import FreeCAD as App, FreeCADGui as Gui, Part, math, random
+import os, sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
 doc = App.newDocument("StarSat_CC_Advanced")
 
 # ---------------------------
@@ -18,10 +24,17 @@ P = dict(
     hyper_ring_Do=210.0, hyper_ring_Di=150.0, hyper_ring_t=9.0,
     panel_len=270.0, panel_w=75.0, panel_t=3.0, panel_segments=3, panel_deploy_deg=35.0, panel_roll_deg=6.0,
     dish_diameter=90.0, dish_depth=18.0, dish_thickness=1.8, boom_len=67.5,
+    dish_exact=True,  # plato con curva exacta (False: perfil poligonal)
     thruster_h=18.0, thruster_r1=6.0, thruster_r2=2.4,
     turret_r=12.0, turret_h=15.0, cannon_len=36.0, cannon_r=3.3,
     turret_positions=[(15.0,27.0,"top"),(-15.0,-27.0,"top"),(-30.0,0.0,"bot")],
     greeble_density=0.45, greeble_h=(1.8,6.0), greeble_a=(1.8,9.0),
+    greeble_mode="compound",  # "compound" (un objeto), "link" (App::Link de prototipos) u "objects" (uno por greeble)
+    massprops=True,  # informe masa / CdG / inercia por grupo (JSON + CSV, starsat.massprops)
+    shielding_rays=0,  # >0: densidad superficial (g/cm²) vista desde dose_points (starsat.shielding)
+    dose_points=[("Crew", (0.0, 0.0, 0.0))],
+    thermal_loads=None,  # {objeto: W}, p.ej. {"Heatpipe": 150.0}: red térmica nodal (starsat.thermal) y piezas sobre Tmax
+    thermal_vf_rays=20000,  # rayos por superficie para los factores de forma radiador/piel
     # Carbon-Carbon / ablative specifics (informational)
     cc_density_g_cm3=1.87,  # g/cm3 -> 1870 kg/m3
     cc_Tmax=2500.0,         # °C
@@ -35,105 +48,31 @@ P = dict(
 random.seed(42)
 
 # ---------------------------
-# MATERIAL DB (informativo)
-# densities in kg/m3, emissivity, k (W/mK), thermoelastic: E (GPa), nu, CTE (1/K)
+# MATERIALES: registro común en starsat.materials (C_C_3D_CVI, C_C_PITCH, AL7075, POLY, MLI...)
 # ---------------------------
-MATS = {
-    "C_C_3D_CVI": {"name":"C/C_3D_CVI","density":1870.0,"emissivity":0.65,"k":40.0,"Tmax":2500.0,"E":150.0,"nu":0.15,"CTE":1e-6},
-    "C_C_PITCH": {"name":"C/C_PITCH","density":1900.0,"emissivity":0.70,"k":45.0,"Tmax":2500.0,"E":120.0,"nu":0.18,"CTE":2e-6},
-    "ABLATOR_PICA": {"name":"PICA_like","density":320.0,"emissivity":0.88,"k":0.12,"Tmax":1800.0,"E":0.5,"nu":0.3,"CTE":1e-4},
-    "MLI": {"name":"MLI","density":1420.0,"emissivity":0.02,"k":0.02,"E":0.1,"nu":0.35,"CTE":5e-5},
-    "AL7075": {"name":"Al_7075","density":2700.0,"emissivity":0.09,"k":130.0,"E":71.0,"nu":0.33,"CTE":23e-6},
-    "POLY": {"name":"Polyethylene","density":950.0,"emissivity":0.9,"k":0.42,"E":1.0,"nu":0.4,"CTE":200e-6},
-    "TUNGSTEN": {"name":"Tungsten","density":19300.0,"emissivity":0.35,"k":173.0,"Tmax":3422.0,"E":411.0,"nu":0.28,"CTE":4.5e-6},
-    "BORON_CARBIDE": {"name":"B4C","density":2520.0,"emissivity":0.85,"k":30.0,"Tmax":2450.0,"E":460.0,"nu":0.17,"CTE":4.5e-6},
-    "NEXTEL": {"name":"Nextel_Af700","density":3200.0,"emissivity":0.85,"k":0.5,"Tmax":1200.0,"E":150.0,"nu":0.25,"CTE":3e-6}
-}
 
 # ---------------------------
 # HELPERS GEOMÉTRICOS Y MATERIALES
 # ---------------------------
-def add_obj(shape, name, color=None, group=None, alpha=0.0):
-    o = doc.addObject("Part::Feature", name)
-    o.Shape = shape
-    try:
-        if color: o.ViewObject.ShapeColor = color
-        o.ViewObject.Transparency = int(alpha*100)
-    except Exception:
-        pass
-    if group:
-        try: group.addObject(o)
-        except Exception: pass
-    return o
+from starsat.primitives import add_obj, T, R, centered_box, cyl, cone, ring, poly_prism
+from starsat import greebles
+from starsat import materials
+from starsat import massprops
+from starsat import shielding
+from starsat import thermal, viewfactor
+from starsat.dish import parabola_dish as exact_dish, parabola_dish_polygon
 
-def tag_material_props(o, matname, density=None, emissivity=None, k=None, Tmax=None, E=None, nu=None, CTE=None):
-    try:
-        if not hasattr(o, "Material"): o.addProperty("App::PropertyString","Material","Meta","Material")
-        o.Material = str(matname)
-        if density is not None and not hasattr(o, "Density"):
-            o.addProperty("App::PropertyFloat","Density","Meta","Density"); o.Density = float(density)
-        if emissivity is not None and not hasattr(o, "Emissivity"):
-            o.addProperty("App::PropertyFloat","Emissivity","Meta","Emissivity"); o.Emissivity = float(emissivity)
-        if k is not None and not hasattr(o, "ThermalConductivity"):
-            o.addProperty("App::PropertyFloat","ThermalConductivity","Meta","ThermalConductivity"); o.ThermalConductivity = float(k)
-        if Tmax is not None and not hasattr(o, "Tmax"):
-            o.addProperty("App::PropertyFloat","Tmax","Meta","Tmax"); o.Tmax = float(Tmax)
-        if E is not None and not hasattr(o, "YoungsModulus"):
-            o.addProperty("App::PropertyFloat","YoungsModulus","Meta","Young's Modulus (GPa)"); o.YoungsModulus = float(E)
-        if nu is not None and not hasattr(o, "PoissonsRatio"):
-            o.addProperty("App::PropertyFloat","PoissonsRatio","Meta","Poisson's Ratio"); o.PoissonsRatio = float(nu)
-        if CTE is not None and not hasattr(o, "ThermalExpansionCoeff"):
-            o.addProperty("App::PropertyFloat","ThermalExpansionCoeff","Meta","CTE (1/K)"); o.ThermalExpansionCoeff = float(CTE)
-    except Exception:
-        pass
-
-def T(shape, v):
-    m = App.Matrix(); m.move(App.Vector(*v)); return shape.transformGeometry(m)
-
-def R(shape, axis, ang, center=(0,0,0)):
-    return shape.rotate(App.Vector(*center), App.Vector(*axis), ang)
-
-def centered_box(w,d,h):
-    return T(Part.makeBox(w,d,h), (-w/2.0,-d/2.0,-h/2.0))
-
-def cyl(h, r, axis='Z', center=False):
-    c = Part.makeCylinder(r, h)
-    if axis=='X': c = R(c,(0,1,0),90)
-    if axis=='Y': c = R(c,(1,0,0),90)
-    if center:
-        if axis=='Z': c = T(c,(0,0,-h/2))
-        if axis=='X': c = T(c,(-h/2,0,0))
-        if axis=='Y': c = T(c,(0,-h/2,0))
-    return c
-
-def cone(r1,r2,h,axis='Z',center=False):
-    c = Part.makeCone(r1,r2,h)
-    if axis=='X': c = R(c,(0,1,0),90)
-    if axis=='Y': c = R(c,(1,0,0),90)
-    if center:
-        if axis=='Z': c = T(c,(0,0,-h/2))
-        if axis=='X': c = T(c,(-h/2,0,0))
-        if axis=='Y': c = T(c,(0,-h/2,0))
-    return c
-
-def ring(h, Do, Di, axis='Z', center=False):
-    outer = cyl(h, Do/2.0, axis=axis, center=center)
-    inner = cyl(h+0.2, Di/2.0, axis=axis, center=center)
-    return outer.cut(inner)
-
-def poly_prism(points, h):
-    wire = Part.makePolygon([App.Vector(x,y,0) for (x,y) in points] + [App.Vector(points[0][0],points[0][1],0)])
-    face = Part.Face(wire); solid = face.extrude(App.Vector(0,0,h))
-    return T(solid, (0,0,-h/2.0))
+MAT_PAIRS = []
+
+def tag_material(o, mat):
+    # Clave de starsat.materials o dict en línea; se asignan todos juntos tras build_starsat
+    MAT_PAIRS.append((o, mat))
 
 def parabola_dish(d, depth, t, steps=48):
-    rmax = d/2.0; a = depth/(rmax*rmax)
-    curve_in = [(r, a*r*r) for r in [rmax*i/steps for i in range(0, steps+1)]]
-    curve_out = [(r, a*r*r + t) for r in [rmax*i/steps for i in range(steps, -1, -1)]]
-    profile = [(0,0)] + curve_in + curve_out + [(0,t)]
-    pts = [App.Vector(x,0,z) for (x,z) in profile]
-    wire = Part.makePolygon(pts+[pts[0]]); face = Part.Face(wire)
-    return face.revolve(App.Vector(0,0,0), App.Vector(0,0,1), 360)
+    # Plato exacto (starsat.dish); steps sólo afecta al perfil poligonal
+    if P['dish_exact']:
+        return exact_dish(d, depth, t)
+    return parabola_dish_polygon(d, depth, t, steps)
 
 def rect_face_yz(hy, hz):
     pts = [App.Vector(0,-hy,-hz), App.Vector(0,hy,-hz), App.Vector(0,hy,hz), App.Vector(0,-hy,hz), App.Vector(0,-hy,-hz)]
@@ -177,7 +116,7 @@ def make_deck_and_hull():
     hull = Part.makeCompound([prow, stern, deck])
     hull_o = add_obj(hull, "Ship_Hull", P['col_hull'], g_ship)
     # tag hull layers: outer C/C skin (informative property)
-    tag_material_props(hull_o, MATS["C_C_3D_CVI"]["name"], density=MATS["C_C_3D_CVI"]["density"], emissivity=MATS["C_C_3D_CVI"]["emissivity"], k=MATS["C_C_3D_CVI"]["k"], Tmax=MATS["C_C_3D_CVI"]["Tmax"], E=MATS["C_C_3D_CVI"]["E"], nu=MATS["C_C_3D_CVI"]["nu"], CTE=MATS["C_C_3D_CVI"]["CTE"])
+    tag_material(hull_o, "C_C_3D_CVI")
     return hull_o
 
 def make_fins():
@@ -255,12 +194,12 @@ def make_cc_reinforcements():
     rib = centered_box(rib_w, rib_d, rib_h)
     rib = T(rib, (0, 0, 0))
     rib_o = add_obj(rib, "CC_Internal_Rib", P['col_hull'], g_int)
-    tag_material_props(rib_o, MATS["C_C_PITCH"]["name"], density=MATS["C_C_PITCH"]["density"], emissivity=MATS["C_C_PITCH"]["emissivity"], k=MATS["C_C_PITCH"]["k"], Tmax=MATS["C_C_PITCH"]["Tmax"], E=MATS["C_C_PITCH"]["E"], nu=MATS["C_C_PITCH"]["nu"], CTE=MATS["C_C_PITCH"]["CTE"])
+    tag_material(rib_o, "C_C_PITCH")
     # Add cross ribs
     cross_rib = centered_box(rib_d, rib_w, rib_h)
     cross_rib = T(cross_rib, (0, 0, 0))
     cross_o = add_obj(cross_rib, "CC_Cross_Rib", P['col_hull'], g_int)
-    tag_material_props(cross_o, MATS["C_C_PITCH"]["name"], density=MATS["C_C_PITCH"]["density"], emissivity=MATS["C_C_PITCH"]["emissivity"], k=MATS["C_C_PITCH"]["k"], Tmax=MATS["C_C_PITCH"]["Tmax"], E=MATS["C_C_PITCH"]["E"], nu=MATS["C_C_PITCH"]["nu"], CTE=MATS["C_C_PITCH"]["CTE"])
+    tag_material(cross_o, "C_C_PITCH")
 
 def make_honeycomb_shield():
     # Impact-resistant honeycomb panel
@@ -269,7 +208,7 @@ def make_honeycomb_shield():
     honeycomb = centered_box(hc_w, hc_d, hc_h)
     honeycomb = T(honeycomb, (0, P['bus_d']/2.0 + hc_d/2.0, 0))
     hc_o = add_obj(honeycomb, "Honeycomb_Shield", (0.0, 0.0, 0.0), g_shld)
-    tag_material_props(hc_o, MATS["C_C_3D_CVI"]["name"], density=MATS["C_C_3D_CVI"]["density"], emissivity=MATS["C_C_3D_CVI"]["emissivity"], k=MATS["C_C_3D_CVI"]["k"], Tmax=MATS["C_C_3D_CVI"]["Tmax"], E=MATS["C_C_3D_CVI"]["E"], nu=MATS["C_C_3D_CVI"]["nu"], CTE=MATS["C_C_3D_CVI"]["CTE"])
+    tag_material(hc_o, "C_C_3D_CVI")
 
 def make_whipple_shield():
     # Whipple shield for micrometeorite protection
@@ -277,13 +216,13 @@ def make_whipple_shield():
     bumper = centered_box(P['bus_w'] + 10.0, P['bus_d'] + 10.0, bumper_thk)
     bumper = T(bumper, (0, 0, P['bus_h']/2.0 + bumper_thk/2.0 + P['whipple_gap']))
     bumper_o = add_obj(bumper, "Whipple_Bumper", (0.0, 0.0, 0.0), g_shld)
-    tag_material_props(bumper_o, MATS["AL7075"]["name"], density=MATS["AL7075"]["density"], emissivity=MATS["AL7075"]["emissivity"], k=MATS["AL7075"]["k"])
+    tag_material(bumper_o, "AL7075")
     # Rear wall
     rear_thk = 2.0
     rear_wall = centered_box(P['bus_w'] + 5.0, P['bus_d'] + 5.0, rear_thk)
     rear_wall = T(rear_wall, (0, 0, P['bus_h']/2.0 + rear_thk/2.0))
     rear_o = add_obj(rear_wall, "Whipple_Rear_Wall", (0.0, 0.0, 0.0), g_shld)
-    tag_material_props(rear_o, MATS["AL7075"]["name"], density=MATS["AL7075"]["density"], emissivity=MATS["AL7075"]["emissivity"], k=MATS["AL7075"]["k"])
+    tag_material(rear_o, "AL7075")
 
 def make_armor_plating():
     # Heavy armor plating on sides
@@ -292,26 +231,26 @@ def make_armor_plating():
     front_armor = centered_box(armor_w, armor_d, armor_h)
     front_armor = T(front_armor, (P['bus_w']/2.0 + armor_d/2.0 + 10.0, 0, 0))
     front_o = add_obj(front_armor, "Front_Armor", (0.0, 0.0, 0.0), g_shld)
-    tag_material_props(front_o, MATS["TUNGSTEN"]["name"], density=MATS["TUNGSTEN"]["density"], emissivity=MATS["TUNGSTEN"]["emissivity"], k=MATS["TUNGSTEN"]["k"], Tmax=MATS["TUNGSTEN"]["Tmax"], E=MATS["TUNGSTEN"]["E"], nu=MATS["TUNGSTEN"]["nu"], CTE=MATS["TUNGSTEN"]["CTE"])
+    tag_material(front_o, "TUNGSTEN")
     # Side armors
     side_armor = centered_box(armor_d, P['bus_d'] + 20.0, armor_h)
     left_armor = T(side_armor, (-P['bus_w']/2.0 - armor_d/2.0 - 10.0, 0, 0))
     left_o = add_obj(left_armor, "Left_Armor", (0.0, 0.0, 0.0), g_shld)
-    tag_material_props(left_o, MATS["BORON_CARBIDE"]["name"], density=MATS["BORON_CARBIDE"]["density"], emissivity=MATS["BORON_CARBIDE"]["emissivity"], k=MATS["BORON_CARBIDE"]["k"], Tmax=MATS["BORON_CARBIDE"]["Tmax"], E=MATS["BORON_CARBIDE"]["E"], nu=MATS["BORON_CARBIDE"]["nu"], CTE=MATS["BORON_CARBIDE"]["CTE"])
+    tag_material(left_o, "BORON_CARBIDE")
     right_armor = T(side_armor, (P['bus_w']/2.0 + armor_d/2.0 + 10.0, 0, 0))
     right_o = add_obj(right_armor, "Right_Armor", (0.0, 0.0, 0.0), g_shld)
-    tag_material_props(right_o, MATS["BORON_CARBIDE"]["name"], density=MATS["BORON_CARBIDE"]["density"], emissivity=MATS["BORON_CARBIDE"]["emissivity"], k=MATS["BORON_CARBIDE"]["k"], Tmax=MATS["BORON_CARBIDE"]["Tmax"], E=MATS["BORON_CARBIDE"]["E"], nu=MATS["BORON_CARBIDE"]["nu"], CTE=MATS["BORON_CARBIDE"]["CTE"])
+    tag_material(right_o, "BORON_CARBIDE")
 
 def make_radiation_layers():
     # Additional polyethylene layers for radiation protection
     layer1 = centered_box(P['bus_w'] - 5.0, P['bus_d'] - 5.0, 0.2)
     layer1 = T(layer1, (0, 0, P['bus_h']/2.0 + 0.1))
     l1_o = add_obj(layer1, "PE_Layer1", (0.0, 0.0, 0.0), g_shld, alpha=0.6)
-    tag_material_props(l1_o, MATS["POLY"]["name"], density=MATS["POLY"]["density"], emissivity=MATS["POLY"]["emissivity"], k=MATS["POLY"]["k"])
+    tag_material(l1_o, "POLY")
     layer2 = centered_box(P['bus_w'] - 10.0, P['bus_d'] - 10.0, 0.2)
     layer2 = T(layer2, (0, 0, -P['bus_h']/2.0 - 0.1))
     l2_o = add_obj(layer2, "PE_Layer2", (0.0, 0.0, 0.0), g_shld, alpha=0.6)
-    tag_material_props(l2_o, MATS["POLY"]["name"], density=MATS["POLY"]["density"], emissivity=MATS["POLY"]["emissivity"], k=MATS["POLY"]["k"])
+    tag_material(l2_o, "POLY")
 
 def make_greebles():
     density = P['greeble_density']; 
@@ -319,16 +258,20 @@ def make_greebles():
     deck_len = P['bus_w']*P['hull_scale'] + P['prow_len'] + P['stern_len']; x_min = -deck_len/2.0 + 8.0; x_max = deck_len/2.0 - 8.0
     y_min = -P['bus_d']*0.35; y_max = P['bus_d']*0.35; z = P['bus_h']/2.0 + P['deck_thk']/2.0 + 0.6
     area = (x_max-x_min)*(y_max-y_min); n = int(area * 0.0025 * density)
+    # Mismos sorteos (seed 42) que antes; se vuelcan juntos con starsat.greebles
+    specs = []
     for i in range(n):
         w = random.uniform(*P['greeble_a']); d = random.uniform(*P['greeble_a'])*0.6; h = random.uniform(*P['greeble_h'])
         x = random.uniform(x_min,x_max); y = random.uniform(y_min,y_max)
         if abs(y) < 6.0 and abs(x) < 10.0: continue
-        g = centered_box(w,d,h); g = T(g,(x,y,z + h/2.0))
+        g = ("box", (x - w/2.0, y - d/2.0, z), (w, d, h))
         if random.random() < 0.25:
-            c = cyl(h*0.9, min(w,d)*0.35, axis='Z', center=True); c = T(c,(x + (w*0.15*(1 if random.random()<0.5 else -1)), y, z + h + h*0.45))
-            add_obj(Part.Compound([g,c]), f"GreebleCyl_{i}", P['col_greeble'], g_gree)
+            r = min(w,d)*0.35
+            c = ("cyl", (x + (w*0.15*(1 if random.random()<0.5 else -1)), y, z + h), (r, r, h*0.9))
+            specs.append((f"GreebleCyl_{i}", [g, c]))
         else:
-            add_obj(g, f"Greeble_{i}", P['col_greeble'], g_gree)
+            specs.append((f"Greeble_{i}", [g]))
+    greebles.emit(doc, specs, P['greeble_mode'], "Greebles_Deck", P['col_greeble'], g_gree)
 
 # ...existing code...
 def box(w,d,h, p=(0,0,0)): 
@@ -340,13 +283,13 @@ def build_radiators_and_heatpipes():
     radiator = centered_box(rad_len, rad_w, rad_t)
     radiator = T(radiator, (0, 0, -P['bus_h']/2.0 - rad_t/2.0 - 5.0))
     rad_o = add_obj(radiator, "Radiator_Panel", (0.0, 0.0, 0.0), g_therm)
-    tag_material_props(rad_o, MATS["AL7075"]["name"], density=MATS["AL7075"]["density"], emissivity=MATS["AL7075"]["emissivity"], k=MATS["AL7075"]["k"])
+    tag_material(rad_o, "AL7075")
     # Heatpipes: cylindrical tubes
     hp_len = P['bus_w'] * 0.8; hp_r = 1.5
     heatpipe = cyl(hp_len, hp_r, axis='X', center=True)
     heatpipe = T(heatpipe, (0, P['bus_d']/2.0 + hp_r + 2.0, 0))
     hp_o = add_obj(heatpipe, "Heatpipe", (0.0, 0.0, 0.0), g_therm)
-    tag_material_props(hp_o, MATS["AL7075"]["name"], density=MATS["AL7075"]["density"], emissivity=MATS["AL7075"]["emissivity"], k=MATS["AL7075"]["k"])
+    tag_material(hp_o, "AL7075")
     return True
 
 def build_storm_shelter():
@@ -354,7 +297,7 @@ def build_storm_shelter():
     shelter = centered_box(P['bus_w'] - 10.0, P['bus_d'] - 10.0, P['pe_shield_thk'])
     shelter = T(shelter, (0, 0, P['bus_h']/2.0 + P['pe_shield_thk']/2.0 + 2.0))
     shelter_o = add_obj(shelter, "PE_Storm_Shelter", (0.0, 0.0, 0.0), g_shld, alpha=0.5)
-    tag_material_props(shelter_o, MATS["POLY"]["name"], density=MATS["POLY"]["density"], emissivity=MATS["POLY"]["emissivity"], k=MATS["POLY"]["k"])
+    tag_material(shelter_o, "POLY")
     return True
 
 # ...existing code...
@@ -374,15 +317,15 @@ def build_shielding():
         # si falla la fusión por geometría, fallback: usar outer_shell para impresión
         skin_solid = outer_shell
     skin_o = add_obj(skin_solid, "CC_OuterSkin_Solid", (0.0,0.0,0.0), g_shld)
-    tag_material_props(skin_o, MATS["C_C_PITCH"]["name"], density=MATS["C_C_PITCH"]["density"], emissivity=MATS["C_C_PITCH"]["emissivity"], k=MATS["C_C_PITCH"]["k"], Tmax=MATS["C_C_PITCH"]["Tmax"])
+    tag_material(skin_o, "C_C_PITCH")
     # añadir MLI/GradedZ como marcas (propiedades) pero no cortan el sólido
     gz_plate = box(20.0, 10.0, 0.8, (P['bus_w']/2.0 + 5.0, -5.0, -4.0))
     gz_o = add_obj(gz_plate, "GradedZ_Patch_Marker", (0.0,0.0,0.0), g_shld)
-    tag_material_props(gz_o, "GradedZ", density=18000.0, emissivity=0.18, k=40.0)
+    tag_material(gz_o, {"name": "GradedZ", "density": 18000.0, "emissivity": 0.18, "k": 40.0})
     # MLI como placa ligera informativa (no huecos)
     mli = box(P['bus_w']-4.0, P['bus_d']-4.0, 0.5, (- (P['bus_w']-4.0)/2.0, - (P['bus_d']-4.0)/2.0, P['bus_h']/2.0 - 0.25))
     mli_o = add_obj(mli, "MLI_Blanket_Marker", (0.0,0.0,0.0),  g_shld, alpha=0.8)
-    tag_material_props(mli_o, MATS["MLI"]["name"], density=MATS["MLI"]["density"], emissivity=MATS["MLI"]["emissivity"], k=MATS["MLI"]["k"])
+    tag_material(mli_o, "MLI")
     # Add strong armor components
     make_whipple_shield()
     make_armor_plating()
@@ -406,7 +349,18 @@ def build_starsat(mode):
 # EXECUTE
 # ---------------------------
 build_starsat(P['mode'])
+materials.attach(MAT_PAIRS)
 doc.recompute()
+if P['massprops']:
+    massprops.write(massprops.report(doc), "StarSat_CC_advanced")
+if P['shielding_rays']:
+    shield_scene = shielding.tessellate(shielding.shield_objects(doc, group=g_shld))
+    for dose_name, dose_pt in P['dose_points']:
+        shielding.report(shielding.trace(shield_scene, dose_pt, rays=P['shielding_rays'], jobs=0), dose_name)
+if P['thermal_loads']:
+    vf = viewfactor.compute([doc.getObject("Radiator_Panel"), doc.getObject("CC_OuterSkin_Solid")],
+                            rays=P['thermal_vf_rays'], jobs=0)
+    thermal.report(thermal.steady(thermal.network(thermal.thermal_objects(doc), vf=vf), loads=P['thermal_loads']))
 
 # simple assembly warnings (bounded) - updated for larger size
 def simple_warning_report():
@@ -1,12 +1,16 @@
 import FreeCAD as App
 import Part
+import os, sys
+# Raíz del repositorio (la carpeta que contiene starsat/) en sys.path, subiendo desde la macro
+_root = os.path.dirname(os.path.abspath(__file__))
+while not os.path.isdir(os.path.join(_root, "starsat")) and os.path.dirname(_root) != _root:
+    _root = os.path.dirname(_root)
+sys.path.insert(0, _root)
+from starsat.fillets import fillet_edges, fillet_fuse
 
 def safe_fillet(shape, radius):
-    """Apply fillet to shape edges safely."""
-    try:
-        return shape.makeFillet(radius, shape.Edges)
-    except:
-        return shape
+    """Apply fillet to shape edges in small batches, skipping known failures."""
+    return fillet_edges(shape, radius)
 
 def rot_to_x():
     """Rotation to align along x-axis."""
@@ -23,16 +27,14 @@ def make_cockpit():
     base = Part.makeBox(800, 600, 400)
     visor = Part.makeCone(0, 300, 200)
     visor.Placement = App.Placement(App.Vector(400, 300, 400), App.Rotation(App.Vector(0, 1, 0), 90))
-    cockpit = base.fuse(visor)
-    return safe_fillet(cockpit, 12.0)
+    return fillet_fuse([base, visor], 12.0)
 
 def make_thruster_pair(cx, cy, cz):
     """Create vectorial thrusters like Sparrow."""
     nozzle = make_cone_x(300, 800, 600, cx, cy, cz)
     ring = Part.makeTorus(500, 60)
     ring.Placement = App.Placement(App.Vector(cx + 300, cy, cz), rot_to_x())
-    thruster = nozzle.fuse(ring)
-    return safe_fillet(thruster, 24.0)
+    return fillet_fuse([nozzle, ring], 24.0)
 
 def make_modular_panels(cx, cy, cz, count=6):
     """Create embedded modular panels."""
@@ -67,10 +69,7 @@ def make_solar_shield_layers(cx, cy, cz):
         layer = Part.makeCylinder(800 + i * 100, 50)
         layer.Placement = App.Placement(App.Vector(cx, cy, cz + i * 60), App.Rotation())
         layers.append(layer)
-    shield = layers[0]
-    for l in layers[1:]:
-        shield = shield.fuse(l)
-    return safe_fillet(shield, 10.0)
+    return fillet_fuse(layers, 10.0)
 
 def build_destiny_probe():
     """Build the complete Destiny-style solar probe."""
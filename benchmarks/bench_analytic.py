@@ -0,0 +1,56 @@
+# Benchmark de volumen/masa: integración de OCC vs. propiedades analíticas de starsat.primitives
+# Uso (FreeCAD importable o desde FreeCADCmd):
+#   python benchmarks/bench_analytic.py [--parts 2000] [--repeat 3]
+# Genera piezas de primitivas colocadas (cilindros, conos, cajas, toros,
+# anillos) y mide Shape.Volume + CenterOfMass + MatrixOfInertia frente a
+# primitives.analytic; imprime también el error relativo máximo del volumen.
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import FreeCAD as App
+from starsat import primitives as prim
+
+def parts(n):
+    makers = [lambda i: prim.cyl_x(40.0 + i % 7, 300.0, 60.0*i),
+              lambda i: prim.cone_x(80.0, 30.0 + i % 5, 120.0, 0.0, 60.0*i),
+              lambda i: prim.box_c(100.0, 50.0 + i % 3, 20.0, 0.0, 0.0, 60.0*i),
+              lambda i: prim.torus_x(120.0, 8.0 + i % 4, 60.0*i),
+              lambda i: prim.tube(50.0, 42.0 - i % 6, 200.0, App.Vector(0, 60.0*i, 0), App.Vector(1, 0, 0))]
+    return [makers[i % len(makers)](i) for i in range(n)]
+
+def occ(shapes):
+    return [(s.Volume, s.CenterOfMass, s.MatrixOfInertia) for s in shapes]
+
+def analytic(shapes):
+    return [prim.analytic(s) for s in shapes]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de propiedades analíticas de primitivas")
+    ap.add_argument("--parts", type=int, default=2000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args, _ = ap.parse_known_args(argv)
+
+    shapes = parts(args.parts)
+    err = max(abs(prim.analytic(s)["volume"] - s.Volume) / s.Volume for s in shapes)
+
+    print("%-10s %8s %10s %10s" % ("modo", "piezas", "t_min[ms]", "piezas/s"))
+    base = None
+    for label, fn in (("occ", occ), ("analytic", analytic)):
+        best = None
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            fn(shapes)
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        base = best if base is None else base
+        print("%-10s %8d %10.1f %10.0f   x%.2f" % (label, args.parts, 1e3*best, args.parts/best, base/best))
+    print("error relativo máximo de volumen: %.2e" % err)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Benchmark del BVH: construcción, carga mapeada y consultas por lotes frente a fuerza bruta
+# Uso (FreeCAD importable o desde FreeCADCmd):
+#   python benchmarks/bench_bvh.py [--objects 400] [--rays 100000] [--tol 1.0]
+# Crea una nave sintética de cilindros y cajas repartidos al azar, construye
+# el BVH, lo guarda y lo recarga con memmap, y mide rayos/s de first_hit,
+# any_hit y all_hits. La fuerza bruta (todos los rayos contra todos los
+# triángulos) se mide sobre una muestra y sirve de comprobación de first_hit.
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import FreeCAD as App
+from starsat import primitives as prim
+from starsat import bvh
+from starsat import shielding
+
+def make_doc(n, seed=7):
+    rnd = random.Random(seed)
+    doc = App.newDocument("BenchBVH")
+    for i in range(n):
+        c = [rnd.uniform(-3000.0, 3000.0) for _ in range(3)]
+        if i % 2:
+            s = prim.cyl_x(rnd.uniform(40.0, 300.0), rnd.uniform(100.0, 800.0), *c)
+        else:
+            s = prim.box_c(rnd.uniform(50.0, 400.0), rnd.uniform(50.0, 400.0), rnd.uniform(10.0, 200.0), *c)
+        prim.add_obj(s, "P%d" % i, doc=doc)
+    doc.recompute()
+    return doc
+
+def brute_first(b, O, D):
+    # Todos los rayos contra todos los triángulos (bloques de rayos)
+    out = np.full(len(D), np.inf)
+    tri = np.arange(len(b["v0"]))
+    for i in range(len(D)):
+        ok, t, _ = bvh._moller(b, np.broadcast_to(O, (len(tri), 3)), np.broadcast_to(D[i], (len(tri), 3)), tri, np.inf)
+        if ok.any():
+            out[i] = t[ok].min()
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark del BVH")
+    ap.add_argument("--objects", type=int, default=400)
+    ap.add_argument("--rays", type=int, default=100000)
+    ap.add_argument("--tol", type=float, default=1.0)
+    ap.add_argument("--sample", type=int, default=200)
+    args, _ = ap.parse_known_args(argv)
+
+    doc = make_doc(args.objects)
+    try:
+        objs = [o for o in doc.Objects if hasattr(o, "Shape")]
+        t0 = time.perf_counter(); tris = bvh.triangles(objs, args.tol); t_tess = time.perf_counter() - t0
+        b = bvh.build(tris); t_build = bvh.LAST_STATS["seconds"]
+        path = os.path.join(tempfile.mkdtemp(), "bench.bvh")
+        bvh.save(b, path)
+        m = bvh.load(path); t_load = bvh.LAST_STATS["seconds"]
+        print("triángulos %d, nodos %d: teselado %.2f s, construcción %.2f s, carga memmap %.4f s (%.1f MB)" % (
+            len(b["v0"]), len(b["lo"]), t_tess, t_build, t_load, os.path.getsize(path) / 1e6))
+
+        O = np.zeros(3)
+        D = shielding.directions(args.rays, seed=1)
+        print("%-10s %10s %8s %12s" % ("consulta", "rayos", "t[s]", "rayos/s"))
+        for label, fn in (("first_hit", bvh.first_hit), ("any_hit", bvh.any_hit), ("all_hits", bvh.all_hits)):
+            t0 = time.perf_counter(); r = fn(m, O, D); dt = time.perf_counter() - t0
+            print("%-10s %10d %8.2f %12.0f" % (label, args.rays, dt, args.rays / dt))
+        n = min(args.sample, args.rays)
+        t0 = time.perf_counter(); ref = brute_first(b, O, D[:n]); dt = time.perf_counter() - t0
+        got = bvh.first_hit(m, O, D[:n])["t"]
+        same = np.allclose(np.where(np.isinf(ref), -1.0, ref), np.where(np.isinf(got), -1.0, got))
+        print("%-10s %10d %8.2f %12.0f   first_hit coincide: %s" % ("bruta", n, dt, n / dt, same))
+    finally:
+        App.closeDocument(doc.Name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Benchmark de platos parabólicos: curva exacta (starsat.dish) vs. polilínea
+# Uso (FreeCAD importable o desde FreeCADCmd):
+#   python benchmarks/bench_dish.py [--repeat 3]
+# Para cada plato de las macros compara caras, volumen y tiempo de construcción,
+# y el tiempo de una booleana de ejemplo (vaciado del plato interior).
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from starsat import dish
+
+# (etiqueta, constructor exacto, constructor poligonal) con las cotas de cada macro
+CASES = [
+    ("RadiationBlack intake d120 (160 pasos)",
+     lambda: dish.paraboloid_solid(120.0, 130.0), lambda: dish.paraboloid_polygon(120.0, 130.0, 160)),
+    ("RadiationBlack tobera d180 (160 pasos)",
+     lambda: dish.paraboloid_solid(180.0, 120.0), lambda: dish.paraboloid_polygon(180.0, 120.0, 160)),
+    ("SateliteCubesatRacks plato trasero (84 pasos)",
+     lambda: dish.paraboloid_solid(130.0, 28.0), lambda: dish.paraboloid_polygon(130.0, 28.0, 84, min_steps=24)),
+    ("StarSat_CC_advanced / ModelToImprove antena (48 pasos)",
+     lambda: dish.parabola_dish(90.0, 18.0, 1.8), lambda: dish.parabola_dish_polygon(90.0, 18.0, 1.8, 48)),
+]
+
+def timed(build, repeat):
+    best, shape = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        shape = build()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, shape
+
+def shell_time(build, repeat):
+    # Coste de una booleana posterior: vaciar el sólido con una copia escalada
+    outer = build()
+    inner = outer.copy(); inner.scale(0.9)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        outer.cut(inner)
+    return (time.perf_counter() - t0) / repeat
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de platos parabólicos exactos vs. poligonales")
+    ap.add_argument("--repeat", type=int, default=3)
+    args, _ = ap.parse_known_args(argv)
+
+    print("%-55s %-9s %6s %14s %10s %10s" % ("caso", "perfil", "caras", "volumen[mm3]", "t_build[s]", "t_cut[s]"))
+    for label, exact, polygon in CASES:
+        shapes = {}
+        for kind, build in (("exacto", exact), ("poligonal", polygon)):
+            dt, shape = timed(build, args.repeat)
+            shapes[kind] = shape
+            print("%-55s %-9s %6d %14.1f %10.4f %10.4f" % (label, kind, len(shape.Faces), shape.Volume, dt, shell_time(build, args.repeat)))
+        dish.compare(label, shapes["exacto"], shapes["poligonal"])
+
+if __name__ == "__main__":
+    main()
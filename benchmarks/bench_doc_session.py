@@ -0,0 +1,61 @@
+# Benchmark de creación masiva de objetos: documento normal vs. starsat.session
+# Uso (FreeCAD importable o desde FreeCADCmd / consola de FreeCAD con GUI):
+#   python benchmarks/bench_doc_session.py [--objects 500] [--repeat 3]
+# Reproduce el patrón de DFD_GreyScale: make_cyl_x + set_mat (propiedades
+# Material, MaterialData, Density) con color, y mide objetos por segundo
+# incluido el recompute final. Con GUI la diferencia es mayor (cada ajuste de
+# ViewObject y cada transacción de deshacer se procesa al momento).
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import FreeCAD as App
+from starsat import primitives as prim
+from starsat import session
+
+MAT = {'name': 'AA-7075-T6', 'rho': 2810.0, 'E': 71.7e9, 'nu': 0.33, 'type': 'isotropic'}
+
+def set_mat(obj, m):
+    obj.addProperty("App::PropertyString", "Material", "Meta", "").Material = m['name']
+    obj.addProperty("App::PropertyMap", "MaterialData", "Meta", "").MaterialData = {k: str(v) for k, v in m.items()}
+    obj.addProperty("App::PropertyFloat", "Density", "Meta", "").Density = m['rho']
+
+def populate(doc, n):
+    for i in range(n):
+        o = prim.add_obj(prim.cyl_x(40.0, 300.0, 60.0*i, 0.0, 0.0), "Cyl_%d" % i, (0.6, 0.6, 0.6), doc=doc)
+        set_mat(o, MAT)
+
+def run(n, bulk):
+    doc = App.newDocument("BenchSession")
+    try:
+        t0 = time.perf_counter()
+        if bulk:
+            with session.bulk(doc):
+                populate(doc, n)
+        else:
+            populate(doc, n)
+            doc.recompute()
+        return time.perf_counter() - t0
+    finally:
+        App.closeDocument(doc.Name)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de creación masiva de objetos")
+    ap.add_argument("--objects", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=3)
+    args, _ = ap.parse_known_args(argv)
+
+    print("%-10s %8s %10s %10s" % ("modo", "objetos", "t_min[s]", "obj/s"))
+    base = None
+    for label, bulk in (("normal", False), ("session", True)):
+        dt = min(run(args.objects, bulk) for _ in range(args.repeat))
+        base = dt if base is None else base
+        print("%-10s %8d %10.3f %10.0f   x%.2f" % (label, args.objects, dt, args.objects / dt, base / dt))
+
+if __name__ == "__main__":
+    main()
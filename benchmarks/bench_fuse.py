@@ -0,0 +1,77 @@
+# Benchmark del ensamblaje final: cadena serie vs. fusión n-aria vs. árbol por parejas
+# Uso (FreeCAD importable o desde FreeCADCmd):
+#   python benchmarks/bench_fuse.py [macro.py] [--var parts] [--repeat 3] [--fuzzy 1e-3] [--simple-bop]
+# Ejecuta la macro una vez para obtener la lista de piezas y cronometra cada
+# estrategia de starsat.booleans sobre exactamente las mismas piezas.
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import FreeCAD as App
+from starsat import booleans
+
+def load_parts(macro_path, var):
+    ns = {"__name__": "__bench__", "__file__": macro_path}
+    with open(macro_path, encoding="utf-8") as f:
+        code = compile(f.read(), macro_path, "exec")
+    exec(code, ns)
+    doc = ns.get("doc")
+    parts = list(ns[var])
+    return parts, doc
+
+def time_mode(parts, mode, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = booleans.fuse_all(parts, mode=mode)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result, dict(booleans.LAST_STATS)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de fusión del ensamblaje final")
+    ap.add_argument("macro", nargs="?", default=os.path.join(ROOT, "DFDmacro.py"))
+    ap.add_argument("--var", default="parts", help="variable de la macro con la lista de piezas")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--fuzzy", type=float, default=None, help="tolerancia difusa [mm] (por defecto la del modo)")
+    ap.add_argument("--simple-bop", action="store_true", help="parejas con fuse(b) y vaciados con cut(compound) en vez de la forma de lista")
+    args, _ = ap.parse_known_args(argv)
+    booleans.configure(fuzzy=args.fuzzy, list_form=not args.simple_bop)
+
+    parts, doc = load_parts(os.path.abspath(args.macro), args.var)
+    print("Macro: %s  (%d piezas)" % (os.path.basename(args.macro), len(parts)))
+    print("%-8s %10s %10s %8s %14s %s" % ("modo", "t_min[s]", "speedup", "caras", "volumen[mm3]", "notas"))
+
+    t_serial = None
+    for mode in ("serial", "tree", "multi", "fuzzy"):
+        try:
+            dt, shape, stats = time_mode(parts, mode, args.repeat)
+        except Exception as e:
+            print("%-8s %10s %10s %8s %14s fallo: %s" % (mode, "-", "-", "-", "-", e))
+            continue
+        if mode == "serial":
+            t_serial = dt
+        speed = (t_serial / dt) if (t_serial and dt > 0) else float("nan")
+        notes = []
+        if stats["fallbacks"]:
+            notes.append("fallback->%s" % stats["mode"])
+        if stats["fuzzy"]:
+            notes.append("fuzzy=%g" % stats["fuzzy"])
+        if stats["compounded_pairs"]:
+            notes.append("%d parejas compound" % stats["compounded_pairs"])
+        print("%-8s %10.3f %10.2f %8d %14.1f %s" % (mode, dt, speed, len(shape.Faces), shape.Volume, ", ".join(notes)))
+
+    if doc is not None:
+        try:
+            App.closeDocument(doc.Name)
+        except Exception:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Benchmark de asignación de materiales: tag_material_props por objeto vs. materials.attach
+# Uso (FreeCAD importable o desde FreeCADCmd):
+#   python benchmarks/bench_materials.py [--objects 500] [--repeat 3]
+# Crea una nave sintética de N objetos y mide, sobre documentos idénticos, el
+# patrón antiguo (hasattr/addProperty por propiedad, masa con Shape.Volume por
+# objeto) frente a una sola llamada a starsat.materials.attach.
+# Comprueba además que un constructor @cached_builder(pending=...) conserva los
+# materiales en la segunda ejecución (caché caliente, caché en un directorio temporal);
+# sale con código 1 si se pierden.
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import FreeCAD as App
+import Part
+from starsat import materials
+from starsat.cache import BrepCache, cached_builder
+
+KEYS = ["C_C_3D_CVI", "C_C_PITCH", "AL7075", "POLY", "TUNGSTEN", "BORON_CARBIDE", "MLI"]
+
+def tag_material_props(o, m):
+    # Patrón antiguo de StarSat_CC_advanced (+ masa como en Direct_Fusion_DriveDS)
+    if not hasattr(o, "Material"): o.addProperty("App::PropertyString","Material","Meta","Material")
+    o.Material = m["name"]
+    for field, prop in (("density","Density"), ("emissivity","Emissivity"), ("k","ThermalConductivity"),
+                        ("Tmax","Tmax"), ("E","YoungsModulus"), ("nu","PoissonsRatio"), ("CTE","ThermalExpansionCoeff")):
+        if field in m and not hasattr(o, prop):
+            o.addProperty("App::PropertyFloat", prop, "Meta", prop); setattr(o, prop, float(m[field]))
+    o.addProperty("App::PropertyFloat","Mass","Meta","").Mass = o.Shape.Volume/1e9*m["density"]
+
+def make_doc(n):
+    doc = App.newDocument("BenchMaterials")
+    box = Part.makeBox(100, 50, 20)
+    objs = []
+    for i in range(n):
+        o = doc.addObject("Part::Feature", "P%d" % i)
+        o.Shape = box.located(App.Placement(App.Vector(120.0*i, 0, 0), App.Rotation()))
+        objs.append(o)
+    return doc, objs
+
+def run(n, batched):
+    doc, objs = make_doc(n)
+    try:
+        pairs = [(o, KEYS[i % len(KEYS)]) for i, o in enumerate(objs)]
+        t0 = time.perf_counter()
+        if batched:
+            materials.attach(pairs)
+        else:
+            for o, k in pairs:
+                tag_material_props(o, materials.REGISTRY[k])
+        return time.perf_counter() - t0
+    finally:
+        App.closeDocument(doc.Name)
+
+PAIRS = []
+
+def _build_tagged(doc):
+    # Constructor de prueba: crea piezas y difiere sus materiales a PAIRS, como las macros
+    objs = []
+    for i, key in enumerate(("AL7075", "CC")):
+        o = doc.addObject("Part::Feature", "Tagged_%d" % i)
+        o.Shape = Part.makeBox(100, 50, 20, App.Vector(150.0*i, 0, 0))
+        PAIRS.append((o, key)); objs.append(o)
+    o = doc.addObject("Part::Feature", "Tagged_inline")
+    o.Shape = Part.makeBox(10, 10, 10, App.Vector(0, 100, 0))
+    PAIRS.append((o, {"name": "GradedZ", "density": 18000.0, "emissivity": 0.18}))
+    return objs + [o]
+
+def warm_cache_check():
+    # Dos ejecuciones del mismo constructor en documentos nuevos: la segunda sale de la caché
+    tmp = tempfile.mkdtemp(prefix="starsat_matcache_")
+    builder = cached_builder(_build_tagged, cache=BrepCache(tmp), pending=PAIRS)
+    found = []
+    try:
+        for run_ in ("fría", "caliente"):
+            doc = App.newDocument("BenchMaterialsCache")
+            try:
+                objs = builder(doc)
+                materials.attach(PAIRS)
+                del PAIRS[:]
+                found.append([(o.Name, getattr(o, "Material", None), getattr(o, "Density", None),
+                               getattr(o, "Emissivity", None)) for o in objs])
+            finally:
+                App.closeDocument(doc.Name)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    ok = found[0] == found[1] and all(m is not None for _, m, _, _ in found[1])
+    print("caché caliente: materiales %s (%s)" % ("conservados" if ok else "PERDIDOS", found[1]))
+    return ok
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de asignación de materiales")
+    ap.add_argument("--objects", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=3)
+    args, _ = ap.parse_known_args(argv)
+
+    print("%-22s %8s %10s %10s" % ("modo", "objetos", "t_min[ms]", "obj/s"))
+    base = None
+    for label, batched in (("tag_material_props", False), ("materials.attach", True)):
+        dt = min(run(args.objects, batched) for _ in range(args.repeat))
+        base = dt if base is None else base
+        print("%-22s %8d %10.1f %10.0f   x%.2f" % (label, args.objects, 1e3*dt, args.objects/dt, base/dt))
+    return 0 if warm_cache_check() else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
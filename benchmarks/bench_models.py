@@ -0,0 +1,182 @@
+# Benchmark de construcción de las macros de naves con línea base
+# Cada modelo se construye en su propio proceso FreeCADCmd (starsat.batch_build)
+# con los parámetros P tal como están en el repositorio y cachés vacías
+# (BREP, fallos de redondeo, estado incremental, BVH, factores de forma e
+# informes de masas en un directorio temporal), y se mide:
+#   construcción, recompute completo, exportación STEP, RSS pico,
+#   sólidos / caras / aristas y volumen final de las piezas finales.
+# De cada tiempo se toma el mínimo de --repeat ejecuciones.
+#
+# Uso:
+#   python benchmarks/bench_models.py                     # compara con la línea base
+#   python benchmarks/bench_models.py --update-baseline   # reescribe la línea base
+#   python benchmarks/bench_models.py DFDmacro --threshold 0.10 --repeat 3
+#
+# Sale con código 1 si un tiempo o la memoria empeoran más que --threshold
+# (relativo) respecto a benchmarks/baseline_models.json, o si un modelo falla.
+# Los cambios de geometría (sólidos, caras, aristas, volumen) se listan aparte:
+# no son regresiones de rendimiento pero hay que revisarlos.
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from starsat import batch_build
+
+PY = os.path.join("Macro_starSat", "materials_simulation", "sim", "python_files")
+
+MODELS = [
+    ("DFDmacro", "DFDmacro.py"),
+    ("CNC_SatelliteMetros", "CNC_SatelliteMetros.py"),
+    ("DFD_GreyScale", os.path.join(PY, "DFD_GreyScale.py")),
+    ("DFD_XL_Improved", os.path.join(PY, "DFD_XL_Improved.py")),
+    ("StarSat_CC_advanced", os.path.join(PY, "StarSat_CC_advanced.py")),
+    ("SateliteCubesatRacks", os.path.join(PY, "SateliteCubesatRacks.py")),
+    ("RadiationBlackCapsuleShield", os.path.join(PY, "RadiationBlackCapsuleShield.py")),
+    ("HexShieldToImprove", os.path.join(PY, "HexShieldToImprove.py")),
+    ("Direct_Fusion_DriveDS", os.path.join(PY, "Direct_Fusion_DriveDS.py")),
+]
+
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline_models.json")
+
+TIME_KEYS = ("wall_s", "recompute_s", "export_s")
+PERF_KEYS = TIME_KEYS + ("peak_rss_mb",)
+GEOM_KEYS = ("solids", "faces", "edges", "volume")
+VOLUME_RTOL = 1e-6
+
+def run_model(name, path, out_dir, freecadcmd, timeout, repeat):
+    best = None
+    for i in range(repeat):
+        # Cachés vacías en cada ejecución: se mide la construcción completa
+        tmp = tempfile.mkdtemp(prefix="starsat_bench_")
+        env = {"STARSAT_CACHE_DIR": os.path.join(tmp, "brep"),
+               "STARSAT_FILLET_DB": os.path.join(tmp, "fillets.json"),
+               "STARSAT_REBUILD_DIR": os.path.join(tmp, "rebuild"),      # 'incremental': True no reutiliza
+               "STARSAT_MASSPROPS_DIR": os.path.join(tmp, "massprops"),
+               "STARSAT_BVH_DIR": os.path.join(tmp, "bvh"),
+               "STARSAT_VF_DIR": os.path.join(tmp, "viewfactor")}
+        saved = {k: os.environ.get(k) for k in env}
+        os.environ.update(env)
+        try:
+            rec = batch_build.run_one(os.path.join(ROOT, path), out_dir, freecadcmd, timeout)
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+            shutil.rmtree(tmp, ignore_errors=True)
+        if rec["status"] != "ok":
+            return rec
+        if best is None:
+            best = rec
+        else:
+            for k in PERF_KEYS:
+                if rec.get(k) is not None and (best.get(k) is None or rec[k] < best[k]):
+                    best[k] = rec[k]
+    return best
+
+def metrics(rec):
+    return {k: rec.get(k) for k in ("status",) + PERF_KEYS + GEOM_KEYS}
+
+def compare(name, cur, base, threshold):
+    regressions, changes = [], []
+    if cur["status"] != "ok":
+        regressions.append("%s: estado %s" % (name, cur["status"]))
+        return regressions, changes
+    for k in PERF_KEYS:
+        b, c = base.get(k), cur.get(k)
+        if b is None or c is None or b <= 0:
+            continue
+        if c > b * (1.0 + threshold):
+            regressions.append("%s: %s %.3f -> %.3f (+%.1f%%, umbral %.0f%%)" % (
+                name, k, b, c, 100.0 * (c - b) / b, 100.0 * threshold))
+    for k in GEOM_KEYS:
+        b, c = base.get(k), cur.get(k)
+        if b is None or c is None:
+            continue
+        if (k == "volume" and abs(c - b) > VOLUME_RTOL * max(abs(b), 1.0)) or (k != "volume" and c != b):
+            changes.append("%s: %s %s -> %s" % (name, k, b, c))
+    return regressions, changes
+
+def fmt(v, spec):
+    return "-" if v is None else spec % v
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de construcción de las macros con línea base")
+    ap.add_argument("models", nargs="*", help="subconjunto de modelos (por nombre)")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--threshold", type=float, default=0.15, help="regresión relativa admitida (0.15 = 15%%)")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--out", default=os.path.join(ROOT, "build", "bench_models"))
+    ap.add_argument("--freecadcmd", default=None)
+    ap.add_argument("--timeout", type=float, default=1800.0)
+    args, _ = ap.parse_known_args(argv)
+
+    known = dict(MODELS)
+    unknown = [m for m in args.models if m not in known]
+    if unknown:
+        raise ValueError("bench_models: modelo desconocido %s (usar %s)" % (", ".join(unknown), ", ".join(known)))
+    selected = [(n, p) for n, p in MODELS if not args.models or n in args.models]
+    os.makedirs(args.out, exist_ok=True)
+    freecadcmd = args.freecadcmd or batch_build.find_freecadcmd()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("models", {})
+
+    print("%-28s %-8s %9s %9s %9s %8s %6s %7s %7s %14s" % (
+        "modelo", "estado", "build[s]", "recomp[s]", "step[s]", "RSS[MB]", "sól", "caras", "aristas", "volumen[mm3]"))
+    results, regressions, changes = {}, [], []
+    for name, path in selected:
+        cur = metrics(run_model(name, path, args.out, freecadcmd, args.timeout, args.repeat))
+        results[name] = cur
+        print("%-28s %-8s %9s %9s %9s %8s %6d %7d %7d %14.1f" % (
+            name, cur["status"], fmt(cur["wall_s"], "%.2f"), fmt(cur["recompute_s"], "%.2f"),
+            fmt(cur["export_s"], "%.2f"), fmt(cur["peak_rss_mb"], "%.0f"),
+            cur["solids"] or 0, cur["faces"] or 0, cur["edges"] or 0, cur["volume"] or 0.0))
+        sys.stdout.flush()
+        if name in baseline:
+            r, c = compare(name, cur, baseline[name], args.threshold)
+            regressions += r
+            changes += c
+        elif cur["status"] != "ok":
+            regressions.append("%s: estado %s (sin línea base)" % (name, cur["status"]))
+
+    failed = [n for n, r in results.items() if r["status"] != "ok"]
+    if args.update_baseline:
+        # Los modelos que fallan no entran en la línea base
+        merged = dict(baseline)
+        merged.update((n, r) for n, r in results.items() if n not in failed)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"freecadcmd": freecadcmd, "repeat": args.repeat, "models": merged}, f, indent=1, sort_keys=True)
+        print("Línea base actualizada: %s" % args.baseline)
+        if failed:
+            print("Modelos con fallo (no actualizados): %s" % ", ".join(failed))
+        return 1 if failed else 0
+
+    missing = [n for n, _ in selected if n not in baseline]
+    if missing:
+        print("Sin línea base (usar --update-baseline): %s" % ", ".join(missing))
+    if changes:
+        print("\nCambios de geometría respecto a la línea base:")
+        for c in changes:
+            print("  " + c)
+    if regressions:
+        print("\n*** REGRESIÓN DE RENDIMIENTO ***")
+        for r in regressions:
+            print("  " + r)
+        return 1
+    print("\nSin regresiones (umbral %.0f%%)" % (100.0 * args.threshold))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# Benchmark del trazador de blindaje: rayos/s en serie y repartidos entre procesos
+# Uso (FreeCAD importable o desde FreeCADCmd):
+#   python benchmarks/bench_shielding.py [--rays 200000] [--shells 4] [--jobs 0]
+# Crea capas de blindaje concéntricas (cajas huecas de PE/Al/W con Density)
+# alrededor del origen y traza desde el centro; el mínimo debe coincidir con
+# la suma de espesor × densidad de las capas (rayos normales a las caras).
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import FreeCAD as App
+from starsat import primitives as prim
+from starsat import shielding
+
+LAYERS = [("POLY", 950.0, 20.0), ("AL7075", 2700.0, 3.0), ("TUNGSTEN", 19300.0, 1.0)]
+
+def make_doc(shells):
+    doc = App.newDocument("BenchShielding")
+    r = 200.0
+    for i in range(shells):
+        name, rho, t = LAYERS[i % len(LAYERS)]
+        shell = prim.centered_box(2*(r + t), 2*(r + t), 2*(r + t)).cut(prim.centered_box(2*r, 2*r, 2*r))
+        o = prim.add_obj(shell, "Shell_%d" % i, doc=doc)
+        o.addProperty("App::PropertyFloat", "Density", "Meta", "").Density = rho
+        o.addProperty("App::PropertyString", "Material", "Meta", "").Material = name
+        r += t + 5.0
+    doc.recompute()
+    return doc
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark del trazador de blindaje")
+    ap.add_argument("--rays", type=int, default=200000)
+    ap.add_argument("--shells", type=int, default=4)
+    ap.add_argument("--jobs", type=int, default=0)
+    args, _ = ap.parse_known_args(argv)
+
+    doc = make_doc(args.shells)
+    try:
+        scene = shielding.tessellate(shielding.shield_objects(doc))
+        print("%-8s %8s %10s %8s %12s %10s" % ("modo", "procesos", "rayos", "t[s]", "rayos/s", "g/cm² p50"))
+        for label, jobs in (("serie", 1), ("paralelo", args.jobs)):
+            res = shielding.trace(scene, (0, 0, 0), rays=args.rays, jobs=jobs)
+            s = shielding.summary(res)
+            print("%-8s %8d %10d %8.2f %12.0f %10.3f" % (label, shielding.LAST_STATS["jobs"], args.rays,
+                  shielding.LAST_STATS["seconds"], shielding.LAST_STATS["rays_per_s"], s["percentiles"][50]))
+        print("triángulos: %d, mínimo %.3f g/cm²" % (shielding.LAST_STATS["triangles"], s["min"]))
+    finally:
+        App.closeDocument(doc.Name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# Benchmark de la cobertura de sombra solar: direcciones/s en serie y repartidas entre procesos
+# Uso (FreeCAD importable o desde FreeCADCmd):
+#   python benchmarks/bench_sunshadow.py [--dirs 300] [--samples 2000] [--offpoint 10] [--jobs 0]
+# Escudo cuadrado en z < 0 y dos radiadores verticales detrás (sol hacia -Z);
+# con apuntado nominal la fracción iluminada debe ser 0 y crecer con el
+# desapuntado cuando el borde del escudo deja de cubrir los radiadores.
+
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from starsat import primitives as prim
+from starsat import sunshadow
+
+def make_scene():
+    shield = prim.box_c(4000.0, 4000.0, 40.0, 0.0, 0.0, -1000.0)
+    rads = [("rad_%s" % s, prim.box_c(1300.0, 40.0, 1000.0, k * 1150.0, 0.0, 500.0)) for s, k in (("L", -1), ("R", 1))]
+    return [("shield", shield)] + rads, rads
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de cobertura de sombra solar")
+    ap.add_argument("--dirs", type=int, default=300)
+    ap.add_argument("--samples", type=int, default=2000)
+    ap.add_argument("--offpoint", type=float, default=10.0)
+    ap.add_argument("--jobs", type=int, default=0)
+    args, _ = ap.parse_known_args(argv)
+
+    blockers, targets = make_scene()
+    print("%-8s %8s %6s %8s %8s %10s" % ("modo", "procesos", "dirs", "t[s]", "dirs/s", "peor[%]"))
+    for label, jobs in (("serie", 1), ("paralelo", args.jobs)):
+        res = sunshadow.coverage(blockers, targets, (0, 0, -1), args.offpoint, args.dirs, samples=args.samples, jobs=jobs)
+        st = sunshadow.LAST_STATS
+        print("%-8s %8d %6d %8.2f %8.1f %10.2f" % (label, st["jobs"], st["directions"], st["seconds"],
+              st["directions"] / st["seconds"], 100.0 * res["worst"].max()))
+    print("nominal: %s" % ", ".join("%s %.2f%%" % (n, 100.0 * v) for n, v in zip(res["names"], res["nominal"])))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Benchmark de la red térmica: estacionario y transitorio frente al nº de nodos
+# Uso (sólo NumPy/scipy; FreeCAD importable para el módulo):
+#   python benchmarks/bench_thermal.py [--sizes 500,2000,5000] [--radiators 200] [--steps 100]
+# Red sintética: cadena de piezas en rejilla 3D con conducción entre vecinas,
+# un bloque de radiadores con acoplamientos radiativos densos entre sí y al
+# espacio, y carga uniforme. Comprueba además el caso de dos nodos analítico.
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from starsat import thermal
+
+def grid(n_nodes, radiators, seed=3):
+    n = max(2, int(round(n_nodes ** (1.0 / 3.0))))
+    idx = np.arange(n ** 3).reshape(n, n, n)
+    N = idx.size
+    rng = np.random.default_rng(seed)
+    net = thermal.make(["P%d" % i for i in range(N)], rng.uniform(200.0, 5000.0, N), np.full(N, 500.0))
+    for ax in range(3):
+        a = np.take(idx, range(n - 1), axis=ax).ravel()
+        b = np.take(idx, range(1, n), axis=ax).ravel()
+        thermal.add_conductance(net, a, b, rng.uniform(0.05, 2.0, a.size))
+    rad = idx[:, :, 0].ravel()[:radiators]
+    i, j = np.triu_indices(len(rad), 1)
+    thermal.add_radiation(net, rad[i], rad[j], rng.uniform(0.0, 2e-11, i.size))
+    thermal.add_space(net, rad, thermal.SIGMA * 0.85 * rng.uniform(0.05, 0.5, len(rad)))
+    return net
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de la red térmica")
+    ap.add_argument("--sizes", default="500,2000,5000")
+    ap.add_argument("--radiators", type=int, default=200)
+    ap.add_argument("--steps", type=int, default=100)
+    args, _ = ap.parse_known_args(argv)
+
+    net = thermal.make(["a", "b"], [1e3, 1e3])
+    thermal.add_conductance(net, "a", "b", 2.0); thermal.add_space(net, "b", thermal.SIGMA * 0.9)
+    Tb = (500.0 / (thermal.SIGMA * 0.9) + thermal.T_SPACE ** 4) ** 0.25
+    res = thermal.steady(net, loads={"a": 500.0})
+    print("dos nodos: T %.3f / %.3f K, analítico %.3f / %.3f K" % (res["T"][0], res["T"][1], Tb + 250.0, Tb))
+    print("sparse (scipy): %s" % thermal.LAST_STATS["sparse"])
+
+    print("%8s %10s %8s %10s %8s %12s %8s" % ("nodos", "acopl.", "Newton", "estac.[s]", "pasos", "trans.[s]", "Tmax[K]"))
+    for size in [int(s) for s in args.sizes.split(",")]:
+        net = grid(size, args.radiators)
+        N = len(net["names"])
+        Q = np.full(N, 0.5)
+        t0 = time.perf_counter(); res = thermal.steady(net, loads=Q); ts = time.perf_counter() - t0
+        it = res["iterations"]
+        t0 = time.perf_counter(); tr = thermal.transient(net, Q, t_end=args.steps * 60.0, dt=60.0); tt = time.perf_counter() - t0
+        print("%8d %10d %8d %10.3f %8d %12.3f %8.1f" % (N, len(net["cond"][2]) + len(net["rad"][2]), it, ts,
+              args.steps, tt, res["T"].max()))
+
+if __name__ == "__main__":
+    main()
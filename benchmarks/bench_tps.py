@@ -0,0 +1,54 @@
+# Benchmark del solver 1D del TPS: variantes una a una vs. un solo lote NumPy
+# Uso (FreeCAD importable o desde FreeCADCmd):
+#   python benchmarks/bench_tps.py [--variants 2000] [--t-end 3600] [--dt 5] [--au 0.3]
+# Barre t_foam y t_cc de la pila de DFDmacro.P y resuelve el transitorio con
+# starsat.tps.solve; la versión "serie" llama al mismo solver con B=1 para
+# una muestra de variantes y extrapola.
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from starsat import tps
+
+P = {'t_ceramic': 4.0, 't_foam': 120.0, 't_cc': 12.0}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark del solver 1D del TPS")
+    ap.add_argument("--variants", type=int, default=2000)
+    ap.add_argument("--t-end", type=float, default=3600.0)
+    ap.add_argument("--dt", type=float, default=5.0)
+    ap.add_argument("--au", type=float, default=0.3)
+    ap.add_argument("--sample", type=int, default=20)
+    args, _ = ap.parse_known_args(argv)
+
+    n = max(1, int(round(np.sqrt(args.variants))))
+    st, grid = tps.sweep(P, tps.DFD, t_foam=np.linspace(40.0, 200.0, n), t_cc=np.linspace(4.0, 20.0, n))
+    B = st["t"].shape[0]
+    q = tps.solar_flux(args.au)
+
+    t0 = time.perf_counter()
+    for i in range(min(args.sample, B)):
+        one = dict((k, v[i:i+1] if isinstance(v, np.ndarray) else v) for k, v in st.items())
+        tps.solve(one, q, args.t_end, args.dt)
+    serial = (time.perf_counter() - t0) / min(args.sample, B) * B
+
+    t0 = time.perf_counter()
+    res = tps.solve(st, q, args.t_end, args.dt)
+    batch = time.perf_counter() - t0
+
+    print("%-8s %9s %10s %12s" % ("modo", "variantes", "t[s]", "variantes/s"))
+    print("%-8s %9d %10.2f %12.0f   (extrapolado de %d)" % ("serie", B, serial, B / serial, min(args.sample, B)))
+    print("%-8s %9d %10.2f %12.0f   x%.1f" % ("lote", B, batch, B / batch, serial / batch))
+    i = int(np.argmin(res["Tmax_layer"][:, -1]))
+    print("cara trasera más fría: t_foam=%.0f t_cc=%.1f -> %.0f K (cara frontal %.0f K), %d variantes sobre Tmax" % (
+        grid["t_foam"][i], grid["t_cc"][i], res["Tmax_layer"][i, -1], res["Tmax_layer"][i, 0], int(res["over"].any(axis=1).sum())))
+
+if __name__ == "__main__":
+    main()
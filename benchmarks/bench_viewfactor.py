@@ -0,0 +1,53 @@
+# Benchmark de factores de forma: rayos/s en serie y en procesos, recarga de caché
+# Uso (FreeCAD importable o desde FreeCADCmd):
+#   python benchmarks/bench_viewfactor.py [--rays 200000] [--side 1000] [--gap 1000] [--jobs 0]
+# Dos placas cuadradas paralelas finas enfrentadas; la cara interior de cada
+# una debe ver a la otra con el factor analítico de placas paralelas, y como
+# la superficie es la placa entera (dos caras y cantos) F ≈ F_analítico·A_cara/A.
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from starsat import primitives as prim
+from starsat import viewfactor
+
+def parallel_plates(a, c):
+    # Placas a×a enfrentadas a distancia c
+    x = y = a / c
+    X, Y = 1.0 + x*x, 1.0 + y*y
+    return 2.0 / (math.pi * x * y) * (0.5 * math.log(X * Y / (1.0 + x*x + y*y))
+                                      + x * math.sqrt(Y) * math.atan(x / math.sqrt(Y))
+                                      + y * math.sqrt(X) * math.atan(y / math.sqrt(X))
+                                      - x * math.atan(x) - y * math.atan(y))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de factores de forma")
+    ap.add_argument("--rays", type=int, default=200000)
+    ap.add_argument("--side", type=float, default=1000.0)
+    ap.add_argument("--gap", type=float, default=1000.0)
+    ap.add_argument("--thick", type=float, default=1.0)
+    ap.add_argument("--jobs", type=int, default=0)
+    args, _ = ap.parse_known_args(argv)
+
+    s, t = args.side, args.thick
+    surf = [("A", prim.box_c(s, s, t, 0.0, 0.0, -t/2.0), "CC"),
+            ("B", prim.box_c(s, s, t, 0.0, 0.0, args.gap + t/2.0), "CER_Coat")]
+    ref = parallel_plates(s, args.gap) * s*s / (2.0*s*s + 4.0*s*t)
+    cache = tempfile.mkdtemp()
+    print("%-8s %8s %10s %8s %12s %8s %8s" % ("modo", "procesos", "rayos", "t[s]", "rayos/s", "F_AB", "ref"))
+    for label, jobs, use in (("serie", 1, False), ("paralelo", args.jobs, True), ("caché", 1, True)):
+        vf = viewfactor.compute(surf, rays=args.rays, jobs=jobs, cache=use, directory=cache)
+        st = viewfactor.LAST_STATS
+        print("%-8s %8d %10d %8.2f %12.0f %8.4f %8.4f" % (label, st["jobs"], st["rays"], st["seconds"],
+              st["rays"] / st["seconds"], vf["F"][0, 1], ref))
+    ex = viewfactor.exchange(vf, viewfactor.emissivities(surf))
+    print("R_AB %.3e W/K⁴, R_BA %.3e W/K⁴" % (ex["R"][0, 1], ex["R"][1, 0]))
+
+if __name__ == "__main__":
+    main()
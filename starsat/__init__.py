@@ -0,0 +1,11 @@
+# starsat — utilidades compartidas para las macros StarSat / DFD
+# Las macros añaden la raíz del repositorio a sys.path y luego importan
+# los submódulos directamente, p.ej.:
+#
+#   import os, sys
+#   sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+#   from starsat.booleans import fuse_all
+#
+# Los submódulos de geometría necesitan FreeCAD (App/Part); este __init__
+# no importa nada para que los módulos puramente numéricos se puedan usar
+# fuera de FreeCAD.
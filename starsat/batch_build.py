@@ -0,0 +1,284 @@
+# Constructor por lotes sin GUI para todo el catálogo de macros
+# Cada macro se ejecuta en su propio proceso FreeCADCmd (aislado de cuelgues de
+# OCC y con memoria propia); un pool de N trabajadores limita cuántos corren a la vez.
+# En el proceso hijo:
+#   - FreeCADGui se sustituye por un stub (Gui.activeView(), SendMsgToActiveView...)
+#   - los accesos `obj.ViewObject` se reescriben (AST) para devolver un stub
+#     cuando no hay GUI, así `o.ViewObject.ShapeColor = ...` no rompe la macro
+#   - se exporta un STEP con las piezas finales y un JSON con tiempo de
+#     construcción, de recompute completo y de exportación, RSS pico, recuento de
+#     sólidos/caras/aristas y volumen final (benchmarks/bench_models.py lo usa).
+#   - con --profile se instrumentan además las booleanas (starsat.profiling) y
+#     se escriben <macro>.folded, <macro>.trace.json y <macro>.top.txt.
+#
+# Uso:
+#   python -m starsat.batch_build                    # catálogo completo
+#   python -m starsat.batch_build DFDmacro.py -j 4 --out build/batch
+#   python -m starsat.batch_build --freecadcmd /opt/freecad/bin/FreeCADCmd
+#   python -m starsat.batch_build DFDmacro.py --profile
+
+import argparse
+import ast
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import traceback
+import types
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIM = os.path.join(ROOT, "Macro_starSat", "materials_simulation")
+
+CATALOG = [
+    os.path.join(SIM, "sim", "python_files", "*.py"),
+    os.path.join(SIM, "MACROS_TXT", "*", "Files", "Simulation", "*.py"),
+    os.path.join(SIM, "MACROS_TXT", "*", "Files", "Simulation", "*.FCMacro"),
+]
+
+ENV_MACRO = "STARSAT_BATCH_MACRO"
+ENV_OUT = "STARSAT_BATCH_OUT"
+ENV_PROFILE = "STARSAT_BATCH_PROFILE"
+
+# ===================== Stubs sin GUI =====================
+class _Null(object):
+    # Objeto que absorbe cualquier acceso: atributos, llamadas, asignaciones
+    def __getattr__(self, name): return self
+    def __call__(self, *a, **k): return self
+    def __setattr__(self, name, value): pass
+    def __getitem__(self, key): return self
+    def __setitem__(self, key, value): pass
+    def __iter__(self): return iter(())
+    def __len__(self): return 0
+    def __bool__(self): return False
+    __nonzero__ = __bool__
+
+_NULL = _Null()
+
+def _gui_stub():
+    m = types.ModuleType("FreeCADGui")
+    m.__getattr__ = lambda name: _NULL
+    m.ActiveDocument = None
+    return m
+
+def _view_object(obj):
+    vo = getattr(obj, "ViewObject", None)
+    return _NULL if vo is None else vo
+
+class _ViewObjectRewriter(ast.NodeTransformer):
+    # x.ViewObject (lectura) -> __starsat_vo__(x)
+    def visit_Attribute(self, node):
+        self.generic_visit(node)
+        if node.attr == "ViewObject" and isinstance(node.ctx, ast.Load):
+            call = ast.Call(func=ast.Name(id="__starsat_vo__", ctx=ast.Load()), args=[node.value], keywords=[])
+            return ast.copy_location(call, node)
+        return node
+
+def _compile_macro(path, profiling=None):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        src = f.read()
+    tree = _ViewObjectRewriter().visit(ast.parse(src, path))
+    if profiling is not None:
+        tree = profiling.rewrite(tree, path)
+    ast.fix_missing_locations(tree)
+    return compile(tree, path, "exec")
+
+# ===================== Proceso hijo =====================
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / (1024.0 * 1024.0) if sys.platform == "darwin" else kb / 1024.0
+
+def _final_objects(doc):
+    # Piezas finales: objetos con Shape que ninguna otra operación consume
+    out = []
+    for o in doc.Objects:
+        sh = getattr(o, "Shape", None)
+        if sh is None or sh.isNull():
+            continue
+        if any(hasattr(p, "Shape") for p in o.InList):
+            continue
+        out.append(o)
+    return out
+
+def _export_step(objs, path):
+    try:
+        import Import
+        Import.export(objs, path)
+    except Exception:
+        import Part
+        Part.export(objs, path)
+
+def run_child(macro, out_dir, profile=False):
+    import FreeCAD as App
+    sys.modules["FreeCADGui"] = _gui_stub()
+    profiling = None
+    if profile:
+        sys.path.insert(0, ROOT)
+        from starsat import profiling
+        profiling.install()
+
+    slug = macro_slug(macro)
+    rec = {"macro": os.path.relpath(macro, ROOT), "status": "ok", "error": None,
+           "wall_s": None, "recompute_s": None, "export_s": None, "peak_rss_mb": None,
+           "documents": [], "objects": 0, "solids": 0, "faces": 0, "edges": 0, "volume": 0.0, "step": None}
+    before = set(App.listDocuments())
+    ns = {"__name__": "__main__", "__file__": macro, "__starsat_vo__": _view_object}
+    if profiling is not None:
+        ns["__starsat_op__"] = profiling.op
+        profiling.start()
+    t0 = time.perf_counter()
+    try:
+        code = _compile_macro(macro, profiling)
+        exec(code, ns)
+    except BaseException as e:
+        rec["status"] = "error"
+        rec["error"] = "%s: %s" % (type(e).__name__, e)
+        rec["traceback"] = traceback.format_exc()
+    rec["wall_s"] = time.perf_counter() - t0
+    if profiling is not None:
+        profiling.stop()
+        paths = profiling.report(out_dir, slug)
+        rec["profile"] = {k: os.path.relpath(v, out_dir) for k, v in paths.items()}
+        rec["profile"]["silent_failures"] = dict(profiling.SILENT_FAILURES)
+
+    objs = []
+    docs = [doc for name, doc in App.listDocuments().items() if name not in before]
+    if rec["status"] == "ok" and docs:
+        # Recompute completo: todo marcado como modificado
+        t0 = time.perf_counter()
+        for doc in docs:
+            for o in doc.Objects:
+                o.touch()
+            doc.recompute()
+        rec["recompute_s"] = time.perf_counter() - t0
+    for doc in docs:
+        rec["documents"].append(doc.Name)
+        objs += _final_objects(doc)
+    rec["objects"] = len(objs)
+    rec["solids"] = sum(len(o.Shape.Solids) for o in objs)
+    rec["faces"] = sum(len(o.Shape.Faces) for o in objs)
+    rec["edges"] = sum(len(o.Shape.Edges) for o in objs)
+    rec["volume"] = sum(o.Shape.Volume for o in objs)
+    if objs:
+        step = os.path.join(out_dir, slug + ".step")
+        try:
+            t0 = time.perf_counter()
+            _export_step(objs, step)
+            rec["export_s"] = time.perf_counter() - t0
+            rec["step"] = os.path.relpath(step, out_dir)
+        except Exception as e:
+            rec["status"] = "error" if rec["status"] == "error" else "export_failed"
+            rec["export_error"] = "%s: %s" % (type(e).__name__, e)
+    rec["peak_rss_mb"] = _peak_rss_mb()
+    with open(os.path.join(out_dir, slug + ".json"), "w", encoding="utf-8") as f:
+        json.dump(rec, f, indent=1, ensure_ascii=False)
+    return rec
+
+# ===================== Proceso padre =====================
+def macro_slug(path):
+    rel = os.path.relpath(os.path.abspath(path), ROOT)
+    return os.path.splitext(rel)[0].replace(os.sep, "__").replace(" ", "_")
+
+def catalog(patterns=CATALOG):
+    out = []
+    for pat in patterns:
+        out += sorted(glob.glob(pat))
+    return out
+
+def find_freecadcmd():
+    for name in ("FreeCADCmd", "freecadcmd", "FreeCADCmd.exe"):
+        p = shutil.which(name)
+        if p:
+            return p
+    return sys.executable  # requiere FreeCAD importable desde este intérprete
+
+def run_one(macro, out_dir, freecadcmd, timeout, profile=False):
+    env = dict(os.environ)
+    env[ENV_MACRO] = os.path.abspath(macro)
+    env[ENV_OUT] = os.path.abspath(out_dir)
+    if profile:
+        env[ENV_PROFILE] = "1"
+    else:
+        env.pop(ENV_PROFILE, None)
+    slug = macro_slug(macro)
+    log = os.path.join(out_dir, slug + ".log")
+    jpath = os.path.join(out_dir, slug + ".json")
+    if os.path.exists(jpath):
+        os.remove(jpath)  # no reutilizar el registro de una ejecución anterior
+    t0 = time.perf_counter()
+    with open(log, "w") as lf:
+        try:
+            p = subprocess.run([freecadcmd, os.path.abspath(__file__)], env=env, stdout=lf,
+                               stderr=subprocess.STDOUT, timeout=timeout)
+            rc = p.returncode
+        except subprocess.TimeoutExpired:
+            rc = "timeout"
+    if os.path.exists(jpath):
+        with open(jpath, encoding="utf-8") as f:
+            rec = json.load(f)
+    else:
+        # El hijo murió antes de escribir su registro (segfault de OCC, timeout...)
+        rec = {"macro": os.path.relpath(macro, ROOT), "status": "crashed", "error": "returncode=%s" % rc,
+               "wall_s": time.perf_counter() - t0, "recompute_s": None, "export_s": None, "peak_rss_mb": None,
+               "objects": 0, "solids": 0, "faces": 0, "edges": 0, "volume": 0.0, "step": None}
+    rec["returncode"] = rc
+    rec["log"] = os.path.relpath(log, out_dir)
+    return rec
+
+def run_batch(macros, out_dir, jobs=None, freecadcmd=None, timeout=1800, profile=False):
+    os.makedirs(out_dir, exist_ok=True)
+    freecadcmd = freecadcmd or find_freecadcmd()
+    jobs = jobs or max(1, (os.cpu_count() or 2) // 2)
+    results = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futs = {pool.submit(run_one, m, out_dir, freecadcmd, timeout, profile): m for m in macros}
+        for fut in as_completed(futs):
+            rec = fut.result()
+            results.append(rec)
+            print("%-9s %8.1fs %8s MB %5d sól %7d caras  %s" % (
+                rec["status"], rec["wall_s"] or 0.0,
+                "%.0f" % rec["peak_rss_mb"] if rec.get("peak_rss_mb") else "-",
+                rec["solids"], rec["faces"], rec["macro"]))
+            sys.stdout.flush()
+    results.sort(key=lambda r: r["macro"])
+    summary = {"freecadcmd": freecadcmd, "jobs": jobs, "macros": len(results),
+               "ok": sum(1 for r in results if r["status"] == "ok"), "results": results}
+    with open(os.path.join(out_dir, "batch_summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=1, ensure_ascii=False)
+    return summary
+
+def main(argv=None):
+    # Modo hijo: lanzado por run_one dentro de FreeCADCmd
+    if os.environ.get(ENV_MACRO):
+        run_child(os.environ[ENV_MACRO], os.environ[ENV_OUT], bool(os.environ.get(ENV_PROFILE)))
+        sys.stdout.flush()
+        os._exit(0)  # FreeCADCmd no debe quedarse en consola tras la macro
+
+    ap = argparse.ArgumentParser(description="Construcción por lotes sin GUI de las macros StarSat/DFD")
+    ap.add_argument("macros", nargs="*", help="macros concretas (por defecto: python_files + MACROS_TXT/Simulation)")
+    ap.add_argument("--out", default=os.path.join(ROOT, "build", "batch"))
+    ap.add_argument("-j", "--jobs", type=int, default=None)
+    ap.add_argument("--freecadcmd", default=None)
+    ap.add_argument("--timeout", type=float, default=1800.0, help="segundos por macro")
+    ap.add_argument("--profile", action="store_true", help="perfilar booleanas (starsat.profiling)")
+    args, _ = ap.parse_known_args(argv)
+
+    macros = [os.path.abspath(m) for m in args.macros] or catalog()
+    if not macros:
+        print("No se encontraron macros")
+        return
+    s = run_batch(macros, args.out, args.jobs, args.freecadcmd, args.timeout, args.profile)
+    print("%d/%d macros OK  ->  %s" % (s["ok"], s["macros"], os.path.join(args.out, "batch_summary.json")))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# Motor de fusión multi-operando para ensamblajes
+# Sustituye la cadena izquierda `nave = nave.fuse(part)` (cada paso vuelve a
+# intersectar el sólido creciente con la pieza siguiente) por:
+#   - "multi": una única fusión n-aria (Shape.multiFuse, BOPAlgo con todos los argumentos)
+#   - "tree" : reducción por parejas en árbol balanceado (log2(n) niveles)
+#   - "fuzzy": como "multi" pero con valor difuso de OCC (SetFuzzyValue): caras
+#     coplanarias o casi coincidentes se unen en lugar de hacer fallar la booleana
+#   - "serial": la cadena original, sólo como referencia para benchmarks
+# Si una fusión falla no se desplaza la pieza (micro-solape): se baja de
+# "multi" a "tree" y, en último caso, la pareja conflictiva se une como compound.
+#
+# Opciones comunes de todas las booleanas de este módulo (configure()):
+#   fuzzy    : tolerancia difusa [mm] (0 = exacta; el modo "fuzzy" usa DEFAULT_FUZZY si es 0)
+#   list_form: las booleanas se lanzan con la forma de lista de FreeCAD
+#              (multiFuse(lista, tol), cut(lista, tol)), la única que acepta
+#              SetFuzzyValue(tol). Con False las parejas usan fuse(b) y los
+#              vaciados cut(compound) simples; las fusiones n-arias siguen yendo
+#              por multiFuse porque Python no tiene otra fusión n-aria.
+# Python no expone BOPAlgo directamente: si OCC reparte cada booleana entre
+# núcleos (SetRunParallel) lo decide FreeCAD, no estas opciones.
+#
+# cut_all(shape, tools) hace lo mismo para los vaciados (agujeros, ranuras):
+# una sola booleana con todas las herramientas en un compound en lugar de un
+# cut() por herramienta sobre el sólido creciente. Si OCC falla, el lote se
+# parte en dos mitades (recursivamente) y sólo se descarta, con aviso, la
+# herramienta que falle sola.
+#
+# fuse_all(..., clusters=True) evita fusionar piezas que no se tocan (sensores,
+# instrumentos, acoplamientos...): se agrupan por solape de cajas envolventes
+# ampliadas en `gap` (componentes conexas), se fusiona sólo dentro de cada grupo
+# y los grupos se unen como un único compound (sólidos disjuntos: válido y
+# exportable a STEP como una sola forma).
+
+import FreeCAD as App
+import Part
+
+from starsat.profiling import note_failure
+
+FUSE_MODES = ("multi", "tree", "fuzzy", "serial")
+
+# Tolerancia difusa del modo "fuzzy" cuando no se configura otra [mm]
+DEFAULT_FUZZY = 1e-3
+
+OPTIONS = {"fuzzy": 0.0, "list_form": True}
+
+# Holgura por defecto de las cajas envolventes del prefiltro [mm]
+CLUSTER_GAP = 1e-3
+
+# Contadores de la última llamada a fuse_all (consultados por benchmarks)
+LAST_STATS = {"mode": None, "fuzzy": 0.0, "fallbacks": 0, "compounded_pairs": 0, "clusters": None, "fuses_saved": 0}
+
+# Contadores de cut_all: última llamada y acumulado de la sesión
+# (saved = herramientas - booleanas realmente ejecutadas)
+CUT_STATS = {"tools": 0, "booleans": 0, "splits": 0, "failed_tools": 0, "saved": 0}
+CUT_TOTALS = {"calls": 0, "tools": 0, "booleans": 0, "saved": 0}
+
+# ===================== Utilidades =====================
+def _valid(shape):
+    try:
+        return shape is not None and not shape.isNull() and shape.isValid()
+    except Exception:
+        return False
+
+def _clean(shapes):
+    return [s for s in shapes if s is not None and not s.isNull()]
+
+def configure(fuzzy=None, list_form=None):
+    if fuzzy is not None:
+        if fuzzy < 0:
+            raise ValueError("booleans: fuzzy debe ser >= 0 (%g)" % fuzzy)
+        OPTIONS["fuzzy"] = float(fuzzy)
+    if list_form is not None:
+        OPTIONS["list_form"] = bool(list_form)
+    return dict(OPTIONS)
+
+def _tolerance(fuzzy, mode=None):
+    if fuzzy is None:
+        fuzzy = OPTIONS["fuzzy"]
+    if mode == "fuzzy" and fuzzy <= 0:
+        fuzzy = DEFAULT_FUZZY
+    return fuzzy
+
+def _bop_fuse(a, others, fuzzy=0.0):
+    if len(others) == 1 and fuzzy <= 0 and not OPTIONS["list_form"]:
+        return a.fuse(others[0])
+    return a.multiFuse(list(others), fuzzy)
+
+def _bop_cut(shape, tools, fuzzy=0.0):
+    if fuzzy > 0 or OPTIONS["list_form"]:
+        return shape.cut(list(tools), fuzzy)
+    return shape.cut(tools[0] if len(tools) == 1 else Part.makeCompound(tools))
+
+def _fuse_pair(a, b, fuzzy=0.0):
+    err = None
+    try:
+        r = _bop_fuse(a, [b], fuzzy)
+        if _valid(r):
+            return r
+    except Exception as e:
+        err = e
+    note_failure("fuse_all", err)
+    # Pareja irreconciliable: se mantiene como compound para no perder la pieza
+    LAST_STATS["compounded_pairs"] += 1
+    App.Console.PrintWarning("fuse_all: fusión fallida, pareja unida como compound\n")
+    return Part.makeCompound([a, b])
+
+# ===================== Estrategias =====================
+def fuse_serial(shapes):
+    acc = shapes[0]
+    for s in shapes[1:]:
+        acc = acc.fuse(s)
+    return acc
+
+def fuse_tree(shapes, fuzzy=0.0):
+    level = list(shapes)
+    while len(level) > 1:
+        nxt = [_fuse_pair(level[i], level[i+1], fuzzy) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0]
+
+def fuse_multi(shapes, fuzzy=0.0):
+    if len(shapes) == 1:
+        return shapes[0]
+    return _bop_fuse(shapes[0], shapes[1:], fuzzy)
+
+def _fuse(shapes, mode, fuzzy=0.0):
+    result = None
+    if mode in ("multi", "fuzzy"):
+        try:
+            result = fuse_multi(shapes, fuzzy)
+        except Exception as e:
+            note_failure("fuse_all", e)
+            result = None
+        if not _valid(result):
+            LAST_STATS["fallbacks"] += 1
+            LAST_STATS["mode"] = "tree"
+            result = None
+    elif mode == "serial":
+        result = fuse_serial(shapes)
+    if result is None:
+        result = fuse_tree(shapes, fuzzy)
+    return result
+
+# ===================== Prefiltro por cajas envolventes =====================
+def _overlap(a, b, gap):
+    return (a.XMin - gap <= b.XMax and b.XMin - gap <= a.XMax and
+            a.YMin - gap <= b.YMax and b.YMin - gap <= a.YMax and
+            a.ZMin - gap <= b.ZMax and b.ZMin - gap <= a.ZMax)
+
+def bbox_clusters(shapes, gap=CLUSTER_GAP):
+    # Componentes conexas del grafo "cajas ampliadas que se solapan"
+    # (barrido en X para no comparar todas las parejas); devuelve listas de índices
+    boxes = [s.BoundBox for s in shapes]
+    parent = list(range(len(shapes)))
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    order = sorted(range(len(shapes)), key=lambda i: boxes[i].XMin)
+    active = []
+    for i in order:
+        bi = boxes[i]
+        active = [j for j in active if boxes[j].XMax + gap >= bi.XMin - gap]
+        for j in active:
+            if _overlap(bi, boxes[j], gap):
+                ri, rj = find(i), find(j)
+                if ri != rj:
+                    parent[ri] = rj
+        active.append(i)
+    groups = {}
+    for i in range(len(shapes)):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values())
+
+def _cut_batch(shape, tools, fuzzy=0.0):
+    CUT_STATS["booleans"] += 1
+    r, err = None, None
+    try:
+        r = _bop_cut(shape, tools, fuzzy)
+    except Exception as e:
+        err = e
+    if _valid(r):
+        return r
+    note_failure("cut_all", err)
+    if len(tools) == 1:
+        # Herramienta suelta: se acepta como haría cut() (aunque no sea válida) o se omite
+        if r is not None and not r.isNull():
+            return r
+        CUT_STATS["failed_tools"] += 1
+        App.Console.PrintWarning("cut_all: corte fallido, herramienta omitida\n")
+        return shape
+    CUT_STATS["splits"] += 1
+    mid = len(tools) // 2
+    return _cut_batch(_cut_batch(shape, tools[:mid], fuzzy), tools[mid:], fuzzy)
+
+# ===================== API =====================
+def cut_all(shape, tools, refine=False, fuzzy=None):
+    tools = _clean(tools)
+    CUT_STATS.update(tools=len(tools), booleans=0, splits=0, failed_tools=0, saved=0)
+    if shape is None or not tools:
+        return shape
+    result = _cut_batch(shape, tools, _tolerance(fuzzy))
+    CUT_STATS["saved"] = len(tools) - CUT_STATS["booleans"]
+    CUT_TOTALS["calls"] += 1
+    for k in ("tools", "booleans", "saved"):
+        CUT_TOTALS[k] += CUT_STATS[k]
+    if refine:
+        try:
+            result = result.removeSplitter()
+        except Exception:
+            pass
+    return result
+
+def fuse_all(shapes, mode="multi", refine=False, clusters=False, gap=CLUSTER_GAP, fuzzy=None):
+    shapes = _clean(shapes)
+    if mode not in FUSE_MODES:
+        raise ValueError("fuse_all: modo desconocido '%s' (usar %s)" % (mode, ", ".join(FUSE_MODES)))
+    fuzzy = _tolerance(fuzzy, mode)
+    LAST_STATS.update(mode=mode, fuzzy=fuzzy, fallbacks=0, compounded_pairs=0, clusters=None, fuses_saved=0)
+    if not shapes:
+        return None
+
+    if clusters and len(shapes) > 1:
+        groups = bbox_clusters(shapes, gap)
+        LAST_STATS.update(clusters=len(groups), fuses_saved=len(groups) - 1)
+        fused = [shapes[g[0]] if len(g) == 1 else _fuse([shapes[i] for i in g], mode, fuzzy) for g in groups]
+        result = fused[0] if len(fused) == 1 else Part.makeCompound(fused)
+    else:
+        result = _fuse(shapes, mode, fuzzy)
+
+    if refine:
+        try:
+            result = result.removeSplitter()
+        except Exception:
+            pass
+    return result
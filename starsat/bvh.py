@@ -0,0 +1,340 @@
+# Jerarquía de volúmenes envolventes (BVH) sobre ensamblajes teselados
+# Base común de los análisis por rayos (blindaje, factores de vista, sombras)
+# y de las comprobaciones de holgura. Todo vive en arrays NumPy planos:
+#   triángulos  v0, e1, e2 (T, 3)  · obj (T,) índice de objeto · mat (T,) índice de material
+#   nodos       lo, hi (N, 3) caja · child (N,) primer hijo (el segundo es child+1, -1 = hoja)
+#               start, count (N,) rango de triángulos de la hoja (reordenados por hojas)
+# y por objeto: names, density [kg/m3], obj_material (índice en materials).
+# Construcción: partición por la mediana del eje más largo de los centroides,
+# hasta LEAF triángulos por hoja. Consultas por lotes de rayos recorriendo el
+# árbol por niveles: en cada pasada se prueban todas las parejas (rayo, nodo)
+# vivas contra sus cajas y las hojas contra sus triángulos (Möller–Trumbore).
+#
+#   from starsat import bvh
+#   b = bvh.from_objects(objs, tol=1.0)                 # se guarda/recarga en disco por hash de geometría
+#   b = bvh.from_objects([("shield", S["shield"]), ...])  # también parejas (nombre, Shape)
+#   hit = bvh.first_hit(b, origins, dirs)               # t, tri, obj, mat (t = inf si no corta)
+#   vis = bvh.any_hit(b, origins, dirs, tmax=...)       # oclusión
+#   h = bvh.all_hits(b, origin, dirs)                   # ray, t, tri, obj, sign (+1 sale, -1 entra)
+#
+# El fichero .bvh es una cabecera JSON seguida de los arrays en bruto; load()
+# los abre con np.memmap, sin copiar ni reconstruir.
+#
+# Entorno: STARSAT_BVH_DIR (carpeta de la caché en disco).
+
+import hashlib
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+import FreeCAD as App
+
+LEAF = 8
+EPS = 1e-9
+
+# Rayos por tanda de recorrido (acota el tamaño de la frontera rayo × nodo)
+CHUNK = 65536
+
+MAGIC = b"STARBVH1"
+ALIGN = 64
+ARRAYS = ("v0", "e1", "e2", "obj", "mat", "lo", "hi", "child", "start", "count", "density", "obj_material")
+
+# Contadores de la última construcción/carga y de la última consulta
+LAST_STATS = {"triangles": 0, "nodes": 0, "objects": 0, "seconds": 0.0, "loaded": False}
+QUERY_STATS = {"rays": 0, "box_tests": 0, "tri_tests": 0, "seconds": 0.0}
+
+def out_dir():
+    return os.environ.get("STARSAT_BVH_DIR") or os.path.join(App.getUserAppDataDir(), "starsat_bvh")
+
+# ===================== Triángulos =====================
+def _entry(o):
+    # Objeto del documento o pareja (nombre, Shape) -> (nombre, Shape, material, densidad)
+    if isinstance(o, tuple):
+        return o[0], o[1], "", 0.0
+    return o.Name, o.Shape, getattr(o, "Material", "") or "", float(getattr(o, "Density", 0.0) or 0.0)
+
+def mesh(shape, tol=1.0):
+    # Shape.tessellate -> (v0, e1, e2) (T, 3)
+    pts, tris = shape.tessellate(tol)
+    if not tris:
+        return np.zeros((0, 3)), np.zeros((0, 3)), np.zeros((0, 3))
+    P = np.array([(p.x, p.y, p.z) for p in pts], dtype=float)
+    F = np.array(tris, dtype=np.int64)
+    a = P[F[:, 0]]
+    return a, P[F[:, 1]] - a, P[F[:, 2]] - a
+
+def triangles(objs, tol=1.0):
+    # Teselado de cada objeto (o pareja (nombre, Shape)) -> arrays planos con índices de objeto y material
+    v0, e1, e2, owner = [], [], [], []
+    names, density, mat_names, obj_mat = [], [], [], []
+    for o in objs:
+        name, shape, m, rho = _entry(o)
+        a, b, c = mesh(shape, tol)
+        if not len(a):
+            continue
+        v0.append(a); e1.append(b); e2.append(c)
+        owner.append(np.full(len(a), len(names), dtype=np.int32))
+        if m not in mat_names:
+            mat_names.append(m)
+        names.append(name); density.append(rho); obj_mat.append(mat_names.index(m))
+    if not names:
+        raise ValueError("bvh: no hay triángulos (¿objetos sin sólidos?)")
+    obj = np.concatenate(owner)
+    obj_mat = np.array(obj_mat, dtype=np.int32)
+    return {"v0": np.concatenate(v0), "e1": np.concatenate(e1), "e2": np.concatenate(e2), "obj": obj,
+            "mat": obj_mat[obj], "names": names, "materials": mat_names,
+            "density": np.array(density), "obj_material": obj_mat}
+
+# ===================== Construcción =====================
+def build(tris, leaf=LEAF):
+    t0 = time.perf_counter()
+    v0, e1, e2 = tris["v0"], tris["e1"], tris["e2"]
+    T = len(v0)
+    v1, v2 = v0 + e1, v0 + e2
+    tlo = np.minimum(np.minimum(v0, v1), v2)
+    thi = np.maximum(np.maximum(v0, v1), v2)
+    cent = (v0 + v1 + v2) / 3.0
+    order = np.arange(T)
+    lo, hi, child, start, count = [], [], [], [], []
+
+    def push(s, n):
+        idx = order[s:s+n]
+        lo.append(tlo[idx].min(axis=0)); hi.append(thi[idx].max(axis=0))
+        child.append(-1); start.append(s); count.append(n)
+        return len(start) - 1
+
+    stack = [push(0, T)]
+    while stack:
+        i = stack.pop()
+        s, n = start[i], count[i]
+        if n <= leaf:
+            continue
+        idx = order[s:s+n]
+        c = cent[idx]
+        ext = c.max(axis=0) - c.min(axis=0)
+        ax = int(np.argmax(ext))
+        if ext[ax] <= 0.0:
+            continue  # centroides coincidentes: se queda como hoja
+        mid = n // 2
+        order[s:s+n] = idx[np.argpartition(c[:, ax], mid)]
+        child[i] = push(s, mid)
+        push(s + mid, n - mid)
+        stack += [child[i], child[i] + 1]
+
+    b = dict(tris)
+    for k in ("v0", "e1", "e2", "obj", "mat"):
+        b[k] = tris[k][order]
+    b.update(lo=np.array(lo), hi=np.array(hi), child=np.array(child, dtype=np.int64),
+             start=np.array(start, dtype=np.int64), count=np.array(count, dtype=np.int64), leaf=leaf)
+    LAST_STATS.update(triangles=T, nodes=len(start), objects=len(b["names"]),
+                      seconds=time.perf_counter() - t0, loaded=False)
+    return b
+
+# ===================== Fichero mapeable =====================
+def save(b, path):
+    header = {"names": list(b["names"]), "materials": list(b["materials"]), "leaf": int(b.get("leaf", LEAF)),
+              "key": b.get("key", ""), "arrays": []}
+    offset = 0
+    arrays = []
+    for k in ARRAYS:
+        a = np.ascontiguousarray(b[k])
+        header["arrays"].append({"name": k, "dtype": a.dtype.str, "shape": list(a.shape), "offset": offset})
+        arrays.append(a)
+        offset += -(-a.nbytes // ALIGN) * ALIGN
+    blob = json.dumps(header).encode("utf-8")
+    base = -(-(len(MAGIC) + 8 + len(blob)) // ALIGN) * ALIGN
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC); f.write(struct.pack("<Q", len(blob))); f.write(blob)
+        f.write(b"\0" * (base - len(MAGIC) - 8 - len(blob)))
+        for a, info in zip(arrays, header["arrays"]):
+            f.seek(base + info["offset"])
+            f.write(a.tobytes())
+        f.truncate(base + offset)
+    os.replace(tmp, path)
+    return path
+
+def load(path, mmap=True):
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("bvh: '%s' no es un fichero BVH" % path)
+        n = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(n).decode("utf-8"))
+    base = -(-(len(MAGIC) + 8 + n) // ALIGN) * ALIGN
+    b = {"names": header["names"], "materials": header["materials"], "leaf": header["leaf"], "key": header["key"]}
+    for info in header["arrays"]:
+        shape = tuple(info["shape"])
+        if mmap and int(np.prod(shape)) > 0:
+            b[info["name"]] = np.memmap(path, dtype=np.dtype(info["dtype"]), mode="r",
+                                        offset=base + info["offset"], shape=shape)
+        else:
+            with open(path, "rb") as f:
+                f.seek(base + info["offset"])
+                b[info["name"]] = np.fromfile(f, dtype=np.dtype(info["dtype"]), count=int(np.prod(shape))).reshape(shape)
+    LAST_STATS.update(triangles=len(b["v0"]), nodes=len(b["lo"]), objects=len(b["names"]),
+                      seconds=time.perf_counter() - t0, loaded=True)
+    return b
+
+def geometry_key(objs, tol=1.0, leaf=LEAF):
+    # Hash de la geometría (BREP), nombre, material y densidad de cada objeto
+    h = hashlib.sha256(("bvh|%r|%d" % (float(tol), leaf)).encode())
+    for o in objs:
+        name, shape, m, rho = _entry(o)
+        h.update(("%s|%s|%r|" % (name, m, rho)).encode())
+        h.update(hashlib.sha256(shape.exportBrepToString().encode()).digest())
+    return h.hexdigest()
+
+def from_objects(objs, tol=1.0, leaf=LEAF, cache=True, directory=None):
+    # BVH de los objetos; con cache=True se reutiliza el fichero si la geometría no cambió
+    if not cache:
+        return build(triangles(objs, tol), leaf)
+    key = geometry_key(objs, tol, leaf)
+    directory = directory or out_dir()
+    path = os.path.join(directory, key[:32] + ".bvh")
+    if os.path.isfile(path):
+        try:
+            return load(path)
+        except (OSError, ValueError) as e:
+            App.Console.PrintWarning("bvh: no se pudo cargar %s (%s), se reconstruye\n" % (path, e))
+    b = build(triangles(objs, tol), leaf)
+    b["key"] = key
+    try:
+        os.makedirs(directory, exist_ok=True)
+        save(b, path)
+    except OSError as e:
+        App.Console.PrintWarning("bvh: no se pudo guardar %s (%s)\n" % (path, e))
+    return b
+
+# ===================== Consultas =====================
+def _rays(origins, dirs):
+    D = np.atleast_2d(np.asarray(dirs, dtype=float))
+    O = np.broadcast_to(np.asarray(origins, dtype=float), D.shape)
+    return O, D
+
+def _cols(a):
+    return a[:, 0], a[:, 1], a[:, 2]
+
+def _moller(b, O, D, tri, tmax):
+    # Corte rayo/triángulo por parejas -> (ok, t, det); det < 0: el rayo sale (d·n > 0)
+    # (productos vectoriales por componentes: np.cross y einsum son más lentos en (n, 3))
+    ax, ay, az = _cols(b["e1"][tri])
+    bx, by, bz = _cols(b["e2"][tri])
+    dx, dy, dz = _cols(D)
+    px = dy*bz - dz*by; py = dz*bx - dx*bz; pz = dx*by - dy*bx
+    det = ax*px + ay*py + az*pz
+    ok = np.abs(det) > EPS
+    inv = np.where(ok, 1.0 / np.where(ok, det, 1.0), 0.0)
+    vx, vy, vz = _cols(b["v0"][tri])
+    ox, oy, oz = _cols(O)
+    sx = ox - vx; sy = oy - vy; sz = oz - vz
+    u = (sx*px + sy*py + sz*pz) * inv
+    qx = sy*az - sz*ay; qy = sz*ax - sx*az; qz = sx*ay - sy*ax
+    v = (dx*qx + dy*qy + dz*qz) * inv
+    t = (bx*qx + by*qy + bz*qz) * inv
+    ok &= (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t > EPS) & (t <= tmax)
+    return ok, t, det
+
+def _slab(lo, hi, o, iv):
+    # (t_entrada, t_salida) de cada pareja rayo/caja, eje a eje
+    tn, tf = -np.inf, np.inf
+    for k in range(3):
+        with np.errstate(invalid="ignore"):
+            t1 = (lo[k] - o[k]) * iv[k]
+            t2 = (hi[k] - o[k]) * iv[k]
+        tn = np.fmax(tn, np.fmin(t1, t2))
+        tf = np.fmin(tf, np.fmax(t1, t2))
+    return tn, tf
+
+def _walk(b, O, D, mode, tmax, out):
+    # Recorre el árbol para un lote de rayos; mode: "first", "any" o "all"
+    R = len(D)
+    with np.errstate(divide="ignore"):
+        inv = [np.ascontiguousarray(c) for c in _cols(1.0 / D)]
+    org = [np.ascontiguousarray(c) for c in _cols(O)]
+    lo = [np.ascontiguousarray(c) for c in _cols(b["lo"])]
+    hi = [np.ascontiguousarray(c) for c in _cols(b["hi"])]
+    best = np.full(R, float(tmax))
+    ray = np.arange(R)
+    node = np.zeros(R, dtype=np.int64)
+    boxes = tris = 0
+    while ray.size:
+        tn, tf = _slab([c[node] for c in lo], [c[node] for c in hi], [c[ray] for c in org], [c[ray] for c in inv])
+        keep = (tf >= np.maximum(tn, 0.0)) & (tn <= best[ray])
+        if mode == "any":
+            keep &= ~out["hit"][ray]
+        boxes += ray.size
+        ray, node = ray[keep], node[keep]
+        ch = b["child"][node]
+        leaf = ch < 0
+        lr, ln = ray[leaf], node[leaf]
+        if lr.size:
+            cnt = b["count"][ln]
+            rr = np.repeat(lr, cnt)
+            first = np.cumsum(cnt) - cnt
+            tt = np.repeat(b["start"][ln], cnt) + (np.arange(rr.size) - np.repeat(first, cnt))
+            ok, t, det = _moller(b, O[rr], D[rr], tt, best[rr] if mode != "all" else tmax)
+            tris += rr.size
+            rr, tt, t, det = rr[ok], tt[ok], t[ok], det[ok]
+            if mode == "first" and rr.size:
+                np.minimum.at(best, rr, t)
+                win = t <= best[rr]
+                out["tri"][rr[win]] = tt[win]
+            elif mode == "any":
+                out["hit"][rr] = True
+            elif mode == "all":
+                out["ray"].append(rr); out["tri"].append(tt); out["t"].append(t); out["det"].append(det)
+        ir, ic = ray[~leaf], ch[~leaf]
+        ray = np.concatenate([ir, ir])
+        node = np.concatenate([ic, ic + 1])
+    if mode == "first":
+        out["t"][:] = np.where(out["tri"] >= 0, best, np.inf)
+    QUERY_STATS["box_tests"] += boxes
+    QUERY_STATS["tri_tests"] += tris
+
+def _query(b, origins, dirs, mode, tmax):
+    t0 = time.perf_counter()
+    O, D = _rays(origins, dirs)
+    R = len(D)
+    QUERY_STATS.update(rays=R, box_tests=0, tri_tests=0)
+    parts = []
+    for i in range(0, R, CHUNK):
+        sl = slice(i, min(R, i + CHUNK))
+        n = sl.stop - sl.start
+        if mode == "first":
+            out = {"tri": np.full(n, -1, dtype=np.int64), "t": np.full(n, np.inf)}
+        elif mode == "any":
+            out = {"hit": np.zeros(n, dtype=bool)}
+        else:
+            out = {"ray": [], "tri": [], "t": [], "det": []}
+        _walk(b, O[sl], D[sl], mode, tmax, out)
+        if mode == "all":
+            out = dict((k, np.concatenate(v) if v else np.zeros(0, dtype=np.int64 if k in ("ray", "tri") else float))
+                       for k, v in out.items())
+            out["ray"] = out["ray"] + i
+        parts.append(out)
+    QUERY_STATS["seconds"] = time.perf_counter() - t0
+    return dict((k, np.concatenate([p[k] for p in parts])) for k in parts[0]) if parts else None
+
+def first_hit(b, origins, dirs, tmax=np.inf):
+    # Corte más cercano de cada rayo: t (inf si no corta), tri, obj, mat (-1 si no corta)
+    r = _query(b, origins, dirs, "first", tmax)
+    hit = r["tri"] >= 0
+    tri = np.where(hit, r["tri"], 0)
+    return {"hit": hit, "t": r["t"], "tri": r["tri"],
+            "obj": np.where(hit, b["obj"][tri], -1), "mat": np.where(hit, b["mat"][tri], -1)}
+
+def any_hit(b, origins, dirs, tmax=np.inf):
+    # True si el rayo corta algo antes de tmax (sombras, visibilidad)
+    return _query(b, origins, dirs, "any", tmax)["hit"]
+
+def all_hits(b, origins, dirs, tmax=np.inf):
+    # Todos los cortes, ordenados por rayo y distancia
+    r = _query(b, origins, dirs, "all", tmax)
+    k = np.lexsort((r["t"], r["ray"]))
+    tri = r["tri"][k]
+    return {"ray": r["ray"][k], "t": r["t"][k], "tri": tri, "obj": b["obj"][tri], "mat": b["mat"][tri],
+            "sign": np.where(r["det"][k] < 0.0, 1.0, -1.0)}
@@ -0,0 +1,390 @@
+# Caché en disco de subconjuntos (BREP direccionado por contenido)
+# Un constructor decorado con @cached_builder se identifica por un hash de:
+#   - su código (y el de las funciones del mismo módulo que llama, las importadas
+#     y las que usa como atributo de un módulo starsat: patterns.polar, prim.T...),
+#   - los globales de datos que lee (dicts de parámetros, floats, shapes, objetos),
+#   - sus argumentos.
+# Si la clave ya está en disco se recarga el BREP y se recrean los objetos
+# Part::Feature que el constructor añadía al documento (nombre, etiqueta, color
+# y propiedades dinámicas como Material/Density/TmaxC) sin repetir booleanas.
+# Cambiar sólo RAD no invalida create_advanced_tps porque no lo lee.
+# Si la macro asigna materiales al final (MAT_PAIRS + starsat.materials.attach),
+# pending=MAT_PAIRS guarda el material de cada objeto creado con el subconjunto
+# y, al recargarlo, vuelve a añadir las parejas (objeto nuevo, material) a la lista.
+#
+# Uso:
+#   from starsat.cache import cached_builder
+#   @cached_builder
+#   def create_advanced_tps(): ...
+#   @cached_builder(pending=MAT_PAIRS)
+#   def build_capsule_multilayer(doc): ...
+#
+# Entorno: STARSAT_CACHE_DIR (carpeta), STARSAT_CACHE_MB (tope LRU),
+#          STARSAT_CACHE=0 (desactiva).
+
+import functools
+import hashlib
+import json
+import os
+import sys
+import time
+import types
+
+import FreeCAD as App
+import Part
+
+DEFAULT_MAX_MB = 512
+
+STATS = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "uncacheable": 0, "errors": 0}
+
+# Paquete cuyos módulos se siguen por atributo (pat.polar -> código de polar)
+_PKG = __name__.split(".")[0]
+
+_SALT = "starsat-brep-2|py%d.%d|fc%s" % (sys.version_info[0], sys.version_info[1], ".".join(App.Version()[:3]))
+
+# ===================== Huella de valores =====================
+def _is_document(v):
+    return hasattr(v, "Objects") and hasattr(v, "addObject")
+
+def _is_docobject(v):
+    return hasattr(v, "TypeId") and hasattr(v, "Document") and hasattr(v, "PropertiesList")
+
+def _feed(h, tag, data):
+    h.update(tag.encode()); h.update(b"\0")
+    h.update(data if isinstance(data, bytes) else str(data).encode("utf-8")); h.update(b"\0")
+
+def _fp_value(h, v, seen):
+    if v is None or isinstance(v, (bool, int, float, complex, str, bytes)):
+        _feed(h, type(v).__name__, repr(v))
+    elif isinstance(v, dict):
+        _feed(h, "dict", len(v))
+        for k in sorted(v, key=repr):
+            _fp_value(h, k, seen); _fp_value(h, v[k], seen)
+    elif isinstance(v, (list, tuple)):
+        _feed(h, type(v).__name__, len(v))
+        for x in v: _fp_value(h, x, seen)
+    elif isinstance(v, (set, frozenset)):
+        _feed(h, "set", len(v))
+        for x in sorted(v, key=repr): _fp_value(h, x, seen)
+    elif isinstance(v, App.Vector):
+        _feed(h, "vec", repr((v.x, v.y, v.z)))
+    elif isinstance(v, App.Rotation):
+        _feed(h, "rot", repr(tuple(v.Q)))
+    elif isinstance(v, App.Placement):
+        _feed(h, "pl", repr((v.Base.x, v.Base.y, v.Base.z) + tuple(v.Rotation.Q)))
+    elif isinstance(v, App.Matrix):
+        _feed(h, "mat", repr(tuple(v.A)))
+    elif isinstance(v, Part.Shape):
+        if v.isNull(): _feed(h, "shape", "null")
+        else: _feed(h, "shape", hashlib.sha256(v.exportBrepToString().encode()).hexdigest())
+    elif _is_document(v):
+        _feed(h, "doc", "")  # el documento destino no es una entrada geométrica
+    elif _is_docobject(v):
+        sh = getattr(v, "Shape", None)
+        if sh is not None: _fp_value(h, sh, seen)
+        else: _feed(h, "obj", v.Name)
+    elif isinstance(v, types.FunctionType):
+        _fp_function(h, v, seen, v.__globals__)
+    elif isinstance(v, (types.ModuleType, type, types.BuiltinFunctionType)):
+        _feed(h, "name", getattr(v, "__name__", repr(type(v))))
+    elif hasattr(v, "dtype") and hasattr(v, "tobytes"):
+        _feed(h, "array", "%s%s" % (v.dtype, v.shape)); h.update(v.tobytes())
+    else:
+        r = repr(v)
+        _feed(h, type(v).__name__, type(v).__name__ if " at 0x" in r else r)
+
+def _code_names(code):
+    names = set(code.co_names)
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType): names |= _code_names(c)
+    return names
+
+def _fp_code(h, code):
+    _feed(h, "code", code.co_code)
+    _feed(h, "names", ",".join(code.co_names))
+    for c in code.co_consts:
+        if isinstance(c, types.CodeType): _fp_code(h, c)
+        else: _feed(h, "const", repr(c))
+
+def _is_pkg_module(v):
+    return isinstance(v, types.ModuleType) and v.__name__.split(".")[0] == _PKG
+
+def _fp_module(h, mod, names, seen, home):
+    # Módulo starsat usado por atributo: código de las funciones que se leen de él
+    # (co_names incluye los nombres de atributo; los que no son del módulo se ignoran)
+    _feed(h, "module", mod.__name__)
+    for name in names:
+        if (id(mod), name) in seen: continue
+        seen.add((id(mod), name))
+        v = getattr(mod, name, None)
+        if isinstance(v, types.FunctionType):
+            _fp_function(h, v, seen, home)
+        elif _is_pkg_module(v):
+            _fp_module(h, v, names, seen, home)
+
+def _fp_function(h, fn, seen, home):
+    # Funciones del módulo del constructor: código + globales de datos que leen.
+    # Funciones de otros módulos (starsat.*, librerías): sólo su código, y el de
+    # las funciones de módulos starsat que usan como atributo.
+    if id(fn) in seen:
+        _feed(h, "fn-seen", fn.__qualname__); return
+    seen.add(id(fn))
+    _feed(h, "fn", fn.__qualname__)
+    _fp_code(h, fn.__code__)
+    _fp_value(h, fn.__defaults__, seen); _fp_value(h, fn.__kwdefaults__, seen)
+    for cell in fn.__closure__ or ():
+        try: _fp_value(h, cell.cell_contents, seen)
+        except ValueError: pass
+    own = fn.__globals__ is home
+    g = fn.__globals__
+    names = sorted(_code_names(fn.__code__))
+    for name in names:
+        if name not in g: continue
+        v = g[name]
+        if isinstance(v, types.FunctionType):
+            _fp_function(h, v, seen, home)
+        elif _is_pkg_module(v):
+            _fp_module(h, v, names, seen, home)
+        elif own and id(v) in seen:
+            _feed(h, "global-skip", name)      # lista pending: no es una entrada geométrica
+        elif own:
+            _feed(h, "global", name); _fp_value(h, v, seen)
+
+def builder_key(fn, args=(), kwargs=None, skip=()):
+    h = hashlib.sha256()
+    _feed(h, "salt", _SALT)
+    seen = set(id(v) for v in skip)
+    _fp_function(h, fn, seen, fn.__globals__)
+    _fp_value(h, tuple(args), seen)
+    _fp_value(h, dict(kwargs or {}), seen)
+    return h.hexdigest()
+
+# ===================== Almacén LRU =====================
+class BrepCache:
+    def __init__(self, root=None, max_mb=None):
+        self.root = root or os.environ.get("STARSAT_CACHE_DIR") or os.path.join(App.getUserAppDataDir(), "starsat_brep_cache")
+        self.max_bytes = int(float(max_mb if max_mb is not None else os.environ.get("STARSAT_CACHE_MB", DEFAULT_MAX_MB)) * 1024 * 1024)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _paths(self, key):
+        return os.path.join(self.root, key + ".brep"), os.path.join(self.root, key + ".json")
+
+    def load(self, key):
+        brep, meta = self._paths(key)
+        if not (os.path.exists(brep) and os.path.exists(meta)):
+            return None
+        with open(meta, encoding="utf-8") as f:
+            info = json.load(f)
+        comp = Part.Shape()
+        comp.importBrep(brep)
+        now = time.time()
+        os.utime(brep, (now, now)); os.utime(meta, (now, now))
+        return comp.childShapes(), info
+
+    def store(self, key, shapes, info):
+        brep, meta = self._paths(key)
+        tmp = brep + ".tmp"
+        Part.makeCompound(shapes).exportBrep(tmp)
+        os.replace(tmp, brep)
+        with open(meta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=1, ensure_ascii=False)
+        os.replace(meta + ".tmp", meta)
+        STATS["stores"] += 1
+        self.evict()
+
+    def entries(self):
+        out = []
+        for fn in os.listdir(self.root):
+            if not fn.endswith(".brep"): continue
+            key = fn[:-5]
+            brep, meta = self._paths(key)
+            try:
+                size = os.path.getsize(brep) + (os.path.getsize(meta) if os.path.exists(meta) else 0)
+                out.append((os.path.getmtime(brep), size, key))
+            except OSError:
+                pass
+        return sorted(out)
+
+    def size(self):
+        return sum(e[1] for e in self.entries())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(e[1] for e in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes: break
+            for p in self._paths(key):
+                try: os.remove(p)
+                except OSError: pass
+            total -= size
+            STATS["evictions"] += 1
+
+    def clear(self):
+        for _, _, key in self.entries():
+            for p in self._paths(key):
+                try: os.remove(p)
+                except OSError: pass
+
+_DEFAULT = None
+
+def default_cache():
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = BrepCache()
+    return _DEFAULT
+
+def cache_stats():
+    s = dict(STATS)
+    n = s["hits"] + s["misses"]
+    s["hit_rate"] = (s["hits"] / float(n)) if n else 0.0
+    return s
+
+# ===================== Objetos del documento =====================
+_BASE_PROPS = None
+
+def _base_props(doc):
+    # Propiedades de un Part::Feature vacío: todo lo demás es dinámico (Material, Density...)
+    global _BASE_PROPS
+    if _BASE_PROPS is None:
+        probe = doc.addObject("Part::Feature", "StarsatCacheProbe")
+        _BASE_PROPS = set(probe.PropertiesList)
+        doc.removeObject(probe.Name)
+    return _BASE_PROPS
+
+def _json_ok(v):
+    try:
+        json.dumps(v); return True
+    except (TypeError, ValueError):
+        return False
+
+def _describe(o, base, created):
+    d = {"name": o.Name, "label": o.Label, "props": [], "groups": []}
+    for p in o.PropertiesList:
+        if p in base: continue
+        v = getattr(o, p, None)
+        if not _json_ok(v): continue
+        d["props"].append([p, o.getTypeIdOfProperty(p), o.getGroupOfProperty(p), o.getDocumentationOfProperty(p), v])
+    for parent in o.InList:
+        if parent.isDerivedFrom("App::DocumentObjectGroup") and parent.Name not in created:
+            d["groups"].append(parent.Name)
+    try:
+        d["color"] = list(o.ViewObject.ShapeColor[:3]); d["transparency"] = o.ViewObject.Transparency
+    except Exception:
+        pass
+    return d
+
+def _recreate(doc, d, shape):
+    o = doc.addObject("Part::Feature", d["name"])
+    o.Label = d["label"]
+    if shape is not None: o.Shape = shape
+    for name, tid, group, docu, value in d["props"]:
+        try:
+            if name not in o.PropertiesList: o.addProperty(tid, name, group, docu)
+            setattr(o, name, value)
+        except Exception:
+            pass
+    for g in d["groups"]:
+        grp = doc.getObject(g)
+        if grp is not None:
+            try: grp.addObject(o)
+            except Exception: pass
+    try:
+        if "color" in d: o.ViewObject.ShapeColor = tuple(d["color"])
+        if "transparency" in d: o.ViewObject.Transparency = d["transparency"]
+    except Exception:
+        pass
+    return o
+
+# ===================== Decorador =====================
+def _target_doc(args, kwargs):
+    for v in list(args) + list(kwargs.values()):
+        if _is_document(v): return v
+    return App.ActiveDocument
+
+def _pack(result, created_objs, doc, pairs=()):
+    # Devuelve (shapes, info) o None si el resultado no se puede reconstruir
+    shapes = []
+    def put(sh):
+        if sh is None or sh.isNull(): return -1
+        shapes.append(sh); return len(shapes) - 1
+    names = [o.Name for o in created_objs]
+    info = {"objects": [], "result": None}
+    mats = dict((o.Name, m) for o, m in pairs if o is not None and o.Name in names)
+    if created_objs:
+        base = _base_props(doc)
+        for o in created_objs:
+            if o.TypeId != "Part::Feature": return None
+            d = _describe(o, base, set(names)); d["shape"] = put(o.Shape)
+            if o.Name in mats:
+                if not _json_ok(mats[o.Name]): return None
+                d["material"] = mats[o.Name]
+            info["objects"].append(d)
+    def ref(v):
+        if v is None: return {"kind": "none"}
+        if isinstance(v, Part.Shape): return {"kind": "shape", "index": put(v)}
+        if _is_docobject(v) and v.Name in names: return {"kind": "object", "index": names.index(v.Name)}
+        raise TypeError
+    try:
+        if isinstance(result, (list, tuple)):
+            info["result"] = {"kind": "list", "items": [ref(v) for v in result]}
+        else:
+            info["result"] = ref(result)
+    except TypeError:
+        return None
+    return shapes, info
+
+def _unpack(shapes, info, doc, pending=None):
+    at = lambda i: shapes[i] if i >= 0 else None
+    objs = [_recreate(doc, d, at(d["shape"])) for d in info["objects"]]
+    if pending is not None:
+        pending.extend((o, d["material"]) for o, d in zip(objs, info["objects"]) if "material" in d)
+    def deref(r):
+        if r["kind"] == "none": return None
+        if r["kind"] == "shape": return at(r["index"])
+        return objs[r["index"]]
+    r = info["result"]
+    if r["kind"] == "list": return [deref(x) for x in r["items"]]
+    return deref(r)
+
+def cached_builder(fn=None, cache=None, pending=None):
+    # pending: lista de parejas (objeto, material) que la macro asigna después
+    if fn is None:
+        return lambda f: cached_builder(f, cache, pending)
+    skip = () if pending is None else (pending,)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if os.environ.get("STARSAT_CACHE", "1") == "0":
+            return fn(*args, **kwargs)
+        store = cache or default_cache()
+        doc = _target_doc(args, kwargs)
+        try:
+            key = builder_key(fn, args, kwargs, skip)
+            hit = store.load(key)
+        except Exception as e:
+            STATS["errors"] += 1
+            App.Console.PrintWarning("cache: %s sin caché (%s)\n" % (fn.__name__, e))
+            return fn(*args, **kwargs)
+        if hit is not None:
+            STATS["hits"] += 1
+            return _unpack(hit[0], hit[1], doc, pending)
+
+        STATS["misses"] += 1
+        before = set(o.Name for o in doc.Objects) if doc is not None else set()
+        mark = len(pending) if pending is not None else 0
+        result = fn(*args, **kwargs)
+        created = [o for o in doc.Objects if o.Name not in before] if doc is not None else []
+        try:
+            packed = _pack(result, created, doc, pending[mark:] if pending is not None else ())
+            if packed is None:
+                STATS["uncacheable"] += 1
+            else:
+                packed[1]["builder"] = "%s.%s" % (fn.__module__, fn.__qualname__)
+                store.store(key, *packed)
+        except Exception as e:
+            STATS["errors"] += 1
+            App.Console.PrintWarning("cache: no se pudo guardar %s (%s)\n" % (fn.__name__, e))
+        return result
+
+    wrapper.cache_key = lambda *a, **k: builder_key(fn, a, k, skip)
+    return wrapper
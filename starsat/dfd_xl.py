@@ -0,0 +1,299 @@
+# Subconjuntos de la nave DFD XL Solar (DFDmacro, CNC_SatelliteMetros, naveDFDMacro_CAD)
+# Cada build_<nombre>(P) depende sólo del diccionario de parámetros P y devuelve
+# un Part.Shape, así que se pueden construir en procesos separados
+# (starsat.parallel) y ensamblar después en el proceso principal.
+# Las características CNC (agujeros de interfaz del truss, pernos de la base)
+# sólo se generan si P trae sus claves ('interface_holes_count', 'bolt_count').
+# Con P['fuse_clusters'] los subconjuntos de piezas sueltas (acoplamientos,
+# sensores, instrumentos, navegación) no fusionan piezas disjuntas: cada grupo
+# conexo se fusiona aparte y se devuelve un compound (starsat.booleans).
+# Unidades: mm
+
+import FreeCAD as App
+import Part
+import math
+
+from starsat import patterns
+from starsat.booleans import cut_all, fuse_all
+
+# ========================
+# Fuselaje principal (base DFD)
+# ========================
+def build_hull(P):
+    nose = Part.makeCone(0, P['nose_base_d']/2, P['nose_len'])
+    mid = Part.makeCylinder(P['mid_d']/2, P['mid_len'])
+    mid.translate(App.Vector(0,0,P['nose_len']))
+    rear = Part.makeCone(P['rear_d']/2, P['mid_d']/2, P['rear_len'])
+    rear.translate(App.Vector(0,0,P['nose_len']+P['mid_len']))
+    return nose.fuse(mid).fuse(rear)
+
+# ========================
+# Escudo térmico frontal multilayer (TPS)
+# ========================
+def build_shield(P):
+    shield_R = P['shield_d']/2.0
+    # Cara cerámica (disco + flecha mediante cono corto)
+    cer = Part.makeCylinder(shield_R, P['t_ceramic'])
+    cone = Part.makeCone(shield_R, shield_R - 40.0, P['shield_flecha'])
+    cone.translate(App.Vector(0,0,-P['shield_flecha']))
+    cer = cer.fuse(cone)
+
+    # Núcleo foam
+    foam = Part.makeCylinder(shield_R - P['overlap'], P['t_foam'])
+    foam.translate(App.Vector(0,0,P['t_ceramic'] - P['overlap']))
+
+    # Capa trasera C/C
+    back = Part.makeCylinder(shield_R - 2*P['overlap'], P['t_cc'])
+    back.translate(App.Vector(0,0,P['t_ceramic'] + P['t_foam'] - 2*P['overlap']))
+
+    # Rim perimetral
+    rimOD = shield_R; rimID = shield_R - P['rim_w']
+    rim = Part.makeCylinder(rimOD, P['rim_h']).cut(Part.makeCylinder(rimID, P['rim_h']))
+    rim.translate(App.Vector(0,0,P['t_ceramic'] + P['t_foam'] + P['t_cc'] - P['rim_h']))
+
+    # Ensamble del escudo como sólido único, delante del fuselaje
+    shield = cer.fuse(foam).fuse(back).fuse(rim)
+    shield.translate(App.Vector(0,0,-(P['t_ceramic'] + P['t_foam'] + P['t_cc'])))
+    return shield
+
+# ========================
+# Blindajes TPS alrededor del fuselaje y reactor (mangas)
+# ========================
+def build_hull_shield(P):
+    hull_shield = Part.makeCylinder(P['mid_d']/2 + P['hull_shield_t'], P['hull_shield_l'])
+    hull_shield.translate(App.Vector(0,0,P['nose_len'] + (P['mid_len'] - P['hull_shield_l'])/2.0))
+    return hull_shield
+
+def build_reactor_shield(P):
+    reactor_shield = Part.makeCylinder(P['reactor_d']/2 + P['reactor_shield_t'], P['reactor_shield_l'])
+    reactor_shield.translate(App.Vector(0,0,P['nose_len'] + P['mid_len'] - 200.0))
+    return reactor_shield
+
+# ========================
+# Reactor + boquilla (base DFD)
+# ========================
+def build_reactor(P):
+    reactor = Part.makeCylinder(P['reactor_d']/2, P['reactor_l'])
+    reactor.translate(App.Vector(0,0,P['nose_len']+1200))
+    nozzle = Part.makeCone(P['rear_d']/2, P['rear_d'], 1000)
+    nozzle.translate(App.Vector(0,0,P['nose_len']+P['mid_len']+P['rear_len']))
+    return reactor.fuse(nozzle)
+
+# ========================
+# Módulo hábitat
+# ========================
+def build_hab(P):
+    hab = Part.makeCylinder(P['hab_d']/2, P['hab_l'])
+    hab.translate(App.Vector(0,0,P['nose_len']+P['mid_len']+500))
+    return hab
+
+# ========================
+# Cabina de mando
+# ========================
+def build_cockpit(P):
+    cockpit = Part.makeCylinder(P['cockpit_d']/2, P['cockpit_l'])
+    cockpit.translate(App.Vector(0,0,50))
+    window = Part.makeSphere(P['window_r'])
+    window.translate(App.Vector(P['cockpit_d']/3,0,P['cockpit_l']/2))
+    return cockpit.cut(window)
+
+# ========================
+# Tanques laterales y esféricos
+# ========================
+def build_tanks(P):
+    tankL = Part.makeCylinder(P['tank_r'], P['tank_l'])
+    tankL.translate(App.Vector(P['tank_off'],0,P['nose_len']+1000))
+    tankR = Part.makeCylinder(P['tank_r'], P['tank_l'])
+    tankR.translate(App.Vector(-P['tank_off'],0,P['nose_len']+1000))
+    sphereL = Part.makeSphere(P['sphere_r'])
+    sphereL.translate(App.Vector(P['sphere_off'],0,P['nose_len']+2500))
+    sphereR = Part.makeSphere(P['sphere_r'])
+    sphereR.translate(App.Vector(-P['sphere_off'],0,P['nose_len']+2500))
+    return tankL.fuse(tankR).fuse(sphereL).fuse(sphereR)
+
+# ========================
+# Radiadores en sombra (reubicados hacia atrás)
+# ========================
+def build_wings(P):
+    wingL = Part.makeBox(P['wing_span'], P['wing_th'], P['wing_l'])
+    wingL.translate(App.Vector(-P['wing_span']/2, -P['mid_d']/2-150, P['nose_len']+P['mid_len']+P['wing_back_offset']))
+    wingR = Part.makeBox(P['wing_span'], P['wing_th'], P['wing_l'])
+    wingR.translate(App.Vector(-P['wing_span']/2, P['mid_d']/2+150, P['nose_len']+P['mid_len']+P['wing_back_offset']))
+    return wingL.fuse(wingR)
+
+# ========================
+# Collar térmico y paravientos (deflectores)
+# ========================
+def build_collar(P):
+    collarOD = P['mid_d'] + P['collar_d_delta']
+    collar = Part.makeCylinder(collarOD/2.0, P['collar_h']).cut(Part.makeCylinder((collarOD/2.0 - P['collar_t']), P['collar_h']))
+    # Centrado en mitad del tramo medio
+    collar.translate(App.Vector(0,0,P['nose_len'] + P['mid_len']/2.0 - P['collar_h']/2.0))
+    return collar
+
+def build_deflectors(P):
+    collarOD = P['mid_d'] + P['collar_d_delta']
+    d = Part.makeBox(P['def_l'], P['def_w'], P['def_t'])
+    # Desplazamos radialmente hasta el radio del collar y giramos cada pétalo
+    # alrededor del eje Z que pasa por su base (la Placement sustituye a la traslación previa)
+    baseR = collarOD/2.0 + P['overlap']
+    d.Placement = App.Placement(App.Vector(baseR,0,0), App.Rotation())
+    return patterns.polar(d, P['def_count'], axis=(0,0,1), center=(baseR,0,0), result="fuse")
+
+# ========================
+# Escotillas y acoplamientos
+# ========================
+def build_docking(P):
+    dockL = Part.makeCylinder(P['dock_r'], P['dock_l'])
+    dockL.translate(App.Vector(P['dock_off'],0,P['nose_len']+1800))
+    dockR = Part.makeCylinder(P['dock_r'], P['dock_l'])
+    dockR.translate(App.Vector(-P['dock_off'],0,P['nose_len']+1800))
+    return fuse_all([dockL, dockR], clusters=P.get('fuse_clusters', False))
+
+# ========================
+# Sensores y cámaras externas
+# ========================
+def build_sensors(P):
+    sensor1 = Part.makeSphere(P['sensor_r'])
+    sensor1.translate(App.Vector(P['mid_d']/2+100,0,P['nose_len']+2000))
+    sensor2 = Part.makeSphere(P['sensor_r'])
+    sensor2.translate(App.Vector(-P['mid_d']/2-100,0,P['nose_len']+2000))
+    return fuse_all([sensor1, sensor2], clusters=P.get('fuse_clusters', False))
+
+# ========================
+# Refuerzos internos
+# ========================
+def build_beams(P):
+    beam1 = Part.makeCylinder(P['beam_r'], P['beam_l'])
+    beam1.translate(App.Vector(0,0,P['nose_len']))
+    beam2 = Part.makeCylinder(P['beam_r'], P['beam_l'])
+    beam2.translate(App.Vector(0,0,P['nose_len']+P['mid_len']))
+    return beam1.fuse(beam2)
+
+# ========================
+# Antena + parabólica
+# ========================
+def build_antenna(P):
+    mast = Part.makeCylinder(P['mast_r'], P['mast_l'])
+    mast.translate(App.Vector(P['mid_d']/2+100,0,P['nose_len']+P['mid_len']))
+    # Plato comprimido (paraboloide aproximado) mediante cono corto
+    dish_flat = Part.makeCone(P['dish_r'], P['dish_r']-200.0, 180.0)
+    dish_flat.translate(App.Vector(P['mid_d']/2+100,0,P['nose_len']+P['mid_len']+P['mast_l']))
+    return mast.fuse(dish_flat)
+
+# ========================
+# Tren de aterrizaje 4 patas
+# ========================
+def build_landing(P):
+    leg = Part.makeCylinder(P['leg_r'], P['leg_l'])
+    leg.translate(App.Vector(P['mid_d']/2, 0, 0))
+    foot = Part.makeCylinder(P['foot_r'], P['foot_t'])
+    foot.translate(App.Vector(P['mid_d']/2, 0, -P['foot_t']))
+    # Pata a 0° construida una vez, copiada a 90/180/270
+    return patterns.polar(leg.fuse(foot), 4, axis=(0,0,1), result="fuse")
+
+# ========================
+# Paneles solares retráctiles con sistema de enfriamiento
+# ========================
+def build_solar_panels(P):
+    panels = []
+    for i in range(P['panel_count']):
+        ang = i * (360.0 / P['panel_count'])
+        boom = Part.makeCylinder(P['boom_r'], P['boom_l'])
+        boom.translate(App.Vector(P['mid_d']/2 * math.cos(math.radians(ang)),
+                                  P['mid_d']/2 * math.sin(math.radians(ang)),
+                                  P['nose_len'] + P['mid_len'] + 500))
+        panel = Part.makeBox(P['panel_l'], P['panel_w'], P['panel_th'])
+        panel.translate(App.Vector(P['mid_d']/2 * math.cos(math.radians(ang)) + P['boom_l'] * math.cos(math.radians(ang)),
+                                   P['mid_d']/2 * math.sin(math.radians(ang)) + P['boom_l'] * math.sin(math.radians(ang)),
+                                   P['nose_len'] + P['mid_len'] + 500))
+        # Cooling tubes
+        cooling = Part.makeCylinder(P['cooling_tube_r'], P['panel_l'])
+        cooling.translate(App.Vector(P['mid_d']/2 * math.cos(math.radians(ang)) + P['boom_l'] * math.cos(math.radians(ang)),
+                                     P['mid_d']/2 * math.sin(math.radians(ang)) + P['boom_l'] * math.sin(math.radians(ang)),
+                                     P['nose_len'] + P['mid_len'] + 500 + P['panel_th']/2))
+        panels.append(boom.fuse(panel).fuse(cooling))
+    solar_panels = panels[0]
+    for p in panels[1:]:
+        solar_panels = solar_panels.fuse(p)
+    return solar_panels
+
+# ========================
+# Instrumentos científicos
+# ========================
+def build_instruments(P):
+    # FIELDS: booms for electric/magnetic fields
+    fields_boom = Part.makeCylinder(P['fields_boom_r'], P['fields_boom_l'])
+    fields_boom.translate(App.Vector(0, P['mid_d']/2 + 200, P['nose_len'] + 1000))
+    fields_sensor = Part.makeSphere(P['fields_sensor_r'])
+    fields_sensor.translate(App.Vector(0, P['mid_d']/2 + 200 + P['fields_boom_l'], P['nose_len'] + 1000))
+    fields = fields_boom.fuse(fields_sensor)
+
+    # SWEAP: particle detector
+    sweap = Part.makeSphere(P['sweap_sensor_r'])
+    sweap.translate(App.Vector(P['mid_d']/2 + 300, 0, P['nose_len'] + 1500))
+
+    # ISʘIS: energetic particles
+    isis = Part.makeSphere(P['isis_sensor_r'])
+    isis.translate(App.Vector(-P['mid_d']/2 - 300, 0, P['nose_len'] + 1500))
+
+    # WISPR: cameras
+    wispr = Part.makeSphere(P['wispr_camera_r'])
+    wispr.translate(App.Vector(0, -P['mid_d']/2 - 200, P['nose_len'] + 2000))
+
+    return fuse_all([fields, sweap, isis, wispr], clusters=P.get('fuse_clusters', False))
+
+# ========================
+# Antenas de alta ganancia
+# ========================
+def build_hg_antenna(P):
+    hg_mast = Part.makeCylinder(P['mast_r'], P['hg_antenna_mast_l'])
+    hg_mast.translate(App.Vector(-P['mid_d']/2 - 200, 0, P['nose_len'] + P['mid_len'] + 1000))
+    hg_dish = Part.makeCone(P['hg_antenna_dish_r'], P['hg_antenna_dish_r'] - 300, 200)
+    hg_dish.translate(App.Vector(-P['mid_d']/2 - 200, 0, P['nose_len'] + P['mid_len'] + 1000 + P['hg_antenna_mast_l']))
+    return hg_mast.fuse(hg_dish)
+
+# ========================
+# Sensores de navegación solar
+# ========================
+def build_nav(P):
+    sensor = Part.makeSphere(P['nav_sensor_r'])
+    sensor.translate(App.Vector(P['mid_d']/2, 0, P['nose_len'] + 500))
+    return fuse_all(patterns.polar(sensor, P['nav_sensor_count'], axis=(0,0,1), result="list"),
+                    clusters=P.get('fuse_clusters', False))
+
+# ========================
+# Truss estructural (con interfaces CNC si P['interface_holes_count'])
+# ========================
+def build_truss(P):
+    beam = Part.makeCylinder(P['truss_beam_r'], P['truss_beam_l'])
+    beam.translate(App.Vector(P['mid_d']/2, 0, P['nose_len']))
+    ring = patterns.polar_placements(P['truss_count'], axis=(0,0,1))
+    truss = patterns.pattern(beam, ring, result="fuse")
+
+    # Agujeros de interfaz en cada beam: columna lineal en Z repetida en cada beam
+    n_holes = P.get('interface_holes_count', 0)
+    if n_holes:
+        hole = Part.makeCylinder(P['interface_holes_d']/2, P['truss_beam_r'] * 2)
+        hole.translate(App.Vector(P['mid_d']/2, 0, P['nose_len']))
+        column = patterns.linear_placements(n_holes, (0, 0, P['truss_beam_l'] / n_holes))
+        truss = cut_all(truss, patterns.instances(hole, patterns.compose(ring, column)))
+    return truss
+
+# ========================
+# Base de montaje (con agujeros para pernos si P['bolt_count'])
+# ========================
+def build_base(P):
+    base = Part.makeCylinder(P['base_d']/2, P['base_h'])
+    base.translate(App.Vector(0, 0, -P['base_h']))
+    if P.get('bolt_count', 0):
+        hole = Part.makeCylinder(P['bolt_d']/2, P['base_h'])
+        hole.translate(App.Vector(P['base_d']/2 - 200, 0, -P['base_h']))
+        # Todos los pernos en una sola booleana
+        base = cut_all(base, patterns.polar(hole, P['bolt_count'], axis=(0,0,1), result="list"))
+    return base
+
+# Orden del ensamblaje final (el mismo que la cadena original)
+SUBASSEMBLIES = ["hull", "shield", "hull_shield", "reactor_shield", "cockpit", "reactor", "hab", "tanks",
+                 "wings", "collar", "deflectors", "docking", "sensors", "beams", "antenna", "landing",
+                 "solar_panels", "instruments", "hg_antenna", "nav", "truss", "base"]
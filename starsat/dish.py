@@ -0,0 +1,75 @@
+# Platos parabólicos y perfiles de revolución con curva exacta
+# Las macros aproximaban z = a·r² con polilíneas de 48..160 puntos, y al
+# revolucionar cada segmento daba una cara (cientos de caras por plato que luego
+# pagan todas las booleanas, fillets y la exportación STEP). Un arco de parábola
+# es exactamente una Bézier cuadrática: polos (r0, a·r0²), ((r0+r1)/2, a·r0·r1),
+# (r1, a·r1²); revolucionada da una sola cara de revolución.
+#
+#   from starsat import dish
+#   bell = dish.paraboloid_solid(d, depth)          # sólido lleno (cúpula/tobera)
+#   ant  = dish.parabola_dish(d, depth, t)          # plato de espesor t (vertical)
+#
+# Las versiones *_polygon reproducen el perfil poligonal original y sólo se
+# usan para comparar (compare() / benchmarks/bench_dish.py).
+
+import FreeCAD as App
+import Part
+
+# etiqueta -> {"exact": caras, "polygon": caras, "exact_volume", "polygon_volume"}
+FACE_STATS = {}
+
+def _v(r, z):
+    return App.Vector(r, 0, z)
+
+def _revolve(edges):
+    face = Part.Face(Part.Wire(edges))
+    return face.revolve(App.Vector(0,0,0), App.Vector(0,0,1), 360)
+
+def parabola_arc(a, r0, r1, dz=0.0):
+    # Arco exacto de z = a·r² + dz entre r0 y r1 (plano XZ)
+    c = Part.BezierCurve()
+    c.setPoles([_v(r0, a*r0*r0 + dz), _v((r0 + r1)/2.0, a*r0*r1 + dz), _v(r1, a*r1*r1 + dz)])
+    return c.toShape()
+
+# ===================== Curva exacta =====================
+def paraboloid_solid(d, depth):
+    # Sólido entre el paraboloide (vértice en el origen) y el plano z = depth
+    if d <= 0 or depth <= 0:
+        return None
+    R = d/2.0; a = depth/(R*R)
+    top = _v(0, depth)
+    return _revolve([Part.makeLine(_v(0, 0), top), Part.makeLine(top, _v(R, depth)), parabola_arc(a, R, 0.0)])
+
+def parabola_dish(d, depth, t):
+    # Plato entre z = a·r² y z = a·r² + t (espesor vertical t, como el original)
+    R = d/2.0; a = depth/(R*R)
+    return _revolve([parabola_arc(a, 0.0, R), Part.makeLine(_v(R, depth), _v(R, depth + t)),
+                     parabola_arc(a, R, 0.0, t), Part.makeLine(_v(0, t), _v(0, 0))])
+
+# ===================== Referencia poligonal =====================
+def paraboloid_polygon(d, depth, steps=128, min_steps=48, z0_eps_factor=1.0):
+    if d <= 0 or depth <= 0:
+        return None
+    f = (d*d) / (16.0*depth)
+    def r(z): return (max(0.0, 4.0*f*z)) ** 0.5
+    steps = max(min_steps, int(steps))
+    z0 = depth / (steps * z0_eps_factor)
+    p_axis_bot = _v(0, z0); p_axis_top = _v(0, depth)
+    outer_pts = [_v(r(z), z) for z in (depth - (depth - z0) * (i/float(steps)) for i in range(steps+1))]
+    return _revolve([Part.makeLine(p_axis_bot, p_axis_top), Part.makeLine(p_axis_top, _v(r(depth), depth)),
+                     Part.makePolygon(outer_pts), Part.makeLine(outer_pts[-1], p_axis_bot)])
+
+def parabola_dish_polygon(d, depth, t, steps=48):
+    rmax = d/2.0; a = depth/(rmax*rmax)
+    curve_in = [(r, a*r*r) for r in [rmax*i/steps for i in range(0, steps+1)]]
+    curve_out = [(r, a*r*r + t) for r in [rmax*i/steps for i in range(steps, -1, -1)]]
+    pts = [_v(x, z) for (x, z) in [(0,0)] + curve_in + curve_out + [(0,t)]]
+    return Part.Face(Part.makePolygon(pts + [pts[0]])).revolve(App.Vector(0,0,0), App.Vector(0,0,1), 360)
+
+# ===================== Comparación =====================
+def compare(label, exact, polygon):
+    FACE_STATS[label] = {"exact": len(exact.Faces), "polygon": len(polygon.Faces),
+                         "exact_volume": exact.Volume, "polygon_volume": polygon.Volume}
+    App.Console.PrintMessage("dish[%s]: %d caras (exacto) frente a %d (poligonal), volumen %.1f / %.1f mm3\n" % (
+        label, len(exact.Faces), len(polygon.Faces), exact.Volume, polygon.Volume))
+    return FACE_STATS[label]
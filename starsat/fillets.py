@@ -0,0 +1,195 @@
+# Redondeos dirigidos (sustituye a safe_fillet / fillet_between)
+# makeFillet(r, shape.Edges) sobre todas las aristas casi siempre falla en
+# algún punto y, tras varios segundos, se devolvía el sólido sin redondear.
+# Aquí:
+#   - con operandos (resultado de una fusión) sólo se redondean las aristas de
+#     la costura: las que están a la vez sobre la piel de dos operandos distintos
+#     (Part no expone en Python el historial arista a arista de fuse());
+#   - se descartan aristas degeneradas y costuras de superficies periódicas
+#     (arista con una sola cara vecina: generatriz de cilindros/conos/toros);
+#   - se prueba por lotes pequeños; si un lote falla se parte en dos hasta
+#     aislar las aristas imposibles, que se omiten;
+#   - las aristas imposibles se guardan por huella geométrica (sha256 del BREP
+#     + radio) en un JSON persistente: en la siguiente reconstrucción del mismo
+#     sólido no se vuelven a intentar.
+#
+#   from starsat.fillets import fillet_edges, fillet_fuse
+#   hull = fillet_fuse([nose, mid, rear], P["hull_fillet_r"])
+#   cone = fillet_edges(cone, P["nozzle_fillet_r"])
+
+import hashlib
+import json
+import os
+
+import FreeCAD as App
+import Part
+
+from starsat.booleans import fuse_all
+from starsat.profiling import note_failure
+
+DEFAULT_BATCH = 8
+SEAM_TOL = 1e-4
+
+# Contadores de la última llamada
+LAST_STATS = {"candidates": 0, "filleted": 0, "failed": 0, "skipped_known": 0,
+              "skipped_seam": 0, "attempts": 0, "cached_shape": False}
+
+_DB = None
+
+# ===================== Caché de fallos =====================
+def db_path():
+    return os.environ.get("STARSAT_FILLET_DB") or os.path.join(App.getUserAppDataDir(), "starsat_fillet_failures.json")
+
+def _db():
+    global _DB
+    if _DB is None:
+        try:
+            with open(db_path(), encoding="utf-8") as f:
+                _DB = json.load(f)
+        except (OSError, ValueError):
+            _DB = {}
+    return _DB
+
+def _save_db():
+    path = db_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_db(), f)
+        os.replace(tmp, path)
+    except OSError as e:
+        App.Console.PrintWarning("fillets: no se pudo guardar %s (%s)\n" % (path, e))
+
+def clear_failures():
+    global _DB
+    _DB = {}
+    _save_db()
+
+def shape_key(shape, r):
+    h = hashlib.sha256(shape.exportBrepToString().encode("utf-8"))
+    h.update(("|r=%.6g" % r).encode("utf-8"))
+    return h.hexdigest()
+
+# ===================== Selección de aristas =====================
+def _mid(edge):
+    return edge.valueAt((edge.FirstParameter + edge.LastParameter) / 2.0)
+
+def _ekey(edge):
+    p = _mid(edge)
+    return "%.3f,%.3f,%.3f" % (p.x, p.y, p.z)
+
+def _is_periodic_seam(shape, edge):
+    try:
+        return len(shape.ancestorsOfType(edge, Part.Face)) < 2
+    except Exception:
+        return False
+
+def candidate_edges(shape, edges=None):
+    out = []
+    for e in (shape.Edges if edges is None else edges):
+        if e.Degenerated or e.Length <= SEAM_TOL:
+            continue
+        if _is_periodic_seam(shape, e):
+            LAST_STATS["skipped_seam"] += 1
+            continue
+        out.append(e)
+    return out
+
+def _on_skin(skin, point, tol):
+    bb = skin.BoundBox
+    bb.enlarge(tol)
+    if not bb.isInside(point):
+        return False
+    return skin.distToShape(Part.Vertex(point))[0] <= tol
+
+def seam_edges(shape, operands, tol=SEAM_TOL):
+    # Aristas creadas por la fusión: su punto medio toca la piel de >= 2 operandos
+    skins = [Part.Compound(o.Faces) for o in operands if o is not None and not o.isNull()]
+    out = []
+    for e in shape.Edges:
+        p = _mid(e)
+        if sum(1 for s in skins if _on_skin(s, p, tol)) >= 2:
+            out.append(e)
+    return out
+
+def _relocate(shape, keys, tol):
+    # Tras un redondeo las aristas son nuevas: se buscan por su punto medio original
+    found = []
+    for k in keys:
+        p = App.Vector(*[float(c) for c in k.split(",")])
+        best, dist = None, tol
+        for e in shape.Edges:
+            bb = e.BoundBox
+            bb.enlarge(tol)
+            if not bb.isInside(p):
+                continue
+            d = e.distToShape(Part.Vertex(p))[0]
+            if d <= dist:
+                best, dist = e, d
+        if best is not None:
+            found.append(best)
+    return found
+
+# ===================== Redondeo por lotes =====================
+def _try(shape, r, keys, tol):
+    LAST_STATS["attempts"] += 1
+    edges = _relocate(shape, keys, tol)
+    if not edges:
+        return None
+    err = None
+    try:
+        out = shape.makeFillet(r, edges)
+        if out is not None and not out.isNull() and out.isValid():
+            return out
+    except Exception as e:
+        err = e
+    note_failure("fillet_edges", err)
+    return None
+
+def _fillet_batch(shape, r, keys, tol, failed):
+    out = _try(shape, r, keys, tol)
+    if out is not None:
+        LAST_STATS["filleted"] += len(keys)
+        return out
+    if len(keys) == 1:
+        failed.append(keys[0])
+        return shape
+    mid = len(keys) // 2
+    return _fillet_batch(_fillet_batch(shape, r, keys[:mid], tol, failed), r, keys[mid:], tol, failed)
+
+def fillet_edges(shape, r, edges=None, batch=DEFAULT_BATCH, tol=None):
+    LAST_STATS.update(candidates=0, filleted=0, failed=0, skipped_known=0, skipped_seam=0, attempts=0, cached_shape=False)
+    if shape is None or shape.isNull() or r <= 0:
+        return shape
+    tol = tol if tol is not None else max(SEAM_TOL, r * 1e-3)
+    keys = [_ekey(e) for e in candidate_edges(shape, edges)]
+    LAST_STATS["candidates"] = len(keys)
+
+    db = _db()
+    skey = shape_key(shape, r)
+    known = set(db.get(skey, []))
+    if known:
+        LAST_STATS["cached_shape"] = True
+        LAST_STATS["skipped_known"] = sum(1 for k in keys if k in known)
+        keys = [k for k in keys if k not in known]
+
+    failed = []
+    result = shape
+    for i in range(0, len(keys), max(1, batch)):
+        result = _fillet_batch(result, r, keys[i:i+batch], tol, failed)
+    LAST_STATS["failed"] = len(failed)
+    if failed:
+        db[skey] = sorted(known | set(failed))
+        _save_db()
+        App.Console.PrintWarning("fillets: %d de %d aristas sin redondear (r=%g), guardadas para no reintentarlas\n" % (
+            len(failed), len(failed) + LAST_STATS["filleted"], r))
+    return result
+
+def fillet_fuse(operands, r, batch=DEFAULT_BATCH, fuse_mode="multi"):
+    # Fusiona y redondea sólo las aristas de unión entre operandos
+    operands = [o for o in operands if o is not None]
+    fused = fuse_all(operands, mode=fuse_mode)
+    if fused is None or len(operands) < 2:
+        return fused
+    return fillet_edges(fused, r, seam_edges(fused, operands), batch)
@@ -0,0 +1,120 @@
+# Greebles (detallitos) agrupados en pocos objetos del documento
+# Cada macro genera sus greebles con su propio random.seed(42) y la misma
+# secuencia de sorteos que antes, pero en lugar de llamar a add_obj por greeble
+# entrega una lista de especificaciones:
+#   (nombre, [(proto, base, tamaño), ...])     proto: "box" | "cyl"
+#   box: base = esquina inferior, tamaño = (w, d, h)
+#   cyl: base = centro de la cara inferior, tamaño = (r, r, h)   (eje Z)
+# y emit() las vuelca al documento según el modo:
+#   "compound" -> un único Part::Feature con el Part.Compound de todos
+#   "link"     -> un prototipo unitario por tipo (caja/cilindro, ocultos) y un
+#                 App::Link en array por prototipo (PlacementList + ScaleList):
+#                 el documento no guarda ningún BREP por greeble
+#   "objects"  -> un Part::Feature por greeble (comportamiento original)
+#
+#   from starsat import greebles
+#   greebles.emit(doc, specs, P['greeble_mode'], "Greebles_Deck", P['col_greeble'], g_gree)
+#
+# LAST_STATS guarda objetos creados/ahorrados y una estimación de los bytes de
+# BREP almacenados frente al modo "objects".
+
+import FreeCAD as App
+import Part
+
+from starsat.primitives import add_obj
+
+GREEBLE_MODES = ("compound", "link", "objects")
+
+LAST_STATS = {"mode": None, "greebles": 0, "objects": 0, "objects_saved": 0,
+              "brep_bytes": 0, "brep_bytes_saved": 0}
+
+_BREP_SIZE = {}
+
+# ===================== Geometría =====================
+def _unit(proto):
+    if proto == "box":
+        return Part.makeBox(1, 1, 1)
+    if proto == "cyl":
+        return Part.makeCylinder(1, 1)
+    raise ValueError("greebles: prototipo desconocido '%s' (usar box, cyl)" % proto)
+
+def _solid(proto, base, size):
+    if proto == "box":
+        return Part.makeBox(size[0], size[1], size[2], App.Vector(*base))
+    if proto == "cyl":
+        return Part.makeCylinder(size[0], size[2], App.Vector(*base))
+    raise ValueError("greebles: prototipo desconocido '%s' (usar box, cyl)" % proto)
+
+def _shape(parts):
+    solids = [_solid(*p) for p in parts]
+    return solids[0] if len(solids) == 1 else Part.Compound(solids)
+
+def _brep_size(proto):
+    # El BREP de una caja/cilindro no depende de sus dimensiones
+    if proto not in _BREP_SIZE:
+        _BREP_SIZE[proto] = len(_unit(proto).exportBrepToString())
+    return _BREP_SIZE[proto]
+
+# ===================== Volcado al documento =====================
+def _emit_objects(doc, specs, color, group):
+    return [add_obj(_shape(parts), name, color, group, doc=doc) for name, parts in specs]
+
+def _emit_compound(doc, specs, name, color, group):
+    solids = [_solid(*p) for _, parts in specs for p in parts]
+    return [add_obj(Part.makeCompound(solids), name, color, group, doc=doc)]
+
+def _emit_links(doc, specs, name, color, group):
+    by_proto = {}
+    for _, parts in specs:
+        for proto, base, size in parts:
+            by_proto.setdefault(proto, []).append((base, size))
+    out = []
+    try:
+        for proto in sorted(by_proto):
+            items = by_proto[proto]
+            src = add_obj(_unit(proto), "%s_Proto_%s" % (name, proto), color, group, doc=doc)
+            out.append(src)
+            try: src.ViewObject.Visibility = False
+            except Exception: pass
+            link = doc.addObject("App::Link", "%s_%s" % (name, proto))
+            out.append(link)
+            link.LinkedObject = src
+            link.ShowElement = False
+            link.ElementCount = len(items)
+            link.PlacementList = [App.Placement(App.Vector(*b), App.Rotation()) for b, _ in items]
+            link.ScaleList = [App.Vector(*s) for _, s in items]
+            if group:
+                try: group.addObject(link)
+                except Exception: pass
+    except Exception:
+        for o in reversed(out):
+            try: doc.removeObject(o.Name)
+            except Exception: pass
+        raise
+    return out
+
+def emit(doc, specs, mode="compound", name="Greebles", color=None, group=None):
+    if mode not in GREEBLE_MODES:
+        raise ValueError("greebles: modo desconocido '%s' (usar %s)" % (mode, ", ".join(GREEBLE_MODES)))
+    n_parts = sum(len(parts) for _, parts in specs)
+    full = sum(_brep_size(p[0]) for _, parts in specs for p in parts)
+    if not specs:
+        objs = []
+    elif mode == "objects":
+        objs = _emit_objects(doc, specs, color, group)
+    elif mode == "compound":
+        objs = _emit_compound(doc, specs, name, color, group)
+    else:
+        try:
+            objs = _emit_links(doc, specs, name, color, group)
+        except Exception as e:
+            # Versiones sin ScaleList en App::Link: se vuelve al compuesto
+            App.Console.PrintWarning("greebles: App::Link no disponible (%s), se usa un compuesto\n" % e)
+            mode = "compound"
+            objs = _emit_compound(doc, specs, name, color, group)
+    stored = sum(_brep_size(p) for p in set(p[0] for _, parts in specs for p in parts)) if mode == "link" else full
+    LAST_STATS.update(mode=mode, greebles=len(specs), objects=len(objs), objects_saved=len(specs) - len(objs),
+                      brep_bytes=stored, brep_bytes_saved=full - stored)
+    App.Console.PrintMessage("greebles[%s]: %d greebles (%d sólidos) en %d objetos, %d objetos menos, ~%.1f kB de BREP ahorrados\n" % (
+        mode, len(specs), n_parts, len(objs), len(specs) - len(objs), (full - stored) / 1024.0))
+    return objs
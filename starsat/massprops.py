@@ -0,0 +1,199 @@
+# Propiedades másicas por subconjunto: masa, centro de gravedad y tensor de inercia
+# Por sólido se leen Volume, CenterOfMass y MatrixOfInertia (OCC, densidad
+# unidad, respecto al centro de masas) una sola vez por TShape (hash sin
+# Location) en una caché que vive sólo durante cada report(): se guardan en el
+# sistema local de la TShape y cada copia colocada los recibe transformados con
+# su Placement (c' = R c + t, J' = R J Rᵀ), así que las copias que comparten
+# TShape se integran una vez y nada retiene formas entre informes; los que vienen de primitivas de starsat.primitives
+# usan sus valores analíticos y no se integran. La densidad sale de la propiedad Density que pone
+# starsat.materials.attach (kg/m3). La combinación es vectorizada (NumPy):
+#   m_i = ρ_i·V_i,  c = Σ m_i c_i / M,
+#   I = Σ [ ρ_i·J_i + m_i (|d_i|² E − d_i d_iᵀ) ],  d_i = c_i − c   (Steiner)
+# y se agrega por grupos del documento (App::DocumentObjectGroup) de forma
+# jerárquica: cada grupo incluye sus subgrupos.
+#
+#   from starsat import massprops
+#   rep = massprops.report(doc, exclude=("Assembly_Fused",))
+#   massprops.write(rep, "StarSat")        # <dir>/StarSat.massprops.json / .csv
+#
+# Unidades del informe: masa kg, CdG mm (coordenadas del modelo), inercia kg·m²
+# respecto al CdG de cada grupo.
+
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+import FreeCAD as App
+
+from starsat import primitives
+
+MM3_TO_M3 = 1e-9
+MM5_TO_M5 = 1e-15
+
+# Acumulados desde el último clear_cache()
+CACHE_STATS = {"hits": 0, "misses": 0, "analytic": 0}
+
+# Contadores del último informe
+LAST_STATS = {"objects": 0, "solids": 0, "skipped": 0, "seconds": 0.0}
+
+def out_dir():
+    return os.environ.get("STARSAT_MASSPROPS_DIR") or os.path.join(App.getUserAppDataDir(), "starsat_massprops")
+
+def clear_cache():
+    CACHE_STATS.update(hits=0, misses=0, analytic=0)
+
+# ===================== Sólidos =====================
+def _matrix(m):
+    return np.array([[m.A11, m.A12, m.A13], [m.A21, m.A22, m.A23], [m.A31, m.A32, m.A33]], dtype=float)
+
+def _moved(props, placement):
+    # Transformación rígida de (V, c, J): c' = R c + t, J' = R J Rᵀ
+    V, c, J = props
+    m = placement.toMatrix()
+    R = _matrix(m)
+    return V, R.dot(c) + np.array([m.A14, m.A24, m.A34], dtype=float), R.dot(J).dot(R.T)
+
+def solid_props(solid, cache=None):
+    # (V [mm3], c [mm], J [mm5] respecto al centro de masas con densidad 1)
+    # cache: dict opcional del llamante (report() usa uno por informe) con los
+    # datos en el sistema local de cada TShape; se guarda el sólido junto a
+    # ellos para que la TShape no se libere y el hash no se reutilice para otra
+    # forma mientras dure la caché
+    a = primitives.analytic(solid)
+    if a is not None:
+        CACHE_STATS["analytic"] += 1
+        return a["volume"], a["centroid"], a["inertia"]
+    key = solid.located(App.Placement()).hashCode()
+    hit = cache.get(key) if cache is not None else None
+    if hit is not None and hit[0].isPartner(solid):
+        CACHE_STATS["hits"] += 1
+        return _moved(hit[1], solid.Placement)
+    CACHE_STATS["misses"] += 1
+    c = solid.CenterOfMass
+    props = (solid.Volume, np.array([c.x, c.y, c.z], dtype=float), _matrix(solid.MatrixOfInertia))
+    if cache is not None:
+        cache[key] = (solid, _moved(props, solid.Placement.inverse()))
+    return props
+
+# ===================== Combinación vectorizada =====================
+def combine(mass, com, inertia):
+    # mass (n,), com (n,3) [m], inertia (n,3,3) [kg·m²] respecto a cada com
+    M = float(mass.sum())
+    if M <= 0:
+        return 0.0, np.zeros(3), np.zeros((3, 3))
+    c = (mass[:, None] * com).sum(axis=0) / M
+    d = com - c
+    steiner = mass[:, None, None] * (np.einsum("ni,ni->n", d, d)[:, None, None] * np.eye(3) - np.einsum("ni,nj->nij", d, d))
+    return M, c, (inertia + steiner).sum(axis=0)
+
+def _object_arrays(objs, density):
+    # Un registro por sólido: índice de objeto, masa [kg], com [m], inercia [kg·m²]
+    owner, V, C, J, rho = [], [], [], [], []
+    cache = {}
+    for i, o in enumerate(objs):
+        for s in o.Shape.Solids:
+            v, c, j = solid_props(s, cache)
+            owner.append(i); V.append(v); C.append(c); J.append(j); rho.append(density[i])
+    if not owner:
+        return np.zeros(0, dtype=int), np.zeros(0), np.zeros((0, 3)), np.zeros((0, 3, 3))
+    rho = np.array(rho)
+    mass = np.array(V) * MM3_TO_M3 * rho
+    com = np.array(C) * 1e-3
+    inertia = np.array(J) * MM5_TO_M5 * rho[:, None, None]
+    return np.array(owner), mass, com, inertia
+
+# ===================== Árbol de grupos =====================
+def _is_group(o):
+    return o.isDerivedFrom("App::DocumentObjectGroup")
+
+def _density(o, density):
+    if density and o.Name in density:
+        return density[o.Name]
+    return getattr(o, "Density", None)
+
+def _node(name, members, index, arrays):
+    owner, mass, com, inertia = arrays
+    sel = np.isin(owner, [index[o.Name] for o in members if o.Name in index])
+    M, c, I = combine(mass[sel], com[sel], inertia[sel])
+    return {"name": name, "objects": int(sum(1 for o in members if o.Name in index)), "mass_kg": M,
+            "cog_mm": (c * 1e3).tolist(), "inertia_kg_m2": I.tolist(), "children": []}
+
+def _members(group):
+    out = []
+    for o in group.Group:
+        out += _members(o) if _is_group(o) else [o]
+    return out
+
+def _tree(group, index, arrays):
+    node = _node(group.Label, _members(group), index, arrays)
+    node["children"] = [_tree(g, index, arrays) for g in group.Group if _is_group(g)]
+    return node
+
+def report(doc=None, density=None, exclude=()):
+    # density: {nombre de objeto: kg/m3} opcional; si no, la propiedad Density
+    t0 = time.perf_counter()
+    doc = doc if doc is not None else App.ActiveDocument
+    objs, rho, skipped = [], [], 0
+    for o in doc.Objects:
+        if _is_group(o) or o.Name in exclude or o.Label in exclude:
+            continue
+        sh = getattr(o, "Shape", None)
+        if sh is None or sh.isNull() or not sh.Solids:
+            continue
+        d = _density(o, density)
+        if not d:
+            skipped += 1
+            continue
+        objs.append(o); rho.append(float(d))
+    index = dict((o.Name, i) for i, o in enumerate(objs))
+    arrays = _object_arrays(objs, rho)
+
+    root = _node(doc.Label, objs, index, arrays)
+    grouped = set()
+    tops = [g for g in doc.Objects if _is_group(g) and not any(_is_group(p) for p in g.InList)]
+    for g in tops:
+        root["children"].append(_tree(g, index, arrays))
+        grouped.update(o.Name for o in _members(g))
+    loose = [o for o in objs if o.Name not in grouped]
+    if loose and tops:
+        root["children"].append(_node("(sin grupo)", loose, index, arrays))
+    LAST_STATS.update(objects=len(objs), solids=len(arrays[0]), skipped=skipped, seconds=time.perf_counter() - t0)
+    return root
+
+# ===================== Salidas =====================
+def _rows(node, path=""):
+    path = node["name"] if not path else path + "/" + node["name"]
+    I = node["inertia_kg_m2"]
+    yield [path, node["objects"], "%.6g" % node["mass_kg"]] + ["%.6g" % v for v in node["cog_mm"]] + \
+          ["%.6g" % v for v in (I[0][0], I[1][1], I[2][2], I[0][1], I[0][2], I[1][2])]
+    for ch in node["children"]:
+        for r in _rows(ch, path):
+            yield r
+
+def write_json(rep, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rep, f, indent=1, ensure_ascii=False)
+    return path
+
+def write_csv(rep, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["grupo", "objetos", "masa_kg", "cdg_x_mm", "cdg_y_mm", "cdg_z_mm",
+                    "Ixx", "Iyy", "Izz", "Ixy", "Ixz", "Iyz"])
+        for r in _rows(rep):
+            w.writerow(r)
+    return path
+
+def write(rep, name, directory=None):
+    directory = directory or out_dir()
+    os.makedirs(directory, exist_ok=True)
+    paths = {"json": write_json(rep, os.path.join(directory, name + ".massprops.json")),
+             "csv": write_csv(rep, os.path.join(directory, name + ".massprops.csv"))}
+    c = rep["cog_mm"]
+    App.Console.PrintMessage("massprops: %.2f kg, CdG (%.1f, %.1f, %.1f) mm, %d objetos / %d sólidos en %.1f ms -> %s\n" % (
+        rep["mass_kg"], c[0], c[1], c[2], LAST_STATS["objects"], LAST_STATS["solids"],
+        1e3 * LAST_STATS["seconds"], paths["csv"]))
+    return paths
@@ -0,0 +1,177 @@
+# Registro único de materiales y asignación por lotes
+# Sustituye a las tablas repartidas por las macros (MAT en tuplas de
+# Direct_Fusion_DriveDS, MATS de StarSat_CC_advanced / SparrowMetals_NoPannels,
+# MAT + set_mat de DFD_GreyScale, dicts mat={...} de RadiationBlackCapsuleShield)
+# y a tag_material_props, que hacía hasattr/addProperty por propiedad y objeto.
+#
+# Campos normalizados de cada material (todos opcionales salvo name):
+#   name, density [kg/m3], emissivity, k [W/mK], Tmax [K], TmaxC [°C],
+#   (Tmax o TmaxC, nunca ambos: los límites tomados de tablas en °C van en
+#   TmaxC y thermal/tps los pasan a K)
+#   E [GPa], nu, CTE [1/K], cp [J/kgK], corrosion (0..1), notes
+# Cualquier otro campo (type, Ex/Ey/Ez [GPa], nu_xy...) va al mapa MaterialData.
+#
+# Uso: las macros acumulan parejas (objeto, material) mientras construyen y
+# las asignan de una vez al final:
+#   from starsat import materials
+#   MAT_PAIRS.append((obj, "CFRP"))                 # clave del registro
+#   MAT_PAIRS.append((obj, {"name": "GradedZ", "density": 18000.0}))
+#   table = materials.attach(MAT_PAIRS)             # volúmenes y masas en un paso NumPy
+#                                                   # (analíticos para primitivas, ver primitives.volume)
+#   mass, avg = materials.totals(table, objs, "corrosion")
+# Los constructores @cached_builder que difieren materiales se decoran con
+# @cached_builder(pending=MAT_PAIRS): en una recarga de la caché las parejas
+# de los objetos recreados vuelven a MAT_PAIRS (ver starsat.cache).
+# Todas las propiedades de material de un objeto van al grupo "Meta".
+
+import time
+
+import numpy as np
+
+import FreeCAD as App
+
+from starsat import primitives
+
+GROUP = "Meta"
+
+# ===================== Registro =====================
+REGISTRY = {
+    # Aleaciones metálicas
+    "AL":            {"name": "AA-2xxx", "density": 2700.0, "E": 72.0, "nu": 0.33, "corrosion": 0.3, "type": "isotropic"},
+    "6061":          {"name": "AA-6061-T6", "density": 2710.0, "corrosion": 0.4},
+    "AL7075":        {"name": "Al_7075", "density": 2700.0, "emissivity": 0.09, "k": 130.0, "E": 71.0, "nu": 0.33, "CTE": 23e-6, "cp": 960.0},
+    "316L":          {"name": "SS-316L", "density": 7980.0, "corrosion": 0.8},
+    "718":           {"name": "Inconel-718", "density": 8190.0, "emissivity": 0.3, "k": 11.4, "Tmax": 923.0, "cp": 435.0, "corrosion": 0.9},
+    "STEEL":         {"name": "SS-304", "density": 8000.0, "E": 200.0, "nu": 0.30, "type": "isotropic"},
+    "Cu":            {"name": "Copper", "density": 8960.0, "E": 110.0, "nu": 0.34, "corrosion": 0.2, "type": "isotropic"},
+    "TUNGSTEN":      {"name": "Tungsten", "density": 19300.0, "emissivity": 0.35, "k": 173.0, "TmaxC": 3422, "E": 411.0, "nu": 0.28, "CTE": 4.5e-6, "cp": 134.0},
+    # Compuestos
+    "CFRP":          {"name": "CFRP", "density": 1550.0, "emissivity": 0.85, "corrosion": 0.5, "type": "orthotropic", "Ex": 130.0, "Ey": 10.0, "Ez": 10.0, "nu_xy": 0.25},
+    "KEVLAR":        {"name": "Kevlar", "density": 1440.0, "type": "orthotropic", "Ex": 70.0, "Ey": 5.0, "Ez": 5.0, "nu_xy": 0.27},
+    "CC":            {"name": "C/C TPS", "density": 1600.0, "emissivity": 0.8, "k": 40.0, "TmaxC": 2500, "cp": 710.0, "corrosion": 0.95, "type": "orthotropic", "Ex": 70.0, "Ey": 70.0, "Ez": 10.0, "nu_xy": 0.2},
+    "CC_Noz":        {"name": "C/C Nozzle", "density": 1600.0, "corrosion": 0.95},
+    "CC_Shield":     {"name": "C/C Shield", "density": 1600.0, "corrosion": 0.95},
+    "C_C_3D_CVI":    {"name": "C/C_3D_CVI", "density": 1870.0, "emissivity": 0.65, "k": 40.0, "TmaxC": 2500, "E": 150.0, "nu": 0.15, "CTE": 1e-6, "cp": 710.0},
+    "C_C_PITCH":     {"name": "C/C_PITCH", "density": 1900.0, "emissivity": 0.70, "k": 45.0, "TmaxC": 2500, "E": 120.0, "nu": 0.18, "CTE": 2e-6, "cp": 710.0},
+    # Cerámicas y protecciones térmicas
+    "CER":           {"name": "SiC Liner", "density": 3200.0, "corrosion": 0.98},
+    "CER_Coat":      {"name": "SiC Coating", "density": 3200.0, "emissivity": 0.9, "k": 100.0, "TmaxC": 1900, "cp": 750.0, "corrosion": 0.98},
+    "BORON_CARBIDE": {"name": "B4C", "density": 2520.0, "emissivity": 0.85, "k": 30.0, "TmaxC": 2450, "E": 460.0, "nu": 0.17, "CTE": 4.5e-6, "cp": 950.0},
+    "NEXTEL":        {"name": "Nextel_Af700", "density": 3200.0, "emissivity": 0.85, "k": 0.5, "TmaxC": 1200, "E": 150.0, "nu": 0.25, "CTE": 3e-6, "cp": 1050.0},
+    "ABLATOR_PICA":  {"name": "PICA_like", "density": 320.0, "emissivity": 0.88, "k": 0.12, "TmaxC": 1800, "E": 0.5, "nu": 0.3, "CTE": 1e-4, "cp": 1600.0},
+    "FOAM":          {"name": "Carbon foam", "density": 220.0, "emissivity": 0.85, "k": 0.3, "Tmax": 2300.0, "cp": 710.0},
+    "AEROGEL":       {"name": "Silica aerogel", "density": 150.0, "emissivity": 0.8, "k": 0.02, "Tmax": 1073.0, "cp": 1000.0},
+    "MLI":           {"name": "MLI", "density": 1420.0, "emissivity": 0.02, "k": 0.02, "E": 0.1, "nu": 0.35, "CTE": 5e-5, "cp": 1000.0},
+    "POLY":          {"name": "Polyethylene", "density": 950.0, "emissivity": 0.9, "k": 0.42, "E": 1.0, "nu": 0.4, "CTE": 200e-6, "cp": 2300.0},
+}
+
+# Claves alternativas usadas por las macros antiguas
+ALIASES = {"COPPER": "Cu"}
+
+# campo -> (propiedad, tipo, descripción)
+PROPERTIES = [
+    ("name",       "Material",              "App::PropertyString",  "Material"),
+    ("density",    "Density",               "App::PropertyFloat",   "Densidad (kg/m3)"),
+    ("emissivity", "Emissivity",            "App::PropertyFloat",   "Emisividad"),
+    ("k",          "ThermalConductivity",   "App::PropertyFloat",   "Conductividad térmica (W/mK)"),
+    ("Tmax",       "Tmax",                  "App::PropertyFloat",   "Temperatura máxima (K)"),
+    ("TmaxC",      "TmaxC",                 "App::PropertyInteger", "Temperatura máxima (°C)"),
+    ("E",          "YoungsModulus",         "App::PropertyFloat",   "Young's Modulus (GPa)"),
+    ("nu",         "PoissonsRatio",         "App::PropertyFloat",   "Poisson's Ratio"),
+    ("CTE",        "ThermalExpansionCoeff", "App::PropertyFloat",   "CTE (1/K)"),
+    ("cp",         "SpecificHeat",          "App::PropertyFloat",   "Calor específico (J/kgK)"),
+    ("corrosion",  "Corrosion_Resistance",  "App::PropertyFloat",   "Resistencia a corrosión (0..1)"),
+    ("notes",      "MaterialNotes",         "App::PropertyString",  "Notas"),
+]
+_FIELDS = set(f for f, _, _, _ in PROPERTIES)
+_CAST = {"App::PropertyString": str, "App::PropertyFloat": float, "App::PropertyInteger": int}
+
+# Contadores de la última llamada a attach
+LAST_STATS = {"objects": 0, "properties_added": 0, "total_mass_kg": 0.0, "seconds": 0.0}
+
+def resolve(mat):
+    # Clave del registro o dict en línea (acepta 'rho' como density) -> dict normalizado
+    if isinstance(mat, str):
+        key = ALIASES.get(mat, mat)
+        if key not in REGISTRY:
+            raise ValueError("materials: material desconocido '%s' (usar %s)" % (mat, ", ".join(sorted(REGISTRY))))
+        return REGISTRY[key]
+    rec = dict(mat)
+    if "rho" in rec and "density" not in rec:
+        rec["density"] = rec.pop("rho")
+    return rec
+
+def register(key, **fields):
+    if "name" not in fields:
+        raise ValueError("materials: '%s' necesita name" % key)
+    REGISTRY[key] = fields
+    return fields
+
+# ===================== Asignación por lotes =====================
+def _volume(obj):
+    try:
+        return primitives.volume(obj.Shape)
+    except Exception:
+        return 0.0
+
+def _set(obj, existing, prop, ptype, doc, value):
+    added = 0
+    if prop not in existing:
+        obj.addProperty(ptype, prop, GROUP, doc)
+        added = 1
+    setattr(obj, prop, value)
+    return added
+
+def attach(pairs, mass=True):
+    t0 = time.perf_counter()
+    objs, recs = [], []
+    for obj, mat in pairs:
+        if obj is None or mat is None:
+            continue
+        objs.append(obj)
+        recs.append(resolve(mat))
+    n = len(objs)
+    vol = np.fromiter((_volume(o) for o in objs), dtype=float, count=n)                     # mm3
+    rho = np.fromiter((r.get("density", np.nan) for r in recs), dtype=float, count=n)      # kg/m3
+    kg = vol * 1e-9 * rho
+
+    added = 0
+    for i, (obj, rec) in enumerate(zip(objs, recs)):
+        existing = set(obj.PropertiesList)
+        for field, prop, ptype, doc in PROPERTIES:
+            if field in rec:
+                added += _set(obj, existing, prop, ptype, doc, _CAST[ptype](rec[field]))
+        extra = dict((k, str(v)) for k, v in rec.items() if k not in _FIELDS)
+        if extra:
+            added += _set(obj, existing, "MaterialData", "App::PropertyMap", "Datos adicionales del material", extra)
+        if mass and not np.isnan(kg[i]):
+            added += _set(obj, existing, "Mass", "App::PropertyFloat", "Masa (kg)", float(kg[i]))
+
+    table = {"objects": objs, "names": np.array([o.Name for o in objs], dtype=object),
+             "materials": [r.get("name", "") for r in recs], "records": recs,
+             "volume": vol, "density": rho, "mass": kg}
+    LAST_STATS.update(objects=n, properties_added=added, total_mass_kg=float(np.nansum(kg)),
+                      seconds=time.perf_counter() - t0)
+    App.Console.PrintMessage("materials: %d objetos, %d propiedades, %.2f kg en %.1f ms\n" % (
+        n, added, LAST_STATS["total_mass_kg"], 1e3 * LAST_STATS["seconds"]))
+    return table
+
+def column(table, field):
+    # Valores de un campo del registro para cada objeto de la tabla (NaN si falta)
+    return np.fromiter((float(r.get(field, np.nan)) for r in table["records"]), dtype=float, count=len(table["records"]))
+
+def totals(table, objects=None, field=None):
+    # Masa total [kg] y, si se pide, media de `field` ponderada por volumen
+    sel = np.ones(len(table["objects"]), dtype=bool)
+    if objects is not None:
+        names = set(o.Name for o in objects if o is not None)
+        sel = np.fromiter((n in names for n in table["names"]), dtype=bool, count=len(table["names"]))
+    kg = table["mass"][sel]
+    total = float(np.nansum(kg))
+    if field is None:
+        return total
+    vals = column(table, field)[sel]
+    vol = table["volume"][sel] * 1e-9
+    ok = ~np.isnan(vals) & ~np.isnan(kg)
+    wsum = float(np.sum(vol[ok]))
+    return total, (float(np.sum(vals[ok] * vol[ok])) / wsum if wsum > 0 else 0.0)
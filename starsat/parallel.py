@@ -0,0 +1,143 @@
+# Construcción de subconjuntos independientes en procesos trabajadores
+# Cada trabajador importa el módulo de constructores (p.ej. starsat.dfd_xl),
+# ejecuta build_<nombre>(P) y devuelve el sólido como cadena BREP; el proceso
+# principal sólo reconstruye los Shapes y hace el ensamblaje final.
+#
+#   from starsat import dfd_xl
+#   from starsat.parallel import build_subassemblies
+#   S = build_subassemblies(dfd_xl, P, mode='parallel', jobs=0)   # dict nombre -> Shape
+#
+# En POSIX se usa 'fork' (los trabajadores heredan FreeCAD ya cargado). Si el
+# pool no se puede crear o arrancar, o un trabajador muere (BrokenProcessPool),
+# se construye en serie; las excepciones de los constructores (Part.OCCError...)
+# no se capturan y llegan al llamante. Dentro de la GUI nada de esto falla de
+# forma detectable (fork de un proceso Qt con hilos; spawn relanza FreeCAD.exe
+# en Windows): el modo paralelo es para FreeCADCmd/batch_build y las macros
+# eligen 'serial' cuando App.GuiUp.
+# Con track=True cada constructor recibe un TrackingDict y LAST_STATS["deps"]
+# guarda las claves de P que leyó (lo usa starsat.rebuild).
+# map_batches reparte lotes de cálculo NumPy (rayos de starsat.shielding,
+# direcciones de sol de starsat.sunshadow...) con el mismo contexto.
+
+import importlib
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import FreeCAD as App
+import Part
+
+BUILD_MODES = ("serial", "parallel")
+
+# Tiempos de la última llamada (s por subconjunto, total y modo efectivo)
+LAST_STATS = {"mode": None, "jobs": 0, "wall_s": 0.0, "times": {}, "deps": {}}
+
+class TrackingDict(dict):
+    # dict que anota qué claves se leen (incluidas las ausentes consultadas con get/in)
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.accessed = set()
+    def __getitem__(self, key):
+        self.accessed.add(key); return dict.__getitem__(self, key)
+    def get(self, key, default=None):
+        self.accessed.add(key); return dict.get(self, key, default)
+    def __contains__(self, key):
+        self.accessed.add(key); return dict.__contains__(self, key)
+
+def _call(module, name, P, track):
+    params = TrackingDict(P) if track else P
+    shape = getattr(module, "build_" + name)(params)
+    return shape, (sorted(params.accessed) if track else None)
+
+def _build_brep(module_name, name, P, track=False):
+    t0 = time.perf_counter()
+    shape, deps = _call(importlib.import_module(module_name), name, P, track)
+    return name, shape.exportBrepToString(), time.perf_counter() - t0, deps
+
+def _from_brep(brep):
+    s = Part.Shape()
+    s.importBrepFromString(brep)
+    return s
+
+def _context():
+    if sys.platform != "win32" and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+class _PoolUnavailable(Exception):
+    pass
+
+def _submit(jobs, calls, initializer=None, initargs=()):
+    # Crea el pool y encola [(fn, args)...] -> (pool, futuros). Sólo los fallos al
+    # crear o arrancar los procesos pasan a _PoolUnavailable; los errores de cada
+    # llamada llegan tal cual con f.result()
+    pool = None
+    try:
+        pool = ProcessPoolExecutor(max_workers=jobs, mp_context=_context(), initializer=initializer, initargs=initargs)
+        return pool, [pool.submit(fn, *args) for fn, args in calls]
+    except (OSError, RuntimeError) as e:
+        if pool is not None:
+            pool.shutdown(wait=False)
+        raise _PoolUnavailable(e)
+
+def build_serial(module, names, P, track=False):
+    out = {}
+    for n in names:
+        t0 = time.perf_counter()
+        out[n], deps = _call(module, n, P, track)
+        LAST_STATS["times"][n] = time.perf_counter() - t0
+        if track: LAST_STATS["deps"][n] = deps
+    return out
+
+def build_parallel(module, names, P, jobs=0, track=False):
+    jobs = jobs or min(len(names), os.cpu_count() or 1)
+    LAST_STATS["jobs"] = jobs
+    out = {}
+    pool, futs = _submit(jobs, [(_build_brep, (module.__name__, n, dict(P), track)) for n in names])
+    with pool:
+        for f in futs:
+            n, brep, dt, deps = f.result()
+            out[n] = _from_brep(brep)
+            LAST_STATS["times"][n] = dt
+            if track: LAST_STATS["deps"][n] = deps
+    return out
+
+def build_subassemblies(module, P, names=None, mode="parallel", jobs=0, track=False):
+    names = list(names or module.SUBASSEMBLIES)
+    if mode not in BUILD_MODES:
+        raise ValueError("build_subassemblies: modo desconocido '%s' (usar %s)" % (mode, ", ".join(BUILD_MODES)))
+    LAST_STATS.update(mode=mode, jobs=1, times={}, deps={})
+    t0 = time.perf_counter()
+    out = None
+    if mode == "parallel" and len(names) > 1:
+        try:
+            out = build_parallel(module, names, P, jobs, track)
+        except (_PoolUnavailable, BrokenProcessPool) as e:
+            # Sólo fallos del pool; los errores de un constructor se propagan
+            App.Console.PrintWarning("build_subassemblies: pool no disponible (%s), construcción en serie\n" % e)
+            LAST_STATS.update(mode="serial", jobs=1, times={}, deps={})
+    if out is None:
+        out = build_serial(module, names, P, track)
+    LAST_STATS["wall_s"] = time.perf_counter() - t0
+    return out
+
+# ===================== Lotes de cálculo =====================
+def map_batches(fn, batches, jobs=0, initializer=None, initargs=()):
+    # [fn(b) for b in batches] en procesos (jobs 0 = todos los núcleos); initializer
+    # deja en cada trabajador los datos comunes (escena, BVH...). Devuelve
+    # (resultados, procesos usados); en serie si jobs == 1 o el pool falla (los
+    # errores de fn se propagan).
+    jobs = (os.cpu_count() or 1) if jobs == 0 else jobs
+    if jobs > 1 and len(batches) > 1:
+        try:
+            pool, futs = _submit(jobs, [(fn, (b,)) for b in batches], initializer, initargs)
+            with pool:
+                return [f.result() for f in futs], jobs
+        except (_PoolUnavailable, BrokenProcessPool) as e:
+            App.Console.PrintWarning("map_batches: pool no disponible (%s), cálculo en serie\n" % e)
+    if initializer is not None:
+        initializer(*initargs)
+    return [fn(b) for b in batches], 1
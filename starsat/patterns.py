@@ -0,0 +1,80 @@
+# Patrones de instancias (polar, lineal, rejilla)
+# El sólido semilla se construye una sola vez; cada copia es el mismo sólido
+# desplazado (Shape.moved comparte la geometría), sin reconstruir primitivas
+# ni booleanas por copia. El resultado puede ser:
+#   result="compound" -> Part.Compound de las copias (sin booleanas)
+#   result="fuse"     -> una única fusión n-aria (starsat.booleans.fuse_all)
+#   result="list"     -> lista de copias (p.ej. un objeto del documento por copia)
+#
+#   from starsat.patterns import polar
+#   nav_full = polar(sensor, P['nav_sensor_count'], axis=(0,0,1), result="fuse")
+
+import FreeCAD as App
+import Part
+
+from starsat.booleans import fuse_all
+
+PATTERN_RESULTS = ("compound", "fuse", "list")
+
+def _vec(v):
+    return v if isinstance(v, App.Vector) else App.Vector(*v)
+
+# ===================== Colocaciones =====================
+def polar_placements(count, axis=(0,0,1), center=(0,0,0), angle=360.0, start=0.0):
+    # Vuelta completa: paso angle/count (la última copia no coincide con la primera)
+    if abs(angle) >= 360.0:
+        step = angle / float(count)
+    else:
+        step = angle / float(count - 1) if count > 1 else 0.0
+    ax, c = _vec(axis), _vec(center)
+    return [App.Placement(App.Vector(), App.Rotation(ax, start + i*step), c) for i in range(count)]
+
+def linear_placements(count, step):
+    d = _vec(step)
+    return [App.Placement(App.Vector(d.x*i, d.y*i, d.z*i), App.Rotation()) for i in range(count)]
+
+def grid_placements(nx, ny, dx, dy, nz=1, dz=(0,0,0)):
+    ux, uy, uz = _vec(dx), _vec(dy), _vec(dz)
+    out = []
+    for k in range(nz):
+        for j in range(ny):
+            for i in range(nx):
+                out.append(App.Placement(ux*float(i) + uy*float(j) + uz*float(k), App.Rotation()))
+    return out
+
+def compose(outer, inner):
+    # Producto de dos patrones: cada colocación exterior aplicada a cada interior
+    return [o.multiply(i) for o in outer for i in inner]
+
+# ===================== Instancias =====================
+def transformed(seed, placement):
+    try:
+        return seed.moved(placement)
+    except AttributeError:  # FreeCAD < 0.19
+        s = seed.copy()
+        s.Placement = placement.multiply(seed.Placement)
+        return s
+
+def instances(seed, placements):
+    return [transformed(seed, pl) for pl in placements]
+
+def combine(shapes, result="compound", fuse_mode="multi"):
+    if result == "list":
+        return shapes
+    if result == "compound":
+        return Part.makeCompound(shapes)
+    if result == "fuse":
+        return fuse_all(shapes, mode=fuse_mode)
+    raise ValueError("patterns: resultado desconocido '%s' (usar %s)" % (result, ", ".join(PATTERN_RESULTS)))
+
+def pattern(seed, placements, result="compound", fuse_mode="multi"):
+    return combine(instances(seed, placements), result, fuse_mode)
+
+def polar(seed, count, axis=(0,0,1), center=(0,0,0), angle=360.0, start=0.0, result="compound"):
+    return pattern(seed, polar_placements(count, axis, center, angle, start), result)
+
+def linear(seed, count, step, result="compound"):
+    return pattern(seed, linear_placements(count, step), result)
+
+def grid(seed, nx, ny, dx, dy, nz=1, dz=(0,0,0), result="compound"):
+    return pattern(seed, grid_placements(nx, ny, dx, dy, nz, dz), result)
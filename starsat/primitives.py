@@ -0,0 +1,372 @@
+# Biblioteca compartida de primitivas con caché
+# Reúne los helpers que cada macro copiaba (add_obj, rot_to_x, make_cyl_x/cyl_x,
+# make_cone_x, make_torus_x, centered_box, T, R, cyl, cone, ring, poly_prism).
+# Los sólidos se memorizan por sus dimensiones: la primera llamada construye
+# el sólido y las siguientes devuelven una copia colocada que comparte la
+# geometría (TShape), así que cilindros/conos/anillos repetidos (vigas, sensores,
+# pernos...) se construyen una sola vez por sesión.
+# Cada primitiva lleva además sus propiedades analíticas (volumen, área,
+# centroide e inercia con densidad unidad) registradas por su TShape; como
+# located/moved/translate/rotate sólo cambian la Location, analytic(shape)
+# las devuelve en la posición actual sin integrar nada (T y _baked, que sí
+# rehacen la geometría, las propagan). Los resultados booleanos no tienen
+# entrada y volume()/massprops recurren a la integración de OCC.
+# El registro analítico guarda una referencia a cada forma registrada (para que
+# su TShape no se libere y el hash no se reutilice), así que es un LRU de como
+# mucho ANALYTIC_MAX entradas (STARSAT_ANALYTIC_MAX); lo expulsado sólo pierde
+# el atajo y se integra con OCC, y las primitivas memorizadas se vuelven a
+# registrar al reutilizarse. Dura lo que la sesión de FreeCAD o hasta
+# clear_cache().
+# Unidades: mm
+
+import math
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+import FreeCAD as App
+import Part
+
+from starsat import session
+
+X_AXIS = App.Vector(1, 0, 0); Y_AXIS = App.Vector(0, 1, 0); Z_AXIS = App.Vector(0, 0, 1)
+
+# Compartir TShape entre copias (Shape.located); si es False se usa Shape.copy()
+SHARE_TSHAPE = True
+
+_CACHE = {}
+CACHE_STATS = {"hits": 0, "misses": 0}
+
+# TShape -> (forma de referencia, (V, A, c, J) en el sistema local de la TShape),
+# del menos al más reciente
+DEFAULT_ANALYTIC_MAX = 20000
+ANALYTIC_MAX = int(os.environ.get("STARSAT_ANALYTIC_MAX", DEFAULT_ANALYTIC_MAX))
+_ANALYTIC = OrderedDict()
+ANALYTIC_STATS = {"analytic": 0, "occ": 0, "evicted": 0}
+
+# ===================== Caché =====================
+def _num(v):
+    if isinstance(v, (int, float)):
+        return round(float(v), 9)
+    if isinstance(v, (tuple, list)):
+        return tuple(_num(x) for x in v)
+    return v
+
+def _handle(shape):
+    # Nueva referencia al mismo sólido, con su misma Placement
+    if SHARE_TSHAPE:
+        try:
+            return shape.located(shape.Placement)
+        except AttributeError:
+            pass
+    return _share(shape, shape.copy())
+
+def _placed(shape, placement):
+    if SHARE_TSHAPE:
+        try:
+            return shape.located(placement)
+        except AttributeError:
+            pass
+    s = _share(shape, shape.copy())
+    s.Placement = placement
+    return s
+
+def _memo(key, build, props=None):
+    # props: callable -> (V, A, c, J) del sólido construido, en coordenadas globales
+    # Se guardan también las propiedades en el sistema local para volver a
+    # registrarlas si el LRU de _ANALYTIC las ha expulsado
+    key = _num(key)
+    hit = _CACHE.get(key)
+    if hit is None:
+        CACHE_STATS["misses"] += 1
+        s = build()
+        if props is not None:
+            _register(s, props())
+        _CACHE[key] = (s, _local(s))
+        return s
+    CACHE_STATS["hits"] += 1
+    s, local = hit
+    if local is not None and _local(s) is None:
+        _register(s, _moved(local, s.Placement))
+    return s
+
+def cache_stats():
+    return dict(CACHE_STATS, entries=len(_CACHE), analytic_entries=len(_ANALYTIC))
+
+def clear_cache():
+    _CACHE.clear()
+    _ANALYTIC.clear()
+    CACHE_STATS.update(hits=0, misses=0)
+    ANALYTIC_STATS.update(analytic=0, occ=0, evicted=0)
+
+# ===================== Propiedades analíticas =====================
+# (V [mm3], A [mm2], c [mm], J [mm5] respecto a c con densidad 1), en el
+# sistema en que Part.makeX crea cada sólido
+def _box_props(l, w, h):
+    V = l*w*h
+    J = np.diag([V*(w*w + h*h), V*(l*l + h*h), V*(l*l + w*w)]) / 12.0
+    return V, 2.0*(l*w + l*h + w*h), np.array([l/2.0, w/2.0, h/2.0]), J
+
+def _tube_props(ro, ri, h):
+    # Cilindro hueco sobre Z desde z=0 (ri=0: cilindro macizo)
+    a = ro*ro + ri*ri
+    V = math.pi*(ro*ro - ri*ri)*h
+    A = 2.0*math.pi*(ro + ri)*h + 2.0*math.pi*(ro*ro - ri*ri)
+    J = np.diag([V*(3.0*a + h*h)/12.0, V*(3.0*a + h*h)/12.0, V*a/2.0])
+    return V, A, np.array([0.0, 0.0, h/2.0]), J
+
+def _cyl_props(r, h):
+    return _tube_props(r, 0.0, h)
+
+# Gauss-Legendre de 4 puntos: exacta para los polinomios de grado <= 7 del tronco de cono
+_GL_X, _GL_W = np.polynomial.legendre.leggauss(4)
+
+def _cone_props(r1, r2, h):
+    # Tronco de cono sobre Z: radio r1 en z=0 y r2 en z=h
+    z = 0.5*h*(_GL_X + 1.0); w = 0.5*h*_GL_W
+    r = r1 + (r2 - r1)*z/h
+    a = math.pi*r*r
+    V = float(np.dot(w, a))
+    zc = float(np.dot(w, a*z)) / V
+    Izz = float(np.dot(w, a*r*r/2.0))
+    Ixx = float(np.dot(w, a*r*r/4.0 + a*z*z)) - V*zc*zc
+    A = math.pi*(r1*r1 + r2*r2) + math.pi*(r1 + r2)*math.hypot(r1 - r2, h)
+    return V, A, np.array([0.0, 0.0, zc]), np.diag([Ixx, Ixx, Izz])
+
+def _sphere_props(r):
+    V = 4.0/3.0*math.pi*r**3
+    return V, 4.0*math.pi*r*r, np.zeros(3), np.eye(3)*0.4*V*r*r
+
+def _torus_props(R, r):
+    # Toro en el plano XY alrededor de Z
+    V = 2.0*math.pi**2*R*r*r
+    Ixx = V*(R*R/2.0 + 5.0*r*r/8.0)
+    return V, 4.0*math.pi**2*R*r, np.zeros(3), np.diag([Ixx, Ixx, V*(R*R + 0.75*r*r)])
+
+def _rt(placement):
+    m = placement.toMatrix()
+    R = np.array([[m.A11, m.A12, m.A13], [m.A21, m.A22, m.A23], [m.A31, m.A32, m.A33]], dtype=float)
+    return R, np.array([m.A14, m.A24, m.A34], dtype=float)
+
+def _moved(props, placement):
+    # Transformación rígida: c' = R c + t, J' = R J Rᵀ
+    V, A, c, J = props
+    R, t = _rt(placement)
+    return V, A, R.dot(c) + t, R.dot(J).dot(R.T)
+
+def _tkey(shape):
+    # Clave de la TShape (hash sin Location)
+    try:
+        return shape.located(App.Placement()).hashCode()
+    except AttributeError:
+        return None
+
+def _register(shape, props):
+    # props en coordenadas globales de `shape`; se guardan en su sistema local
+    # junto a una referencia que mantiene viva la TShape
+    key = _tkey(shape)
+    if key is not None and props is not None:
+        _ANALYTIC[key] = (shape, _moved(props, shape.Placement.inverse()))
+        _ANALYTIC.move_to_end(key)
+        while len(_ANALYTIC) > ANALYTIC_MAX:
+            _ANALYTIC.popitem(last=False)
+            ANALYTIC_STATS["evicted"] += 1
+    return shape
+
+def _local(shape):
+    key = _tkey(shape)
+    hit = _ANALYTIC.get(key) if key is not None else None
+    if hit is None or not hit[0].isPartner(shape):
+        return None
+    _ANALYTIC.move_to_end(key)
+    return hit[1]
+
+def _share(src, dst):
+    # dst es una copia de src con la misma geometría local (Shape.copy)
+    local = _local(src)
+    if local is not None:
+        _register(dst, _moved(local, dst.Placement))
+    return dst
+
+def _carry(src, dst, placement):
+    # dst = src transformada con `placement` y con la geometría rehecha
+    local = _local(src)
+    if local is not None:
+        _register(dst, _moved(_moved(local, src.Placement), placement))
+    return dst
+
+def analytic(shape):
+    # Propiedades analíticas en la posición actual de `shape`, o None si no
+    # viene de una primitiva (booleanos, extrusiones, empalmes...)
+    local = _local(shape)
+    if local is None:
+        return None
+    V, A, c, J = _moved(local, shape.Placement)
+    return {"volume": V, "area": A, "centroid": c, "inertia": J}
+
+def volume(shape):
+    # Volumen analítico si lo hay; los compuestos suman sólido a sólido y sólo
+    # los que no vienen de primitivas se integran con OCC
+    a = analytic(shape)
+    if a is not None:
+        ANALYTIC_STATS["analytic"] += 1
+        return a["volume"]
+    if shape.ShapeType in ("Compound", "CompSolid"):
+        return sum(volume(s) for s in shape.Solids)
+    ANALYTIC_STATS["occ"] += 1
+    return shape.Volume
+
+def _baked(shape, pnt, dir):
+    # Part.makeX(..., pnt, dir) devuelve geometría ya transformada (Placement identidad)
+    if pnt is None and dir is None:
+        return _handle(shape)
+    base = App.Vector(*pnt) if isinstance(pnt, (tuple, list)) else (pnt if pnt is not None else App.Vector())
+    rot = App.Rotation() if dir is None else App.Rotation(Z_AXIS, App.Vector(*dir) if isinstance(dir, (tuple, list)) else dir)
+    pl = App.Placement(base, rot)
+    s = shape.copy()
+    s.transformShape(pl.toMatrix(), True)
+    return _carry(shape, s, pl)
+
+# ===================== Equivalentes de Part.makeX (con caché) =====================
+def _cyl(r, h):
+    return _memo(("cyl", r, h), lambda: Part.makeCylinder(r, h), lambda: _cyl_props(r, h))
+
+def _cone(r1, r2, h):
+    return _memo(("cone", r1, r2, h), lambda: Part.makeCone(r1, r2, h), lambda: _cone_props(r1, r2, h))
+
+def _box(l, w, h):
+    return _memo(("box", l, w, h), lambda: Part.makeBox(l, w, h), lambda: _box_props(l, w, h))
+
+def _torus(R, r):
+    return _memo(("torus", R, r), lambda: Part.makeTorus(R, r), lambda: _torus_props(R, r))
+
+def makeCylinder(r, h, pnt=None, dir=None):
+    return _baked(_cyl(r, h), pnt, dir)
+
+def makeCone(r1, r2, h, pnt=None, dir=None):
+    return _baked(_cone(r1, r2, h), pnt, dir)
+
+def makeBox(l, w, h, pnt=None, dir=None):
+    return _baked(_box(l, w, h), pnt, dir)
+
+def makeSphere(r, pnt=None):
+    return _baked(_memo(("sphere", r), lambda: Part.makeSphere(r), lambda: _sphere_props(r)), pnt, None)
+
+def makeTorus(R, r, pnt=None, dir=None):
+    return _baked(_torus(R, r), pnt, dir)
+
+def tube(ro, ri, h, pnt=None, dir=None):
+    # Anillo (cilindro ro menos cilindro ri) con la firma de Part.makeCylinder;
+    # sustituye a los make_ring/mk_ring de las macros
+    if ri <= 0:
+        return makeCylinder(ro, h, pnt, dir)
+    def build():
+        return Part.makeCylinder(ro, h).cut(Part.makeCylinder(ri, h + 0.2, App.Vector(0, 0, -0.1)))
+    return _baked(_memo(("tube", ro, ri, h), build, lambda: _tube_props(ro, ri, h)), pnt, dir)
+
+# ===================== Objetos del documento =====================
+def add_obj(shape, name, color=None, group=None, alpha=0.0, doc=None):
+    doc = doc if doc is not None else App.ActiveDocument
+    o = doc.addObject("Part::Feature", name)
+    o.Shape = shape
+    s = session.current(doc)
+    if s is not None:
+        # Sesión masiva: los ajustes de vista y de grupo se aplican al cerrarla
+        s.objects += 1
+        if color: s.view.append((o, "ShapeColor", color))
+        if alpha: s.view.append((o, "Transparency", int(alpha*100)))
+        if group: s.groups.append((group, o))
+        return o
+    try:
+        if color: o.ViewObject.ShapeColor = color
+        if alpha: o.ViewObject.Transparency = int(alpha*100)
+    except Exception:
+        pass
+    if group:
+        try: group.addObject(o)
+        except Exception: pass
+    return o
+
+# ===================== Helpers estilo StarSat (eje + centrado) =====================
+def rot_to_x():
+    return App.Rotation(Y_AXIS, 90)
+
+def T(shape, v):
+    m = App.Matrix(); m.move(App.Vector(*v))
+    return _carry(shape, shape.transformGeometry(m), App.Placement(App.Vector(*v), App.Rotation()))
+
+def R(shape, axis, ang, center=(0,0,0)):
+    return shape.rotate(App.Vector(*center), App.Vector(*axis), ang)
+
+def centered_box(w, d, h):
+    return _handle(_memo(("cbox", w, d, h), lambda: T(_box(w, d, h), (-w/2.0, -d/2.0, -h/2.0))))
+
+def _axis_placement(h, axis, center):
+    # La misma transformación que _to_axis, como Placement
+    rot = {'X': App.Rotation(Y_AXIS, 90), 'Y': App.Rotation(X_AXIS, 90)}.get(axis, App.Rotation())
+    base = App.Vector()
+    if center:
+        base = {'X': App.Vector(-h/2.0, 0, 0), 'Y': App.Vector(0, -h/2.0, 0)}.get(axis, App.Vector(0, 0, -h/2.0))
+    return App.Placement(base, rot)
+
+def _to_axis(c, h, axis, center):
+    if axis == 'X': c = R(c, (0,1,0), 90)
+    if axis == 'Y': c = R(c, (1,0,0), 90)
+    if center:
+        if axis == 'Z': c = T(c, (0,0,-h/2))
+        if axis == 'X': c = T(c, (-h/2,0,0))
+        if axis == 'Y': c = T(c, (0,-h/2,0))
+    return c
+
+def cyl(h, r, axis='Z', center=False):
+    return _handle(_memo(("cylA", h, r, axis, center), lambda: _to_axis(Part.makeCylinder(r, h), h, axis, center),
+                         lambda: _moved(_cyl_props(r, h), _axis_placement(h, axis, center))))
+
+def cone(r1, r2, h, axis='Z', center=False):
+    return _handle(_memo(("coneA", r1, r2, h, axis, center), lambda: _to_axis(Part.makeCone(r1, r2, h), h, axis, center),
+                         lambda: _moved(_cone_props(r1, r2, h), _axis_placement(h, axis, center))))
+
+def ring(h, Do, Di, axis='Z', center=False):
+    def build():
+        outer = _to_axis(Part.makeCylinder(Do/2.0, h), h, axis, center)
+        inner = _to_axis(Part.makeCylinder(Di/2.0, h+0.2), h+0.2, axis, center)
+        return outer.cut(inner)
+    return _handle(_memo(("ringA", h, Do, Di, axis, center), build,
+                         lambda: _moved(_tube_props(Do/2.0, Di/2.0, h), _axis_placement(h, axis, center))))
+
+def poly_prism(points, h):
+    def build():
+        wire = Part.makePolygon([App.Vector(x,y,0) for (x,y) in points] + [App.Vector(points[0][0],points[0][1],0)])
+        face = Part.Face(wire); solid = face.extrude(App.Vector(0,0,h))
+        return T(solid, (0,0,-h/2.0))
+    return _handle(_memo(("prism", tuple(tuple(p) for p in points), h), build))
+
+# ===================== Helpers estilo DFD (eje X, centrados en cx) =====================
+def cyl_x(d, L, cx=0.0, cy=0.0, cz=0.0):
+    base = _cyl(d/2.0, L)
+    return _placed(base, App.Placement(App.Vector(cx-L/2.0, cy, cz), rot_to_x()))
+
+def cone_x(d1, d2, L, cx=0.0, cy=0.0, cz=0.0):
+    base = _cone(d1/2.0, d2/2.0, L)
+    return _placed(base, App.Placement(App.Vector(cx-L/2.0, cy, cz), rot_to_x()))
+
+def torus_x(R, r, cx=0.0, cy=0.0, cz=0.0):
+    base = _torus(R, r)
+    return _placed(base, App.Placement(App.Vector(cx, cy, cz), rot_to_x()))
+
+def box_c(w, d, h, cx=0.0, cy=0.0, cz=0.0):
+    base = _box(w, d, h)
+    return _placed(base, App.Placement(App.Vector(cx-w/2.0, cy-d/2.0, cz-h/2.0), App.Rotation()))
+
+def make_cyl_x(d, L, cx=0.0, cy=0.0, cz=0.0, label="CylX"):
+    return add_obj(cyl_x(d, L, cx, cy, cz), label)
+
+def make_cone_x(d1, d2, L, cx=0.0, cy=0.0, cz=0.0, label="ConeX"):
+    return add_obj(cone_x(d1, d2, L, cx, cy, cz), label)
+
+def make_torus_x(R, r, cx=0.0, cy=0.0, cz=0.0, label="TorusX"):
+    return add_obj(torus_x(R, r, cx, cy, cz), label)
+
+def make_box(w, d, h, cx=0.0, cy=0.0, cz=0.0, label="Box"):
+    return add_obj(box_c(w, d, h, cx, cy, cz), label)
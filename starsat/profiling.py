@@ -0,0 +1,252 @@
+# Perfilado de booleanas: fuse / cut / common / multiFuse / makeFillet / removeSplitter
+# Part.Shape es un tipo de extensión (no se pueden sustituir sus métodos), así
+# que las llamadas se instrumentan reescribiendo el código (AST), igual que
+# batch_build hace con ViewObject:
+#   a.fuse(b)  ->  __starsat_op__(a, "fuse", "<fichero>", <línea>, b)
+# Se reescriben la macro y, con install(), los módulos starsat.* que se importen
+# después. Por operación se guarda: línea que llama y pila Python, caras de cada
+# operando y del resultado, tiempo y fallo (excepción o resultado nulo/inválido).
+# Los helpers que se tragan excepciones (fuse_safely, fuse_many, cut_safely,
+# safe_fillet, y los de starsat) avisan con note_failure().
+#
+# Al terminar:
+#   - <out>/<nombre>.folded : pilas plegadas (flamegraph.pl, speedscope, inferno)
+#   - <out>/<nombre>.trace.json : Chrome trace (chrome://tracing, Perfetto)
+#   - tabla top-N por línea de código y operación
+#
+# Uso (FreeCAD importable; con build_mode 'parallel' los trabajadores no se registran):
+#   python -m starsat.profiling DFDmacro.py --top 20 --out build/profile
+#   python -m starsat.batch_build DFDmacro.py --profile
+
+import argparse
+import ast
+import importlib.abc
+import importlib.machinery
+import json
+import os
+import sys
+import time
+import traceback
+
+import FreeCAD as App
+import Part
+
+PROFILE_OPS = ("fuse", "cut", "common", "multiFuse", "makeFillet", "removeSplitter")
+
+RECORDS = []
+FAILURES = []   # fallos silenciosos notificados por helpers
+SILENT_FAILURES = {}   # helper -> contador (también con el perfilado apagado)
+ACTIVE = False
+_T0 = time.perf_counter()
+_HERE = os.path.abspath(__file__)
+
+# ===================== Registro =====================
+def _faces(v):
+    if isinstance(v, Part.Shape):
+        try: return len(v.Faces)
+        except Exception: return None
+    if isinstance(v, (list, tuple)):
+        n = [_faces(x) for x in v]
+        n = [x for x in n if x is not None]
+        return sum(n) if n else None
+    return None
+
+def _stack(skip=2, limit=12):
+    # Pila Python (externa -> interna) sin los marcos de este módulo
+    out = []
+    f = sys._getframe(skip)
+    while f is not None and len(out) < limit:
+        if os.path.abspath(f.f_code.co_filename) != _HERE:
+            out.append("%s (%s:%d)" % (f.f_code.co_name, os.path.basename(f.f_code.co_filename), f.f_lineno))
+        f = f.f_back
+    return list(reversed(out))
+
+def op(obj, name, filename, line, *args, **kwargs):
+    meth = getattr(obj, name)
+    if not ACTIVE or not isinstance(obj, Part.Shape):
+        return meth(*args, **kwargs)
+    rec = {"op": name, "file": os.path.basename(filename), "line": line, "stack": _stack(),
+           "faces_in": [_faces(obj)] + [_faces(a) for a in args if _faces(a) is not None],
+           "faces_out": None, "ok": True, "error": None, "t0": time.perf_counter() - _T0}
+    t0 = time.perf_counter()
+    try:
+        result = meth(*args, **kwargs)
+    except Exception as e:
+        rec.update(dt=time.perf_counter() - t0, ok=False, error="%s: %s" % (type(e).__name__, e))
+        RECORDS.append(rec)
+        raise
+    rec["dt"] = time.perf_counter() - t0
+    if isinstance(result, Part.Shape):
+        rec["faces_out"] = _faces(result)
+        try:
+            if result.isNull() or not result.isValid():
+                rec.update(ok=False, error="resultado nulo o inválido")
+        except Exception:
+            pass
+    RECORDS.append(rec)
+    return result
+
+def note_failure(helper, error=None):
+    # Para helpers con try/except que devuelven la entrada sin avisar
+    SILENT_FAILURES[helper] = SILENT_FAILURES.get(helper, 0) + 1
+    if ACTIVE:
+        st = _stack()
+        FAILURES.append({"helper": helper, "error": None if error is None else "%s: %s" % (type(error).__name__, error),
+                         "where": st[-1] if st else "?", "stack": st, "t0": time.perf_counter() - _T0})
+
+def start():
+    global ACTIVE, _T0
+    del RECORDS[:]
+    del FAILURES[:]
+    _T0 = time.perf_counter()
+    ACTIVE = True
+
+def stop():
+    global ACTIVE
+    ACTIVE = False
+
+# ===================== Reescritura de código =====================
+class OpRewriter(ast.NodeTransformer):
+    def __init__(self, filename):
+        self.filename = filename
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        f = node.func
+        if isinstance(f, ast.Attribute) and f.attr in PROFILE_OPS:
+            call = ast.Call(func=ast.Name(id="__starsat_op__", ctx=ast.Load()),
+                            args=[f.value, ast.Constant(f.attr), ast.Constant(self.filename), ast.Constant(node.lineno)] + node.args,
+                            keywords=node.keywords)
+            return ast.copy_location(call, node)
+        return node
+
+def rewrite(tree, filename):
+    tree = OpRewriter(filename).visit(tree)
+    ast.fix_missing_locations(tree)
+    return tree
+
+class _Loader(importlib.machinery.SourceFileLoader):
+    # Sin .pyc: siempre se compila la fuente reescrita
+    def get_code(self, fullname):
+        path = self.get_filename(fullname)
+        return compile(rewrite(ast.parse(self.get_data(path), path), path), path, "exec", dont_inherit=True)
+    def exec_module(self, module):
+        module.__dict__["__starsat_op__"] = op
+        importlib.machinery.SourceFileLoader.exec_module(self, module)
+
+class _Finder(importlib.abc.MetaPathFinder):
+    def __init__(self, prefixes):
+        self.prefixes = prefixes
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname == "starsat.profiling" or not fullname.startswith(self.prefixes):
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+        if spec is None or not isinstance(spec.loader, importlib.machinery.SourceFileLoader):
+            return spec
+        spec.loader = _Loader(fullname, spec.origin)
+        return spec
+
+def install(prefixes=("starsat.",)):
+    # Debe llamarse antes de importar los módulos a instrumentar
+    if not any(isinstance(f, _Finder) for f in sys.meta_path):
+        sys.meta_path.insert(0, _Finder(tuple(prefixes)))
+    stale = [m for m in sys.modules if m.startswith(tuple(prefixes)) and m != "starsat.profiling"]
+    if stale:
+        App.Console.PrintWarning("profiling: %s ya importados, no se instrumentan\n" % ", ".join(sorted(stale)))
+
+def compile_macro(path, source=None):
+    if source is None:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            source = f.read()
+    return compile(rewrite(ast.parse(source, path), path), path, "exec")
+
+# ===================== Salidas =====================
+def top(n=20):
+    agg = {}
+    for r in RECORDS:
+        k = (r["file"], r["line"], r["op"])
+        a = agg.setdefault(k, {"file": r["file"], "line": r["line"], "op": r["op"], "count": 0, "total_s": 0.0,
+                               "max_s": 0.0, "faces_in": 0, "faces_out": 0, "failures": 0})
+        a["count"] += 1
+        a["total_s"] += r["dt"]
+        a["max_s"] = max(a["max_s"], r["dt"])
+        a["faces_in"] += sum(x for x in r["faces_in"] if x)
+        a["faces_out"] += r["faces_out"] or 0
+        a["failures"] += 0 if r["ok"] else 1
+    return sorted(agg.values(), key=lambda a: -a["total_s"])[:n]
+
+def format_top(n=20):
+    total = sum(r["dt"] for r in RECORDS) or 1.0
+    lines = ["%-34s %-14s %6s %9s %7s %8s %9s %9s %5s" % ("línea", "operación", "n", "total[s]", "%", "max[s]",
+                                                         "caras_in", "caras_out", "fallos")]
+    for a in top(n):
+        lines.append("%-34s %-14s %6d %9.3f %6.1f%% %8.3f %9d %9d %5d" % (
+            "%s:%d" % (a["file"], a["line"]), a["op"], a["count"], a["total_s"], 100.0 * a["total_s"] / total,
+            a["max_s"], a["faces_in"] / a["count"], a["faces_out"] / a["count"], a["failures"]))
+    if SILENT_FAILURES:
+        lines.append("fallos silenciosos: " + ", ".join("%s=%d" % kv for kv in sorted(SILENT_FAILURES.items())))
+    return "\n".join(lines)
+
+def write_folded(path):
+    # Formato de pilas plegadas: "marco1;marco2;...;op peso" (peso en µs)
+    folded = {}
+    for r in RECORDS:
+        key = ";".join(r["stack"] + ["%s%s" % (r["op"], "" if r["ok"] else " [fallo]")])
+        folded[key] = folded.get(key, 0) + max(1, int(r["dt"] * 1e6))
+    with open(path, "w", encoding="utf-8") as f:
+        for k in sorted(folded):
+            f.write("%s %d\n" % (k, folded[k]))
+    return path
+
+def write_chrome_trace(path):
+    ev = []
+    for r in RECORDS:
+        ev.append({"name": r["op"], "cat": "ok" if r["ok"] else "fallo", "ph": "X", "pid": 1, "tid": 1,
+                   "ts": r["t0"] * 1e6, "dur": r["dt"] * 1e6,
+                   "args": {"line": "%s:%d" % (r["file"], r["line"]), "faces_in": r["faces_in"],
+                            "faces_out": r["faces_out"], "error": r["error"], "stack": r["stack"]}})
+    for fl in FAILURES:
+        ev.append({"name": "fallo silencioso: " + fl["helper"], "ph": "i", "s": "t", "pid": 1, "tid": 1,
+                   "ts": fl["t0"] * 1e6, "args": {"where": fl["where"], "error": fl["error"]}})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": ev, "displayTimeUnit": "ms"}, f)
+    return path
+
+def report(out_dir, name, n=20):
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {"folded": write_folded(os.path.join(out_dir, name + ".folded")),
+             "chrome": write_chrome_trace(os.path.join(out_dir, name + ".trace.json"))}
+    with open(os.path.join(out_dir, name + ".top.txt"), "w", encoding="utf-8") as f:
+        f.write(format_top(n) + "\n")
+    App.Console.PrintMessage("profiling: %d operaciones, %.3f s en booleanas, %d fallos silenciosos\n%s\n" % (
+        len(RECORDS), sum(r["dt"] for r in RECORDS), len(FAILURES), format_top(n)))
+    return paths
+
+# ===================== Ejecución de una macro =====================
+def run_macro(path, out_dir, n=20, extra_ns=None):
+    install()
+    ns = {"__name__": "__main__", "__file__": path, "__starsat_op__": op}
+    ns.update(extra_ns or {})
+    code = compile_macro(path)
+    start()
+    try:
+        exec(code, ns)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        stop()
+    return report(out_dir, os.path.splitext(os.path.basename(path))[0], n)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Perfilado de booleanas de una macro")
+    ap.add_argument("macro")
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--out", default=os.path.join("build", "profile"))
+    args, _ = ap.parse_known_args(argv)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(_HERE)))
+    # Con "python -m" este fichero es __main__: se usa el módulo importable,
+    # que es el mismo que importan los helpers para note_failure()
+    from starsat import profiling
+    profiling.run_macro(os.path.abspath(args.macro), args.out, args.top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Reconstrucción incremental por dependencias de parámetros
+# Cada subconjunto build_<nombre>(P) anota qué claves de P lee (TrackingDict)
+# o las declara en el módulo (DEPS = {"nombre": [claves]}). Tras cada
+# construcción se guarda en disco: P, dependencias, huella del código del
+# constructor y el BREP de cada subconjunto. En la siguiente ejecución se
+# compara P viejo/nuevo y sólo se reconstruyen los subconjuntos cuyas claves
+# cambiaron (o cuyo código cambió); el resto se recarga del BREP y la macro
+# rehace el ensamblaje final.
+#
+#   from starsat.rebuild import incremental_build
+#   S = incremental_build(dfd_xl, P, "DFDmacro", mode=P['build_mode'], jobs=P['jobs'])
+#
+# Cambiar 'panel_count' en DFDmacro sólo reconstruye "solar_panels".
+
+import json
+import os
+import time
+
+import FreeCAD as App
+import Part
+
+from starsat import parallel
+from starsat.cache import builder_key
+
+# Resumen de la última llamada (consultado por la macro/benchmarks)
+LAST_STATS = {"changed_keys": [], "rebuilt": [], "reused": [], "reasons": {}, "wall_s": 0.0}
+
+def state_dir(name):
+    root = os.environ.get("STARSAT_REBUILD_DIR") or os.path.join(App.getUserAppDataDir(), "starsat_rebuild")
+    return os.path.join(root, name)
+
+def _snapshot(P):
+    # Copia JSON de P (tuplas -> listas) para comparar con la guardada
+    return json.loads(json.dumps(P, default=repr))
+
+def diff_params(old, new):
+    keys = set(old) | set(new)
+    return sorted(k for k in keys if k not in old or k not in new or old[k] != new[k])
+
+def load_state(path):
+    fn = os.path.join(path, "state.json")
+    if not os.path.exists(fn):
+        return None
+    with open(fn, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(path, state):
+    os.makedirs(path, exist_ok=True)
+    tmp = os.path.join(path, "state.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, os.path.join(path, "state.json"))
+
+def _declared(module, name):
+    deps = getattr(module, "DEPS", {}).get(name)
+    return sorted(deps) if deps is not None else None
+
+def plan(module, P, name, names=None):
+    # Devuelve (claves cambiadas, {subconjunto: motivo}) sin construir nada
+    names = list(names or module.SUBASSEMBLIES)
+    path = state_dir(name)
+    state = load_state(path)
+    if state is None:
+        return sorted(P), dict((n, "sin estado previo") for n in names)
+    changed = diff_params(state["P"], _snapshot(P))
+    stale = {}
+    for n in names:
+        entry = state["parts"].get(n)
+        if entry is None:
+            stale[n] = "nuevo"
+        elif entry["code"] != builder_key(getattr(module, "build_" + n)):
+            stale[n] = "código modificado"
+        elif not os.path.exists(os.path.join(path, entry["brep"])):
+            stale[n] = "BREP ausente"
+        else:
+            hit = sorted(set(entry["deps"]) & set(changed))
+            if hit:
+                stale[n] = ", ".join(hit)
+    return changed, stale
+
+def incremental_build(module, P, name, names=None, mode="parallel", jobs=0, force=False):
+    names = list(names or module.SUBASSEMBLIES)
+    path = state_dir(name)
+    t0 = time.perf_counter()
+    if force:
+        changed, stale = sorted(P), dict((n, "forzado") for n in names)
+    else:
+        changed, stale = plan(module, P, name, names)
+
+    built = parallel.build_subassemblies(module, P, [n for n in names if n in stale], mode=mode, jobs=jobs, track=True) if stale else {}
+    state = load_state(path) if not force else None
+    parts = dict(state["parts"]) if state else {}
+    out = {}
+    os.makedirs(path, exist_ok=True)
+    for n in names:
+        fn = os.path.join(path, n + ".brep")
+        if n in built:
+            built[n].exportBrep(fn)
+            deps = _declared(module, n) or parallel.LAST_STATS["deps"].get(n, [])
+            parts[n] = {"brep": n + ".brep", "deps": deps, "code": builder_key(getattr(module, "build_" + n)),
+                        "time_s": parallel.LAST_STATS["times"].get(n)}
+            out[n] = built[n]
+        else:
+            s = Part.Shape()
+            s.importBrep(fn)
+            out[n] = s
+    save_state(path, {"P": _snapshot(P), "parts": parts, "updated": time.strftime("%Y-%m-%d %H:%M:%S")})
+
+    LAST_STATS.update(changed_keys=changed, rebuilt=sorted(built), reused=sorted(n for n in names if n not in built),
+                      reasons=stale, wall_s=time.perf_counter() - t0)
+    App.Console.PrintMessage("incremental_build[%s]: %d reconstruidos, %d reutilizados (claves cambiadas: %s)\n" % (
+        name, len(built), len(names) - len(built), ", ".join(changed[:8]) + (" ..." if len(changed) > 8 else "")))
+    return out
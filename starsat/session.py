@@ -0,0 +1,99 @@
+# Sesión de creación masiva de objetos en un documento
+# Las macros llaman a add_obj cientos de veces (DFD_GreyScale: cada make_cyl_x
+# crea un Part::Feature y set_mat le añade tres o cuatro propiedades). Con el
+# documento "vivo" cada addObject/addProperty/ViewObject.X dispara trabajo de
+# documento y de GUI. Dentro de una sesión:
+#   - los recomputes quedan congelados (doc.RecomputesFrozen)
+#   - no se registran transacciones de deshacer (doc.UndoMode = 0)
+#   - los ajustes de vista de add_obj (color, transparencia, visibilidad) y la
+#     inserción en grupos se encolan y se aplican de una vez al salir
+#   - al salir se restaura el documento y se hace un único recompute
+# Los proveedores de vista los crea FreeCAD al añadir el objeto (la API de
+# Python no permite omitirlos); lo que se evita es tocarlos objeto a objeto.
+#
+#   from starsat import session
+#   with session.bulk(doc):
+#       ...                                   # add_obj, set_mat, ...
+#
+# Para macros planas sin bloque `with`:
+#   s = session.begin(doc)
+#   ...
+#   session.end(s)
+
+import time
+from contextlib import contextmanager
+
+import FreeCAD as App
+
+# Sesiones abiertas (la más interna al final)
+ACTIVE = []
+
+# Contadores de la última sesión cerrada
+LAST_STATS = {"objects": 0, "deferred_view": 0, "deferred_group": 0, "seconds": 0.0,
+              "objects_per_s": 0.0, "recompute_s": 0.0}
+
+class BulkSession(object):
+    def __init__(self, doc, recompute=True):
+        self.doc = doc
+        self.recompute = recompute
+        self.view = []    # (obj, atributo, valor)
+        self.groups = []  # (grupo, obj)
+        self.objects = 0
+        self.saved = {}
+        self.t0 = None
+
+    def open(self):
+        for attr, value in (("RecomputesFrozen", True), ("UndoMode", 0)):
+            try:
+                self.saved[attr] = getattr(self.doc, attr)
+                setattr(self.doc, attr, value)
+            except Exception:  # versiones sin la propiedad
+                self.saved.pop(attr, None)
+        self.t0 = time.perf_counter()
+        ACTIVE.append(self)
+        return self
+
+    def close(self):
+        if self in ACTIVE:
+            ACTIVE.remove(self)
+        for obj, attr, value in self.view:
+            try: setattr(obj.ViewObject, attr, value)
+            except Exception: pass
+        for group, obj in self.groups:
+            try: group.addObject(obj)
+            except Exception: pass
+        for attr, value in self.saved.items():
+            try: setattr(self.doc, attr, value)
+            except Exception: pass
+        t_rec = time.perf_counter()
+        if self.recompute:
+            self.doc.recompute()
+        now = time.perf_counter()
+        dt = now - self.t0
+        LAST_STATS.update(objects=self.objects, deferred_view=len(self.view), deferred_group=len(self.groups),
+                          seconds=dt, objects_per_s=self.objects / dt if dt > 0 else 0.0, recompute_s=now - t_rec)
+        App.Console.PrintMessage("session: %d objetos en %.2f s (%.0f obj/s), %d ajustes de vista diferidos\n" % (
+            self.objects, dt, LAST_STATS["objects_per_s"], len(self.view)))
+        return LAST_STATS
+
+def current(doc=None):
+    # Sesión abierta sobre `doc` (o sobre el documento activo), si la hay
+    doc = doc if doc is not None else App.ActiveDocument
+    for s in reversed(ACTIVE):
+        if s.doc.Name == doc.Name:
+            return s
+    return None
+
+def begin(doc=None, recompute=True):
+    return BulkSession(doc if doc is not None else App.ActiveDocument, recompute).open()
+
+def end(s):
+    return s.close()
+
+@contextmanager
+def bulk(doc=None, recompute=True):
+    s = begin(doc, recompute)
+    try:
+        yield s
+    finally:
+        end(s)
@@ -0,0 +1,138 @@
+# Densidad superficial de blindaje vista desde un punto (trazado de rayos Monte Carlo)
+# Tesela los sólidos de blindaje (con la propiedad Density que pone
+# starsat.materials.attach) y lanza rayos isótropos desde un punto de dosis.
+# Por rayo se suma longitud de camino × densidad de cada objeto atravesado:
+#   L_obj = Σ s_i·t_i  sobre los cortes del rayo con los triángulos del objeto,
+#   s_i = +1 si sale (d·n > 0) y −1 si entra,
+# que para un sólido cerrado con normales exteriores es la longitud dentro del
+# sólido, esté el punto dentro o fuera y sin ordenar los cortes. Los cortes
+# salen de bvh.all_hits (la escena es un BVH de starsat.bvh, guardado en disco
+# por hash de geometría), y los lotes de rayos se reparten entre procesos si
+# jobs != 1.
+#
+#   from starsat import shielding
+#   scene = shielding.tessellate(shielding.shield_objects(doc, group="Shielding"))
+#   res = shielding.trace(scene, (0, 0, 0), rays=1000000, jobs=0)
+#   shielding.summary(res)                    # percentiles de g/cm²
+#   sec = shielding.sectors(res, n_az=12, n_el=6)
+#
+# Unidades: mm para la geometría, kg/m3 para la densidad, g/cm² en la salida
+# (1 kg/m3 · 1 mm = 1e-4 g/cm²).
+
+import time
+
+import numpy as np
+
+import FreeCAD as App
+
+from starsat import bvh
+from starsat import parallel
+
+G_CM2 = 1e-4
+
+# Contadores de la última traza
+LAST_STATS = {"rays": 0, "triangles": 0, "objects": 0, "jobs": 1, "seconds": 0.0, "rays_per_s": 0.0}
+
+# ===================== Escena =====================
+def shield_objects(doc=None, group=None, names=None):
+    # Objetos con sólidos y Density; opcionalmente sólo los de un grupo (y subgrupos) o por nombre
+    doc = doc if doc is not None else App.ActiveDocument
+    if group is not None:
+        g = group if not isinstance(group, str) else (doc.getObject(group) or (doc.getObjectsByLabel(group) or [None])[0])
+        if g is None:
+            raise ValueError("shielding: grupo '%s' no encontrado" % group)
+        objs = g.OutListRecursive if hasattr(g, "OutListRecursive") else g.Group
+    else:
+        objs = doc.Objects
+    out = []
+    for o in objs:
+        if names is not None and o.Name not in names and o.Label not in names:
+            continue
+        sh = getattr(o, "Shape", None)
+        if sh is None or sh.isNull() or not sh.Solids or not getattr(o, "Density", 0.0):
+            continue
+        out.append(o)
+    return out
+
+def tessellate(objs, tol=1.0, cache=True):
+    # Escena = BVH de los objetos (triángulos con índice de objeto, densidad y material)
+    return bvh.from_objects(objs, tol, cache=cache)
+
+# ===================== Rayos =====================
+def directions(n, seed=0):
+    # Direcciones uniformes en la esfera
+    rng = np.random.default_rng(seed)
+    z = rng.uniform(-1.0, 1.0, n)
+    phi = rng.uniform(0.0, 2.0*np.pi, n)
+    r = np.sqrt(1.0 - z*z)
+    return np.column_stack([r*np.cos(phi), r*np.sin(phi), z])
+
+def _paths(scene, origin, dirs):
+    # Longitud [mm] recorrida dentro de cada objeto: (rayos, objetos)
+    h = bvh.all_hits(scene, origin, dirs)
+    out = np.zeros((len(dirs), len(scene["names"])))
+    np.add.at(out, (h["ray"], h["obj"]), h["sign"] * h["t"])
+    return np.maximum(out, 0.0)
+
+_SCENE = None
+
+def _init(scene, origin):
+    global _SCENE
+    _SCENE = (scene, origin)
+
+def _batch(dirs):
+    return _paths(_SCENE[0], _SCENE[1], dirs)
+
+def trace(scene, point, rays=100000, batch=20000, jobs=1, seed=0, dirs=None):
+    # jobs: 1 en serie, 0 = todos los núcleos, n procesos
+    t0 = time.perf_counter()
+    origin = np.asarray(point, dtype=float)
+    dirs = directions(rays, seed) if dirs is None else np.asarray(dirs, dtype=float)
+    chunks = [dirs[i:i+batch] for i in range(0, len(dirs), batch)]
+    parts, jobs = parallel.map_batches(_batch, chunks, jobs, _init, (scene, origin))
+    paths = np.concatenate(parts)
+    by_object = paths * scene["density"][None, :] * G_CM2             # g/cm² por objeto
+    dt = time.perf_counter() - t0
+    LAST_STATS.update(rays=len(dirs), triangles=len(scene["v0"]), objects=len(scene["names"]), jobs=jobs,
+                      seconds=dt, rays_per_s=len(dirs) / dt if dt > 0 else 0.0)
+    return {"point": origin, "dirs": dirs, "areal": by_object.sum(axis=1), "path_mm": paths,
+            "by_object": by_object, "names": scene["names"],
+            "materials": [scene["materials"][m] for m in scene["obj_material"]]}
+
+# ===================== Resultados =====================
+def summary(res, percentiles=(1, 5, 25, 50, 75, 95, 99)):
+    a = res["areal"]
+    mats = {}
+    for name, col in zip(res["materials"], res["by_object"].T):
+        mats[name or "?"] = mats.get(name or "?", 0.0) + float(col.mean())
+    return {"rays": int(len(a)), "mean": float(a.mean()), "min": float(a.min()), "max": float(a.max()),
+            "percentiles": dict((p, float(v)) for p, v in zip(percentiles, np.percentile(a, percentiles))),
+            "unshielded_fraction": float(np.mean(a <= 0.0)), "by_material": mats}
+
+def histogram(res, bins=50, bounds=None):
+    return np.histogram(res["areal"], bins=bins, range=bounds)
+
+def sectors(res, n_az=12, n_el=6):
+    # Media, mínimo y nº de rayos por sector (acimut en XY, elevación sobre Z) -> (n_el, n_az)
+    d = res["dirs"]
+    az = np.arctan2(d[:, 1], d[:, 0]) % (2.0*np.pi)
+    el = np.arcsin(np.clip(d[:, 2], -1.0, 1.0))
+    ia = np.minimum((az / (2.0*np.pi) * n_az).astype(int), n_az - 1)
+    ie = np.minimum(((el + np.pi/2.0) / np.pi * n_el).astype(int), n_el - 1)
+    cell = ie * n_az + ia
+    count = np.bincount(cell, minlength=n_el*n_az)
+    total = np.bincount(cell, weights=res["areal"], minlength=n_el*n_az)
+    low = np.full(n_el*n_az, np.inf)
+    np.minimum.at(low, cell, res["areal"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    return {"mean": mean.reshape(n_el, n_az), "min": low.reshape(n_el, n_az), "count": count.reshape(n_el, n_az),
+            "az_deg": np.linspace(0.0, 360.0, n_az + 1), "el_deg": np.linspace(-90.0, 90.0, n_el + 1)}
+
+def report(res, label="dosis"):
+    s = summary(res)
+    p = s["percentiles"]
+    App.Console.PrintMessage("shielding[%s]: %d rayos, media %.2f g/cm², p5 %.2f, p50 %.2f, mín %.2f, %.1f%% sin blindaje (%.1f s, %.0f rayos/s)\n" % (
+        label, s["rays"], s["mean"], p[5], p[50], s["min"], 100.0 * s["unshielded_fraction"],
+        LAST_STATS["seconds"], LAST_STATS["rays_per_s"]))
+    return s
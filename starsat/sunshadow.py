@@ -0,0 +1,145 @@
+# Cobertura de sombra solar de radiadores e instrumentos detrás del TPS
+# Los diseños DFD colocan los radiadores "en sombra" tras el escudo
+# (wing_back_offset en DFDmacro, RAD en Direct_Fusion_DriveDS y DFD_GreyScale).
+# Aquí se comprueba con errores de apuntado: se barren direcciones de sol
+# dentro de un cono de semiángulo dado alrededor del eje nominal y, para cada
+# pieza, se calcula la fracción de su superficie iluminada directamente.
+#   - cada pieza se muestrea con puntos repartidos por área sobre su teselado
+#   - un punto está al sol si su normal mira al sol (n·s > 0) y el rayo hacia
+#     el sol no corta nada (bvh.any_hit contra los bloqueadores: TPS o nave entera)
+#   - las direcciones se reparten en lotes entre procesos (parallel.map_batches)
+#
+#   from starsat import sunshadow
+#   res = sunshadow.coverage([("shield", S["shield"]), ...], [("wings", S["wings"])],
+#                            axis=(0, 0, -1), half_angle_deg=10.0, count=300, jobs=0)
+#   sunshadow.report(res)                 # peor exposición por pieza
+#
+# axis apunta de la nave al sol. Unidades: mm, grados.
+
+import math
+import time
+
+import numpy as np
+
+import FreeCAD as App
+
+from starsat import bvh
+from starsat import parallel
+
+# Contadores del último análisis
+LAST_STATS = {"directions": 0, "parts": 0, "samples": 0, "rays": 0, "jobs": 1, "seconds": 0.0}
+
+# ===================== Direcciones =====================
+def _frame(axis):
+    a = np.asarray(axis, dtype=float)
+    a = a / np.linalg.norm(a)
+    ref = np.array([1.0, 0.0, 0.0]) if abs(a[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+    u = np.cross(a, ref); u /= np.linalg.norm(u)
+    return a, u, np.cross(a, u)
+
+def cone_directions(axis, half_angle_deg, count):
+    # Espiral de Fibonacci sobre el casquete (uniforme en ángulo sólido); la
+    # primera dirección es el eje nominal. -> (dirs (K, 3), desapuntado [°], acimut [°])
+    a, u, v = _frame(axis)
+    k = np.arange(count)
+    cmin = math.cos(math.radians(half_angle_deg))
+    cos_t = 1.0 - (1.0 - cmin) * k / max(1, count - 1)
+    sin_t = np.sqrt(np.maximum(0.0, 1.0 - cos_t * cos_t))
+    phi = (k * math.pi * (3.0 - math.sqrt(5.0))) % (2.0 * math.pi)
+    dirs = cos_t[:, None] * a + sin_t[:, None] * (np.cos(phi)[:, None] * u + np.sin(phi)[:, None] * v)
+    return dirs, np.degrees(np.arccos(np.clip(cos_t, -1.0, 1.0))), np.degrees(phi)
+
+# ===================== Muestras de superficie =====================
+def surface_samples(shape, count=500, tol=1.0, seed=0):
+    # Puntos repartidos por área sobre el teselado -> (puntos, normales, área total [mm²])
+    v0, e1, e2 = bvh.mesh(shape, tol)
+    n = np.cross(e1, e2)
+    dA = 0.5 * np.linalg.norm(n, axis=1)
+    area = float(dA.sum())
+    if area <= 0.0:
+        return np.zeros((0, 3)), np.zeros((0, 3)), 0.0
+    rng = np.random.default_rng(seed)
+    tri = rng.choice(len(dA), size=count, p=dA / area)
+    r1, r2 = rng.random(count), rng.random(count)
+    flip = r1 + r2 > 1.0
+    r1[flip], r2[flip] = 1.0 - r1[flip], 1.0 - r2[flip]
+    pts = v0[tri] + r1[:, None] * e1[tri] + r2[:, None] * e2[tri]
+    return pts, n[tri] / (2.0 * dA[tri])[:, None], area
+
+# ===================== Trazado =====================
+_WORK = None
+
+def _init(work):
+    global _WORK
+    _WORK = work
+
+def _lit(dirs):
+    # Fracción iluminada (por área) y fracción de flujo (por área·cos) de cada pieza: (k, piezas)
+    b, P, N, part, nparts, offset = _WORK
+    lit = np.zeros((len(dirs), nparts))
+    flux = np.zeros((len(dirs), nparts))
+    cos = N.dot(dirs.T)                                   # (M, k)
+    m, j = np.nonzero(cos > 0.0)
+    hit = bvh.any_hit(b, P[m] + offset * N[m], dirs[j]) if m.size else np.zeros(0, dtype=bool)
+    sun = ~hit
+    cell = j * nparts + part[m]
+    size = len(dirs) * nparts
+    lit.flat[:] = np.bincount(cell[sun], minlength=size)
+    flux.flat[:] = np.bincount(cell[sun], weights=cos[m, j][sun], minlength=size)
+    return lit, flux
+
+def coverage(blockers, targets, axis, half_angle_deg=10.0, count=200, samples=500, tol=1.0,
+             offset=0.05, jobs=1, batch=8, seed=0):
+    # blockers: BVH ya construido o lista de objetos / parejas (nombre, Shape)
+    # targets: objetos o parejas (nombre, Shape) cuya exposición se mide
+    t0 = time.perf_counter()
+    b = blockers if isinstance(blockers, dict) else bvh.from_objects(blockers, tol)
+    names, areas, P, N, part = [], [], [], [], []
+    for o in targets:
+        name, shape = (o[0], o[1]) if isinstance(o, tuple) else (o.Label, o.Shape)
+        pts, nrm, area = surface_samples(shape, samples, tol, seed + len(names))
+        if not len(pts):
+            continue
+        P.append(pts); N.append(nrm); part.append(np.full(len(pts), len(names)))
+        names.append(name); areas.append(area)
+    if not names:
+        raise ValueError("sunshadow: ninguna pieza con superficie")
+    P, N, part = np.concatenate(P), np.concatenate(N), np.concatenate(part)
+    per_part = np.bincount(part, minlength=len(names)).astype(float)
+
+    dirs, off, az = cone_directions(axis, half_angle_deg, count)
+    chunks = [dirs[i:i+batch] for i in range(0, len(dirs), batch)]
+    parts, jobs = parallel.map_batches(_lit, chunks, jobs, _init, ((b, P, N, part, len(names), offset),))
+    lit = np.concatenate([p[0] for p in parts]) / per_part
+    flux = np.concatenate([p[1] for p in parts]) / per_part
+    worst = lit.argmax(axis=0)
+    dt = time.perf_counter() - t0
+    LAST_STATS.update(directions=len(dirs), parts=len(names), samples=len(P), rays=int(len(P) * len(dirs)),
+                      jobs=jobs, seconds=dt)
+    return {"names": names, "area_mm2": np.array(areas), "dirs": dirs, "offpoint_deg": off, "az_deg": az,
+            "lit": lit, "flux": flux, "worst": lit.max(axis=0), "worst_dir": worst,
+            "nominal": lit[0], "half_angle_deg": half_angle_deg}
+
+def worst_case(res):
+    # [(pieza, fracción iluminada peor, desapuntado [°], acimut [°], fracción en apuntado nominal)]
+    out = []
+    for i, name in enumerate(res["names"]):
+        k = res["worst_dir"][i]
+        out.append((name, float(res["worst"][i]), float(res["offpoint_deg"][k]), float(res["az_deg"][k]),
+                    float(res["nominal"][i])))
+    return sorted(out, key=lambda r: -r[1])
+
+def report(res, limit=0.0):
+    # Tabla de peor exposición; avisa de las piezas por encima de `limit`
+    App.Console.PrintMessage("sunshadow: %d direcciones (cono %.1f°), %d piezas, %d muestras en %.1f s (%d procesos)\n" % (
+        LAST_STATS["directions"], res["half_angle_deg"], LAST_STATS["parts"], LAST_STATS["samples"],
+        LAST_STATS["seconds"], LAST_STATS["jobs"]))
+    rows = worst_case(res)
+    for name, w, off, az, nom in rows:
+        line = "  %-28s peor %5.1f%% al sol (desapuntado %.1f°, acimut %.0f°), nominal %5.1f%%\n" % (
+            name, 100.0 * w, off, az, 100.0 * nom)
+        if w > limit:
+            App.Console.PrintWarning(line)
+        else:
+            App.Console.PrintMessage(line)
+    return rows
@@ -0,0 +1,371 @@
+# Red térmica nodal (conducción + radiación) a partir del modelo CAD
+# Un nodo por pieza, con los metadatos que deja starsat.materials.attach:
+#   C_i = m_i·cp_i [J/K]         (Mass o Volume·Density, SpecificHeat)
+#   G_ij = A_c / (L_i/k_i + L_j/k_j + 1/h_c)   conducción por contacto [W/K]
+#         A_c área de contacto (caras coincidentes u solape), L = V/A de cada pieza
+#   R_ij = σ·ε_i·A_i·B_ij        radiación entre superficies y al espacio [W/K⁴]
+#         (starsat.viewfactor.exchange, Gebhart con el espacio negro)
+# Balance en cada nodo libre:
+#   C_i dT_i/dt = Q_i + Σ G_ij (T_j − T_i) + Σ R_ij (T_j⁴ − T_i⁴) + R_i,esp (T_esp⁴ − T_i⁴)
+# Estacionario con Newton (jacobiano disperso exacto); transitorio con Euler
+# implícito y Newton en cada paso. Álgebra dispersa de scipy si está
+# disponible; si no, densa con NumPy (redes pequeñas). Las piezas que no
+# tienen camino a un sumidero (espacio o nodo fijo) radian al espacio con su
+# área para que el sistema no sea singular (se avisa).
+#
+#   from starsat import thermal, viewfactor
+#   objs = thermal.thermal_objects(doc, group="Thermal")
+#   vf = viewfactor.compute([o for o in objs if "Radiator" in o.Name] + [hull], rays=20000)
+#   net = thermal.network(objs, vf=vf)                     # contactos por OCC
+#   thermal.add_conductance(net, "HeatPipe_A", "Radiator_Panel", 5.0)
+#   res = thermal.steady(net, loads={"Reactor": 2.0e4}, fixed={"TPS_Front": 1600.0})
+#   thermal.report(res)                                     # piezas por encima de Tmax/TmaxC
+#   tr = thermal.transient(net, loads, t_end=3600.0, dt=10.0, T0=res["T"])
+#
+# Unidades: W, K, s; geometría del modelo en mm (las áreas pasan a m²).
+
+import time
+
+import numpy as np
+
+import FreeCAD as App
+
+from starsat import primitives
+
+try:
+    from scipy import sparse
+    from scipy.sparse import linalg as splinalg
+except ImportError:  # sin scipy: sistema denso
+    sparse = None
+
+SIGMA = 5.670374419e-8
+T_SPACE = 3.0
+
+# Valores para piezas sin el campo en su material
+DEFAULTS = {"density": 2700.0, "cp": 900.0, "k": 15.0, "emissivity": 0.8}
+
+# Contadores de la última construcción / resolución
+LAST_STATS = {"nodes": 0, "conductances": 0, "radiative": 0, "defaults": 0, "iterations": 0,
+              "steps": 0, "sparse": sparse is not None, "seconds": 0.0}
+
+# ===================== Nodos =====================
+def thermal_objects(doc=None, group=None, exclude=()):
+    # Objetos con sólidos del documento (o de un grupo y sus subgrupos)
+    doc = doc if doc is not None else App.ActiveDocument
+    if group is not None:
+        g = group if not isinstance(group, str) else (doc.getObject(group) or (doc.getObjectsByLabel(group) or [None])[0])
+        if g is None:
+            raise ValueError("thermal: grupo '%s' no encontrado" % group)
+        objs = g.OutListRecursive if hasattr(g, "OutListRecursive") else g.Group
+    else:
+        objs = doc.Objects
+    out = []
+    for o in objs:
+        if o.Name in exclude or o.Label in exclude or o.isDerivedFrom("App::DocumentObjectGroup"):
+            continue
+        sh = getattr(o, "Shape", None)
+        if sh is None or sh.isNull() or not sh.Solids:
+            continue
+        out.append(o)
+    return out
+
+def make(names, C, tmax=None, area=None, eps=None):
+    # Red vacía: capacidades [J/K], Tmax [K] (NaN = sin límite), área exterior [m²], emisividad
+    n = len(names)
+    nan = np.full(n, np.nan)
+    return {"names": list(names), "index": dict((s, i) for i, s in enumerate(names)),
+            "C": np.asarray(C, dtype=float), "tmax": nan if tmax is None else np.asarray(tmax, dtype=float),
+            "area_m2": nan if area is None else np.asarray(area, dtype=float),
+            "eps": nan if eps is None else np.asarray(eps, dtype=float),
+            "cond": [np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)],
+            "rad": [np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)],
+            "R_space": np.zeros(n)}
+
+def _num(o, prop):
+    v = getattr(o, prop, None)
+    return float(v) if isinstance(v, (int, float)) else None
+
+def _tmax(o):
+    t = _num(o, "Tmax")
+    if t:
+        return t
+    c = _num(o, "TmaxC")
+    return c + 273.15 if c else np.nan
+
+def nodes(objs, defaults=None):
+    # Red con un nodo por objeto; campos que falten salen de DEFAULTS (o defaults)
+    d = dict(DEFAULTS, **(defaults or {}))
+    C, tmax, area, eps, k, L = [], [], [], [], [], []
+    used = 0
+    for o in objs:
+        vol = primitives.volume(o.Shape)                                  # mm3
+        A = float(o.Shape.Area)                                           # mm2
+        vals = {"density": _num(o, "Density"), "cp": _num(o, "SpecificHeat"),
+                "k": _num(o, "ThermalConductivity"), "emissivity": _num(o, "Emissivity")}
+        for f, v in vals.items():
+            if not v:
+                vals[f] = d[f]
+                used += 1
+        m = _num(o, "Mass") or vol * 1e-9 * vals["density"]
+        C.append(m * vals["cp"]); tmax.append(_tmax(o)); area.append(A * 1e-6)
+        eps.append(vals["emissivity"]); k.append(vals["k"]); L.append(vol / A if A > 0 else 0.0)
+    net = make([o.Name for o in objs], C, tmax, area, eps)
+    net["k"], net["L_mm"] = np.array(k), np.array(L)
+    LAST_STATS["defaults"] = used
+    return net
+
+# ===================== Acoplamientos =====================
+def _ids(net, a):
+    if isinstance(a, str):
+        return np.array([net["index"][a]])
+    a = np.atleast_1d(a)
+    if a.dtype.kind in "US" or a.dtype == object:
+        return np.array([net["index"][s] for s in a])
+    return a.astype(np.int64)
+
+def _append(pairs, i, j, v):
+    i, j = np.broadcast_arrays(i, j)
+    v = np.broadcast_to(np.asarray(v, dtype=float), i.shape)
+    keep = i != j
+    pairs[0] = np.concatenate([pairs[0], i[keep]])
+    pairs[1] = np.concatenate([pairs[1], j[keep]])
+    pairs[2] = np.concatenate([pairs[2], v[keep]])
+
+def add_conductance(net, a, b, G):
+    # Conductancia [W/K] entre nodos (índices o nombres; admite arrays)
+    _append(net["cond"], _ids(net, a), _ids(net, b), G)
+
+def add_radiation(net, a, b, R):
+    # Conductancia radiativa [W/K⁴] entre nodos: q = R·(T_a⁴ − T_b⁴)
+    _append(net["rad"], _ids(net, a), _ids(net, b), R)
+
+def add_space(net, a, R):
+    # Radiación al espacio [W/K⁴]
+    np.add.at(net["R_space"], _ids(net, a), R)
+
+def _candidates(objs, gap):
+    # Parejas con cajas envolventes que se tocan (ampliadas en gap)
+    bb = [o.Shape.BoundBox for o in objs]
+    lo = np.array([(b.XMin, b.YMin, b.ZMin) for b in bb]) - gap
+    hi = np.array([(b.XMax, b.YMax, b.ZMax) for b in bb]) + gap
+    out = []
+    for i in range(len(objs) - 1):
+        j = np.arange(i + 1, len(objs))
+        ok = np.all((lo[j] <= hi[i]) & (hi[j] >= lo[i]), axis=1)
+        out += [(i, int(x)) for x in j[ok]]
+    return out
+
+def contact_area(sa, sb, gap=0.01):
+    # Área de contacto [mm²]: media del área de la intersección si los sólidos se
+    # solapan, o área común de las caras coincidentes si sólo se tocan
+    if sa.distToShape(sb)[0] > gap:
+        return 0.0
+    c = sa.common(sb)
+    if c.Volume > 1e-9 * min(sa.Volume, sb.Volume):
+        return 0.5 * c.Area
+    area = 0.0
+    for fa in sa.Faces:
+        ba = fa.BoundBox; ba.enlarge(gap)
+        for fb in sb.Faces:
+            if ba.intersect(fb.BoundBox):
+                area += fa.common(fb).Area
+    return area
+
+def contacts(objs, gap=0.01, min_area=1.0):
+    # [(i, j, área mm²)] entre los objetos que se tocan o solapan
+    out = []
+    for i, j in _candidates(objs, gap):
+        A = contact_area(objs[i].Shape, objs[j].Shape, gap)
+        if A >= min_area:
+            out.append((i, j, A))
+    return out
+
+def network(objs, vf=None, contact=None, gap=0.01, h_contact=None, defaults=None):
+    # objs: piezas del documento; vf: starsat.viewfactor.compute sobre parte de ellas;
+    # contact: [(i, j, área mm²)] ya calculados (si no, contacts(objs, gap));
+    # h_contact: conductancia de contacto [W/m²K] en serie (None = contacto perfecto)
+    t0 = time.perf_counter()
+    net = nodes(objs, defaults)
+    pairs = contacts(objs, gap) if contact is None else contact
+    if pairs:
+        i, j, A = (np.array(c) for c in zip(*pairs))
+        i, j = i.astype(np.int64), j.astype(np.int64)
+        A = A * 1e-6
+        Rth = (net["L_mm"][i] * 1e-3 / net["k"][i] + net["L_mm"][j] * 1e-3 / net["k"][j]) / A
+        if h_contact:
+            Rth = Rth + 1.0 / (h_contact * A)
+        add_conductance(net, i, j, 1.0 / Rth)
+    if vf is not None:
+        from starsat import viewfactor
+        idx = _ids(net, vf["names"])
+        ex = viewfactor.exchange(vf, net["eps"][idx])
+        a, b = np.triu_indices(len(idx), 1)
+        add_radiation(net, idx[a], idx[b], 0.5 * (ex["R"][a, b] + ex["R"][b, a]))
+        add_space(net, idx, ex["R_space"])
+    net["isolated"] = _isolated(net)
+    if net["isolated"]:
+        App.Console.PrintWarning("thermal: %d piezas sin camino a un sumidero radian al espacio con su área (%s...)\n" % (
+            len(net["isolated"]), ", ".join(net["isolated"][:5])))
+    LAST_STATS.update(nodes=len(net["names"]), conductances=len(net["cond"][2]), radiative=len(net["rad"][2]),
+                      seconds=time.perf_counter() - t0)
+    return net
+
+def components(net):
+    # Etiqueta de componente conexa de cada nodo (propagación del mínimo por los acoplamientos)
+    i = np.concatenate([net["cond"][0], net["rad"][0]])
+    j = np.concatenate([net["cond"][1], net["rad"][1]])
+    label = np.arange(len(net["names"]))
+    while True:
+        old = label.copy()
+        np.minimum.at(label, i, label[j]); np.minimum.at(label, j, label[i])
+        label = label[label]
+        if np.array_equal(label, old):
+            return label
+
+def _isolated(net):
+    # Componentes sin radiación al espacio: cada pieza radia con σ·ε·A (si no, el sistema es singular)
+    label = components(net)
+    sink = np.zeros(len(label), dtype=bool)
+    sink[label[net["R_space"] > 0.0]] = True
+    lost = np.nonzero(~sink[label])[0]
+    add_space(net, lost, SIGMA * net["eps"][lost] * net["area_m2"][lost])
+    return [net["names"][k] for k in lost]
+
+# ===================== Resolución =====================
+def _pattern(net):
+    # Filas/columnas del jacobiano (una vez por red): diagonal, conducción, radiación
+    n = len(net["names"])
+    d = np.arange(n)
+    ci, cj, _ = net["cond"]
+    ri, rj, _ = net["rad"]
+    rows = np.concatenate([d, ci, cj, ri, rj])
+    cols = np.concatenate([d, cj, ci, rj, ri])
+    return rows, cols
+
+def _residual(net, T, Q, T_space):
+    # f(T) = Q + Σ G (T_j − T_i) + Σ R (T_j⁴ − T_i⁴) + R_esp (T_esp⁴ − T_i⁴) y valores del jacobiano
+    n = len(T)
+    ci, cj, G = net["cond"]
+    ri, rj, R = net["rad"]
+    T4, dT4 = T ** 4, 4.0 * T ** 3
+    qc = G * (T[cj] - T[ci])
+    qr = R * (T4[rj] - T4[ri])
+    f = Q + net["R_space"] * (T_space ** 4 - T4)
+    np.add.at(f, ci, qc); np.add.at(f, cj, -qc)
+    np.add.at(f, ri, qr); np.add.at(f, rj, -qr)
+    diag = -net["R_space"] * dT4
+    np.add.at(diag, ci, -G); np.add.at(diag, cj, -G)
+    np.add.at(diag, ri, -R * dT4[ri]); np.add.at(diag, rj, -R * dT4[rj])
+    vals = np.concatenate([diag, G, G, R * dT4[rj], R * dT4[ri]])
+    return f, vals
+
+def _factor(rows, cols, vals, n, free):
+    # Factorización de J[free, free] -> función que resuelve J·x = rhs
+    if sparse is not None:
+        J = sparse.csr_matrix((vals, (rows, cols)), shape=(n, n))
+        if not free.all():
+            J = J[free][:, free]
+        # el patrón es simétrico (cada acoplamiento aparece en ij y ji): orden de A + Aᵀ
+        return splinalg.splu(J.tocsc(), permc_spec="MMD_AT_PLUS_A").solve
+    J = np.zeros((n, n))
+    np.add.at(J, (rows, cols), vals)
+    J = J[np.ix_(free, free)]
+    return lambda rhs: np.linalg.solve(J, rhs)
+
+def _loads(net, loads, t=None):
+    if callable(loads):
+        loads = loads(t)
+    Q = np.zeros(len(net["names"]))
+    if loads is None:
+        return Q
+    if isinstance(loads, dict):
+        for name, q in loads.items():
+            Q[net["index"][name]] += q
+        return Q
+    return Q + np.asarray(loads, dtype=float)
+
+def _start(net, T0, fixed):
+    n = len(net["names"])
+    T = np.array(np.broadcast_to(np.asarray(T0, dtype=float), (n,)))
+    free = np.ones(n, dtype=bool)
+    for name, v in (fixed or {}).items():
+        T[net["index"][name]] = v
+        free[net["index"][name]] = False
+    if not free.any():
+        raise ValueError("thermal: todos los nodos fijos")
+    return T, free
+
+def _newton(net, T, free, Q, T_space, pattern, tol, iters, Cdt=None, Told=None):
+    # Newton completo en estacionario; en transitorio el jacobiano del inicio del
+    # paso se factoriza una vez y se reutiliza (C/dt domina la diagonal)
+    rows, cols = pattern
+    n = len(T)
+    solve = None
+    for it in range(1, iters + 1):
+        f, vals = _residual(net, T, Q, T_space)
+        if Cdt is not None:
+            f = f - Cdt * (T - Told)
+            vals[:n] -= Cdt
+        if solve is None or Cdt is None:
+            solve = _factor(rows, cols, vals, n, free)
+        dT = solve(-f[free])
+        T[free] = np.maximum(T[free] + dT, 0.5 * T[free])
+        if np.max(np.abs(dT)) < tol:
+            break
+    return T, it, float(np.max(np.abs(f[free])))
+
+def _flags(net, T):
+    margin = net["tmax"] - T
+    return margin, np.nan_to_num(margin, nan=np.inf) < 0.0
+
+def steady(net, loads=None, fixed=None, T0=293.15, T_space=T_SPACE, tol=1e-6, iters=50):
+    # Temperaturas estacionarias [K]; fixed: {nodo: K} (condiciones de contorno)
+    t0 = time.perf_counter()
+    T, free = _start(net, T0, fixed)
+    if not fixed and not net["R_space"].any():
+        raise ValueError("thermal: red sin sumidero (usar vf con espacio, add_space o fixed)")
+    T, it, res = _newton(net, T, free, _loads(net, loads), T_space, _pattern(net), tol, iters)
+    margin, over = _flags(net, T)
+    LAST_STATS.update(iterations=it, steps=0, seconds=time.perf_counter() - t0)
+    return {"names": net["names"], "T": T, "margin": margin, "over": over, "tmax": net["tmax"],
+            "iterations": it, "residual": res,
+            "Q_space": net["R_space"] * (T ** 4 - T_space ** 4)}
+
+def transient(net, loads, t_end, dt, T0=293.15, fixed=None, T_space=T_SPACE, tol=1e-4, iters=5, samples=200):
+    # Euler implícito; loads puede ser función del tiempo -> dict o array [W]
+    t0 = time.perf_counter()
+    T, free = _start(net, T0, fixed)
+    if np.any(net["C"][free] <= 0.0):
+        raise ValueError("thermal: capacidad nula en nodos libres (falta Mass/SpecificHeat)")
+    pattern = _pattern(net)
+    Cdt = net["C"] / dt
+    steps = int(np.ceil(t_end / dt))
+    every = max(1, steps // samples)
+    Tpeak = T.copy()
+    times, hist = [0.0], [T.copy()]
+    total = 0
+    for s in range(1, steps + 1):
+        t = s * dt
+        T, it, _ = _newton(net, T, free, _loads(net, loads, t), T_space, pattern, tol, iters, Cdt, T.copy())
+        total += it
+        np.maximum(Tpeak, T, out=Tpeak)
+        if s % every == 0 or s == steps:
+            times.append(t); hist.append(T.copy())
+    margin, over = _flags(net, Tpeak)
+    LAST_STATS.update(iterations=total, steps=steps, seconds=time.perf_counter() - t0)
+    return {"names": net["names"], "t": np.array(times), "T": np.array(hist), "Tpeak": Tpeak,
+            "margin": margin, "over": over, "tmax": net["tmax"]}
+
+# ===================== Informe =====================
+def report(res, top=10):
+    # Piezas por encima de Tmax (aviso) y las más cercanas a su límite
+    T = res["Tpeak"] if "Tpeak" in res else res["T"]
+    App.Console.PrintMessage("thermal: %d nodos, T %.1f..%.1f K, %d por encima de Tmax (%.1f ms, %d iteraciones)\n" % (
+        len(T), T.min(), T.max(), int(res["over"].sum()), 1e3 * LAST_STATS["seconds"], LAST_STATS["iterations"]))
+    order = np.argsort(np.nan_to_num(res["margin"], nan=np.inf))
+    for i in order[:top]:
+        if np.isnan(res["margin"][i]):
+            break
+        line = "  %-28s T %8.1f K  Tmax %8.1f K  margen %8.1f K\n" % (res["names"][i], T[i], res["tmax"][i], res["margin"][i])
+        (App.Console.PrintWarning if res["over"][i] else App.Console.PrintMessage)(line)
+    return [res["names"][i] for i in np.nonzero(res["over"])[0]]
@@ -0,0 +1,240 @@
+# Conducción térmica 1D transitoria en pilas multicapa del TPS
+# Los escudos tipo Parker de las macros son pilas de espesores con k,
+# emisividad y Tmax en el registro de materiales (starsat.materials). Aquí se
+# leen directamente de los diccionarios de parámetros de cada macro y se
+# resuelve la conducción a través del espesor con:
+#   - cara frontal: α·q(t) absorbido − ε_f σ (T⁴ − T_f⁴)
+#   - cara trasera: − ε_b σ (T⁴ − T_b⁴)
+#   - nodos en las caras y en las interfaces entre capas, `nodes` elementos por capa
+#   - Euler implícito; el término T⁴ se linealiza (Newton) en cada paso
+#   - sistema tridiagonal resuelto con Thomas vectorizado sobre el lote
+# Todas las variantes de un lote tienen las mismas capas (mismo orden de
+# materiales), pero espesores y propiedades pueden variar por variante, así
+# que miles de variantes avanzan juntas en cada operación NumPy.
+#
+#   from starsat import tps
+#   st = tps.stack([tps.layers(P, tps.DFD)])                    # DFDmacro.P
+#   res = tps.solve(st, q_front=tps.solar_flux(0.1), t_end=3600.0, dt=2.0)
+#   st, grid = tps.sweep(P, tps.DFD, t_foam=np.linspace(60, 200, 50), t_cc=[8, 12, 16])
+#   res = tps.steady(st, q_front=tps.solar_flux(0.1))
+#   res["over"]                                                  # (B, capas) por encima de Tmax
+#
+# Unidades: espesores en mm, temperaturas en K, flujos en W/m², tiempo en s.
+
+import itertools
+import time
+
+import numpy as np
+
+from starsat import materials
+
+SIGMA = 5.670374419e-8
+SOLAR_1AU = 1361.0
+
+# Pilas: (parámetro de espesor, material, parámetro de repeticiones opcional),
+# de la cara expuesta hacia dentro
+DFD = [("t_ceramic", "CER_Coat"), ("t_foam", "FOAM"), ("t_cc", "CC")]                  # DFDmacro.P
+GREYSCALE = [("ceramic_t", "CER_Coat"), ("tps_t", "CC"), ("foam_t", "FOAM"),
+             ("insul_t", "MLI", "insul_layers")]                                       # DFD_GreyScale: TPS + TPS_ADVANCED
+PARKER = [("coat_th", "CER_Coat"), ("face_th", "CC"), ("foam_th", "FOAM"), ("face_th", "CC")]
+PARKER_DEFAULTS = {"face_th": 10.0, "foam_th": 120.0, "coat_th": 2.0}                   # parker_shield_cyl (Block_fill_in)
+CAPSULE = [("t_hotface", "CC"), ("t_insul", "AEROGEL"), ("t_struct", "718")]            # RadiationBlackCapsuleShield
+
+# Contadores de la última resolución
+LAST_STATS = {"variants": 0, "nodes": 0, "steps": 0, "seconds": 0.0}
+
+def solar_flux(au):
+    return SOLAR_1AU / (au * au)
+
+# ===================== Pilas =====================
+def _params(params):
+    # Un dict de parámetros o varios fusionados (TPS + TPS_ADVANCED)
+    if isinstance(params, (list, tuple)):
+        merged = {}
+        for p in params:
+            merged.update(p)
+        return merged
+    return params
+
+def _columns(params, spec):
+    # Parámetro de espesor de cada capa, con las repeticiones expandidas
+    cols = []
+    for item in spec:
+        cols += [item[0]] * (int(params[item[2]]) if len(item) > 2 else 1)
+    return cols
+
+def layers(params, spec):
+    # [(espesor mm, material)] leídos de los parámetros de la macro
+    params = _params(params)
+    out = []
+    for item in spec:
+        count = int(params[item[2]]) if len(item) > 2 else 1
+        out += [(float(params[item[0]]), item[1])] * count
+    return out
+
+def _field(rec, field):
+    if field == "Tmax" and "Tmax" not in rec and "TmaxC" in rec:
+        return float(rec["TmaxC"]) + 273.15
+    if field == "Tmax":
+        return float(rec.get("Tmax", np.inf))
+    if field not in rec:
+        raise ValueError("tps: el material '%s' no tiene %s" % (rec.get("name", "?"), field))
+    return float(rec[field])
+
+def stack(variants):
+    # variants: lista de pilas [(espesor, material)] con el mismo número de capas
+    # -> dict de arrays (B, L): t [mm], k, rho, cp, Tmax, emissivity
+    if not variants:
+        raise ValueError("tps: no hay variantes")
+    L = len(variants[0])
+    if any(len(v) != L for v in variants):
+        raise ValueError("tps: todas las variantes deben tener %d capas" % L)
+    out = {"names": [materials.resolve(m).get("name", str(m)) for _, m in variants[0]]}
+    out["t"] = np.array([[t for t, _ in v] for v in variants], dtype=float)
+    recs = [[materials.resolve(m) for _, m in v] for v in variants]
+    for field, key in (("k", "k"), ("density", "rho"), ("cp", "cp"), ("Tmax", "Tmax"), ("emissivity", "emissivity")):
+        out[key] = np.array([[_field(r, field) for r in row] for row in recs], dtype=float)
+    return out
+
+def sweep(params, spec, **values):
+    # Rejilla de variantes: cada parámetro de espesor nombrado recorre sus
+    # valores; el resto sale de params. Devuelve (pila, {parámetro: array (B,)})
+    params = _params(params)
+    cols = _columns(params, spec)
+    keys = sorted(values)
+    for key in keys:
+        if key not in cols:
+            raise ValueError("tps: '%s' no es un espesor de la pila (usar %s)" % (key, ", ".join(sorted(set(cols)))))
+    base = layers(params, spec)
+    grid = list(itertools.product(*[np.atleast_1d(values[k]) for k in keys]))
+    st = stack([base])
+    B = len(grid)
+    for key in ("k", "rho", "cp", "Tmax", "emissivity"):
+        st[key] = np.repeat(st[key], B, axis=0)
+    t = np.repeat(st["t"], B, axis=0)
+    for j, key in enumerate(keys):
+        v = np.array([g[j] for g in grid], dtype=float)
+        for l, c in enumerate(cols):
+            if c == key:
+                t[:, l] = v
+    st["t"] = t
+    return st, dict((k, np.array([g[j] for g in grid], dtype=float)) for j, k in enumerate(keys))
+
+# ===================== Discretización =====================
+def _mesh(st, nodes):
+    # Elementos (B, E) con E = L·nodes; nodos (B, E+1)
+    L = st["t"].shape[1]
+    lay = np.repeat(np.arange(L), nodes)
+    dx = np.maximum(st["t"][:, lay] / nodes, 1e-6) * 1e-3                   # m
+    G = st["k"][:, lay] / dx                                                # W/m²K
+    half = 0.5 * st["rho"][:, lay] * st["cp"][:, lay] * dx                  # J/m²K
+    C = np.zeros((dx.shape[0], dx.shape[1] + 1))
+    C[:, :-1] += half
+    C[:, 1:] += half
+    x = np.concatenate([np.zeros((dx.shape[0], 1)), np.cumsum(dx, axis=1)], axis=1) * 1e3
+    return G, C, x
+
+def thomas(a, b, c, d):
+    # Tridiagonal por lotes: a (sub), b (diagonal), c (super), d: (B, N); a[:,0] y c[:,-1] no se usan
+    n = b.shape[1]
+    cp = np.empty_like(b); dp = np.empty_like(b)
+    cp[:, 0] = c[:, 0] / b[:, 0]
+    dp[:, 0] = d[:, 0] / b[:, 0]
+    for i in range(1, n):
+        m = b[:, i] - a[:, i] * cp[:, i-1]
+        cp[:, i] = c[:, i] / m
+        dp[:, i] = (d[:, i] - a[:, i] * dp[:, i-1]) / m
+    x = np.empty_like(b)
+    x[:, -1] = dp[:, -1]
+    for i in range(n - 2, -1, -1):
+        x[:, i] = dp[:, i] - cp[:, i] * x[:, i+1]
+    return x
+
+def _faces(st, eps_front, eps_back, absorptivity):
+    B = st["t"].shape[0]
+    ef = st["emissivity"][:, 0] if eps_front is None else np.broadcast_to(np.asarray(eps_front, dtype=float), (B,))
+    eb = st["emissivity"][:, -1] if eps_back is None else np.broadcast_to(np.asarray(eps_back, dtype=float), (B,))
+    al = ef if absorptivity is None else np.broadcast_to(np.asarray(absorptivity, dtype=float), (B,))
+    return ef, eb, al
+
+def _flux(q_front, t, B):
+    q = q_front(t) if callable(q_front) else q_front
+    return np.broadcast_to(np.asarray(q, dtype=float), (B,))
+
+def _system(G, Cdt, T, Told, q, ef, eb, al, T_front, T_back):
+    # Matriz tridiagonal linealizada en T (Newton para σεT⁴)
+    B, N = T.shape
+    a = np.zeros((B, N)); c = np.zeros((B, N))
+    a[:, 1:] = -G
+    c[:, :-1] = -G
+    b = Cdt.copy()
+    b[:, :-1] += G
+    b[:, 1:] += G
+    d = Cdt * Told
+    for i, eps, Tenv in ((0, ef, T_front), (N - 1, eb, T_back)):
+        Ti = T[:, i]
+        b[:, i] += 4.0 * SIGMA * eps * Ti**3
+        d[:, i] += SIGMA * eps * (3.0 * Ti**4 + Tenv**4)
+    d[:, 0] += al * q
+    return a, b, c, d
+
+def _layer_max(Tn, L, nodes):
+    # Máximo por capa (los nodos de interfaz cuentan para las dos capas)
+    idx = np.arange(L)[:, None] * nodes + np.arange(nodes + 1)[None, :]
+    return Tn[:, idx].max(axis=2)
+
+def _result(st, x, T, Tpeak, nodes, extra):
+    L = st["t"].shape[1]
+    lay = _layer_max(Tpeak, L, nodes)
+    res = {"x_mm": x, "T": T, "Tpeak": Tpeak, "Tmax_layer": lay, "margin": st["Tmax"] - lay,
+           "over": lay > st["Tmax"], "names": st["names"]}
+    res.update(extra)
+    return res
+
+# ===================== Resolución =====================
+def solve(st, q_front, t_end, dt, nodes=8, T0=293.15, eps_front=None, eps_back=None, absorptivity=None,
+          T_front=3.0, T_back=3.0, iters=2, samples=200):
+    # q_front: W/m² escalar, (B,) o función q(t). Devuelve temperaturas finales
+    # (B, N), picos por nodo y por capa, y la historia de las dos caras.
+    t0 = time.perf_counter()
+    G, C, x = _mesh(st, nodes)
+    B, N = C.shape
+    ef, eb, al = _faces(st, eps_front, eps_back, absorptivity)
+    T = np.array(np.broadcast_to(np.asarray(T0, dtype=float).reshape(-1, 1) if np.ndim(T0) == 1 else T0, (B, N)))
+    Tpeak = T.copy()
+    Cdt = C / dt
+    steps = int(np.ceil(t_end / dt))
+    every = max(1, steps // samples)
+    times, front, back = [0.0], [T[:, 0].copy()], [T[:, -1].copy()]
+    for n in range(1, steps + 1):
+        q = _flux(q_front, n * dt, B)
+        Told, Tk = T, T
+        for _ in range(iters):
+            Tk = thomas(*_system(G, Cdt, Tk, Told, q, ef, eb, al, T_front, T_back))
+        T = Tk
+        np.maximum(Tpeak, T, out=Tpeak)
+        if n % every == 0 or n == steps:
+            times.append(n * dt); front.append(T[:, 0].copy()); back.append(T[:, -1].copy())
+    LAST_STATS.update(variants=B, nodes=N, steps=steps, seconds=time.perf_counter() - t0)
+    return _result(st, x, T, Tpeak, nodes, {"t": np.array(times), "front": np.array(front).T, "back": np.array(back).T})
+
+def steady(st, q_front, nodes=8, eps_front=None, eps_back=None, absorptivity=None,
+           T_front=3.0, T_back=3.0, tol=1e-6, max_iter=50):
+    # Régimen permanente: Newton sobre el sistema sin término capacitivo
+    t0 = time.perf_counter()
+    G, C, x = _mesh(st, nodes)
+    B, N = C.shape
+    ef, eb, al = _faces(st, eps_front, eps_back, absorptivity)
+    q = _flux(q_front, 0.0, B)
+    # Arranque: equilibrio radiativo de una placa isoterma
+    Teq = ((al * q + SIGMA * (ef * T_front**4 + eb * T_back**4)) / (SIGMA * (ef + eb))) ** 0.25
+    T = np.repeat(Teq[:, None], N, axis=1)
+    zero = np.zeros_like(C)
+    for it in range(1, max_iter + 1):
+        Tn = thomas(*_system(G, zero, T, T, q, ef, eb, al, T_front, T_back))
+        delta = float(np.max(np.abs(Tn - T)))
+        T = Tn
+        if delta < tol:
+            break
+    LAST_STATS.update(variants=B, nodes=N, steps=it, seconds=time.perf_counter() - t0)
+    return _result(st, x, T, T, nodes, {"iterations": it})
@@ -0,0 +1,182 @@
+# Factores de forma radiativos entre superficies (radiadores, casco) y espacio
+# Cada superficie es el contorno teselado de un sólido (normales exteriores).
+# Monte Carlo: desde puntos repartidos por área se lanzan rayos con
+# distribución coseno sobre el hemisferio exterior; el primer corte
+# (bvh.first_hit) decide a qué superficie va el rayo y si no corta nada se va
+# al espacio. F[i, j] = rayos de i que llegan a j / rayos de i.
+#   - reciprocidad A_i·F_ij = A_j·F_ji impuesta promediando ambas estimaciones
+#     y la fila se cierra con el espacio (Σ_j F_ij + F_i,esp = 1)
+#   - los lotes de rayos se reparten entre procesos (parallel.map_batches)
+#   - resultado en disco por hash de geometría (bvh.geometry_key), como el BVH
+#   - emisividades de la propiedad Emissivity (materials.attach) o del registro
+#
+#   from starsat import viewfactor
+#   vf = viewfactor.compute(rads + [hull], rays=20000, jobs=0)     # F (N, N), space (N,)
+#   eps = viewfactor.emissivities(rads + [hull])
+#   ex = viewfactor.exchange(vf, eps)        # Gebhart B y conductancias σ·ε_i·A_i·B_ij [W/K⁴]
+#   viewfactor.report(vf, eps)
+#
+# Superficies: objetos del documento, parejas (nombre, Shape) o
+# (nombre, Shape, material) con material del registro o dict en línea.
+# Unidades: mm y mm² en la geometría, m² en las conductancias.
+
+import hashlib
+import os
+import time
+
+import numpy as np
+
+import FreeCAD as App
+
+from starsat import bvh
+from starsat import materials
+from starsat import parallel
+
+SIGMA = 5.670374419e-8
+
+# Contadores del último cálculo
+LAST_STATS = {"surfaces": 0, "rays": 0, "jobs": 1, "seconds": 0.0, "loaded": False, "reciprocity_err": 0.0}
+
+def out_dir():
+    return os.environ.get("STARSAT_VF_DIR") or os.path.join(App.getUserAppDataDir(), "starsat_viewfactor")
+
+# ===================== Emisión =====================
+def _emit(b, i, n, offset, rng):
+    # Puntos por área sobre los triángulos de la superficie i y direcciones
+    # con distribución coseno alrededor de la normal -> (origen, dirección, área [mm²])
+    idx = np.nonzero(np.asarray(b["obj"]) == i)[0]
+    e1, e2 = np.asarray(b["e1"])[idx], np.asarray(b["e2"])[idx]
+    c = np.cross(e1, e2)
+    dA = 0.5 * np.linalg.norm(c, axis=1)
+    area = float(dA.sum())
+    tri = rng.choice(len(idx), size=n, p=dA / area)
+    r1, r2 = rng.random(n), rng.random(n)
+    flip = r1 + r2 > 1.0
+    r1[flip], r2[flip] = 1.0 - r1[flip], 1.0 - r2[flip]
+    p = np.asarray(b["v0"])[idx[tri]] + r1[:, None] * e1[tri] + r2[:, None] * e2[tri]
+    nrm = c[tri] / (2.0 * dA[tri])[:, None]
+    t1 = e1[tri] / np.linalg.norm(e1[tri], axis=1)[:, None]
+    t2 = np.cross(nrm, t1)
+    u, phi = rng.random(n), 2.0 * np.pi * rng.random(n)
+    s = np.sqrt(u)
+    d = (s * np.cos(phi))[:, None] * t1 + (s * np.sin(phi))[:, None] * t2 + np.sqrt(1.0 - u)[:, None] * nrm
+    return p + offset * nrm, d, area
+
+_BVH = None
+
+def _init(b):
+    global _BVH
+    _BVH = b
+
+def _batch(rays):
+    O, D = rays
+    return bvh.first_hit(_BVH, O, D)["obj"]
+
+# ===================== Reciprocidad =====================
+def reciprocity(F, area):
+    # A_i·F_ij = A_j·F_ji promediando ambas estimaciones; el resto de la fila va al espacio
+    G = 0.5 * (area[:, None] * F + (area[:, None] * F).T)
+    F = G / area[:, None]
+    rows = F.sum(axis=1)
+    over = rows > 1.0
+    F[over] /= rows[over, None]
+    return F, 1.0 - F.sum(axis=1)
+
+# ===================== Cálculo =====================
+def _key(surfaces, tol, rays, seed, offset):
+    h = hashlib.sha256(("vf|%d|%d|%r|" % (rays, seed, float(offset))).encode())
+    h.update(bvh.geometry_key(surfaces, tol).encode())
+    return h.hexdigest()
+
+def _result(names, area, F_raw, rays, key):
+    F, space = reciprocity(F_raw, area)
+    AF = area[:, None] * F_raw
+    with np.errstate(invalid="ignore", divide="ignore"):
+        err = np.abs(AF - AF.T) / np.maximum(AF, AF.T)
+    return {"names": list(names), "area_mm2": area, "F": F, "space": space, "F_raw": F_raw, "rays": rays,
+            "key": key, "reciprocity_err": float(np.nanmax(err)) if np.any(AF > 0) else 0.0}
+
+def compute(surfaces, rays=20000, tol=1.0, offset=0.05, jobs=1, batch=50000, seed=0, cache=True, directory=None):
+    # rays: rayos por superficie; jobs: 1 en serie, 0 = todos los núcleos, n procesos
+    t0 = time.perf_counter()
+    key = _key(surfaces, tol, rays, seed, offset)
+    path = os.path.join(directory or out_dir(), key[:32] + ".npz")
+    if cache and os.path.isfile(path):
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                res = _result([str(n) for n in z["names"]], z["area_mm2"], z["F_raw"], int(z["rays"]), key)
+            LAST_STATS.update(surfaces=len(res["names"]), rays=0, jobs=1, seconds=time.perf_counter() - t0,
+                              loaded=True, reciprocity_err=res["reciprocity_err"])
+            return res
+        except (OSError, ValueError, KeyError) as e:
+            App.Console.PrintWarning("viewfactor: no se pudo cargar %s (%s), se recalcula\n" % (path, e))
+
+    b = bvh.from_objects(surfaces, tol, cache=cache)
+    N = len(b["names"])
+    rng = np.random.default_rng(seed)
+    O, D, src, area = [], [], [], np.zeros(N)
+    for i in range(N):
+        o, d, area[i] = _emit(b, i, rays, offset, rng)
+        O.append(o); D.append(d); src.append(np.full(rays, i))
+    O, D, src = np.concatenate(O), np.concatenate(D), np.concatenate(src)
+    chunks = [(O[i:i+batch], D[i:i+batch]) for i in range(0, len(D), batch)]
+    parts, jobs = parallel.map_batches(_batch, chunks, jobs, _init, (b,))
+    dst = np.concatenate(parts)
+    hit = dst >= 0
+    F_raw = np.bincount(src[hit] * N + dst[hit], minlength=N * N).reshape(N, N) / float(rays)
+    res = _result(b["names"], area, F_raw, rays, key)
+
+    if cache:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(path, names=np.array(res["names"]), area_mm2=area, F_raw=F_raw, rays=rays)
+        except OSError as e:
+            App.Console.PrintWarning("viewfactor: no se pudo guardar %s (%s)\n" % (path, e))
+    LAST_STATS.update(surfaces=N, rays=int(len(D)), jobs=jobs, seconds=time.perf_counter() - t0,
+                      loaded=False, reciprocity_err=res["reciprocity_err"])
+    return res
+
+# ===================== Emisividades e intercambio =====================
+def emissivities(surfaces, default=None):
+    # Emissivity del objeto o del material de la pareja; default para las que no tengan
+    eps, missing = [], []
+    for o in surfaces:
+        if isinstance(o, tuple):
+            name = o[0]
+            e = materials.resolve(o[2]).get("emissivity") if len(o) > 2 else None
+        else:
+            name, e = o.Name, getattr(o, "Emissivity", None)
+        if e is None:
+            e = default
+            if e is None:
+                missing.append(name)
+        eps.append(e)
+    if missing:
+        raise ValueError("viewfactor: sin emisividad '%s' (usar materials.attach o default=)" % ", ".join(missing))
+    return np.array(eps, dtype=float)
+
+def exchange(vf, eps):
+    # Factores de Gebhart B (N, N+1; última columna = espacio, negro): fracción de lo
+    # emitido por i que absorbe j tras reflexiones difusas grises, y conductancias
+    # radiativas R_ij = σ·ε_i·A_i·B_ij [W/K⁴] (q_ij = R_ij·(T_i⁴ − T_j⁴))
+    eps = np.asarray(eps, dtype=float)
+    N = len(eps)
+    Ff = np.column_stack([vf["F"], vf["space"]])
+    B = np.linalg.solve(np.eye(N) - vf["F"] * (1.0 - eps)[None, :], Ff * np.append(eps, 1.0)[None, :])
+    R = SIGMA * (eps * vf["area_mm2"] * 1e-6)[:, None] * B
+    return {"names": vf["names"], "eps": eps, "B": B, "R": R[:, :N], "R_space": R[:, N]}
+
+def report(vf, eps=None):
+    App.Console.PrintMessage("viewfactor: %d superficies, %d rayos (%s) en %.1f s, reciprocidad bruta %.1f%%\n" % (
+        len(vf["names"]), LAST_STATS["rays"], "caché" if LAST_STATS["loaded"] else "%d procesos" % LAST_STATS["jobs"],
+        LAST_STATS["seconds"], 100.0 * vf["reciprocity_err"]))
+    ex = exchange(vf, eps) if eps is not None else None
+    for i, name in enumerate(vf["names"]):
+        row = vf["F"][i].copy(); row[i] = -1.0
+        j = int(row.argmax())
+        line = "  %-24s A %10.0f mm²  F_esp %.3f  F_self %.3f  máx -> %s %.3f" % (
+            name, vf["area_mm2"][i], vf["space"][i], vf["F"][i, i], vf["names"][j], vf["F"][i, j])
+        if ex is not None:
+            line += "  ε %.2f  B_esp %.3f" % (ex["eps"][i], ex["B"][i, -1])
+        App.Console.PrintMessage(line + "\n")
+    return ex